@@ -1,9 +1,10 @@
 from fastapi import FastAPI, Query, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
 from contextlib import asynccontextmanager
+import functools
 import json
 import sys
 import os
@@ -19,7 +20,14 @@ from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.security_headers import SecurityHeadersMiddleware
 from app.security.dependencies import verify_api_key_header
 from app.utils.validation import validate_url, sanitize_input
+from app.utils.leader_election import LeaderElection, try_file_lock
 from app.config import settings
+from mycrawler.mycrawler.canonical import canonicalize_url
+from mycrawler.mycrawler.detail_store import DetailStore
+from mycrawler.mycrawler.listing_store import ListingStore
+from mycrawler.mycrawler.near_duplicates import ContentHashStore
+from mycrawler.mycrawler.profiling import create_profiler, get_profile_mode, get_profiles_dir
+from mycrawler.mycrawler.run_history import RunHistoryStore
 
 # Đường dẫn đến thư mục mycrawler
 BASE_DIR = Path(__file__).parent
@@ -35,6 +43,39 @@ logger = logging.getLogger(__name__)
 # Scheduler instance
 scheduler = None
 
+# Leader election: chỉ một worker (giữ lock file) chạy scheduler
+leader_election = None
+
+# Run-history store (stats của các lần chạy spider, được ghi bởi RunStatsExtension)
+run_history_store = RunHistoryStore()
+
+# Listing store (listing đã gộp qua các lần chạy, được ghi bởi ListingStorePipeline)
+listing_store = ListingStore()
+
+# Detail cache (được ghi bởi DetailStorePipeline khi crawl detail hoặc prefetch)
+detail_store = DetailStore()
+
+# SimHash của nội dung đã crawl (được ghi bởi NearDuplicatePipeline), dùng để tìm bài gần trùng
+content_hash_store = ContentHashStore()
+
+# Profiler của các route được chọn, mỗi worker một report (None khi không bật MYCRAWLER_PROFILE)
+api_profiler = create_profiler(
+    get_profile_mode(settings.MYCRAWLER_PROFILE), f"api-{os.getpid()}", settings.PROFILES_DIR or None
+)
+
+
+def profiled_route(func):
+    """Profile route khi bật MYCRAWLER_PROFILE; khi tắt trả về nguyên hàm nên không có chi phí"""
+    if api_profiler is None:
+        return func
+    
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with api_profiler.section(func.__name__):
+            return await func(*args, **kwargs)
+    
+    return wrapper
+
 # Mapping từ spider name sang source type
 SPIDER_TO_SOURCE = {
     "openai-com-listing": "openai.com",
@@ -50,11 +91,22 @@ ALL_LISTING_SPIDERS = list(SPIDER_TO_SOURCE.keys())
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler cho startup và shutdown"""
-    # Startup
-    start_scheduler()
+    global leader_election
+    
+    # Startup: chỉ worker được bầu làm leader mới khởi động scheduler
+    leader_election = LeaderElection(
+        Path(settings.SCHEDULER_LOCK_FILE),
+        on_elected=start_scheduler,
+        retry_interval=settings.SCHEDULER_LEADER_RETRY_SECONDS
+    )
+    leader_election.start()
     yield
     # Shutdown
     shutdown_scheduler()
+    leader_election.stop()
+    if api_profiler is not None:
+        logger.info(f"Đã ghi profile API: {api_profiler.save()}")
+        api_profiler.close()
 
 
 app = FastAPI(
@@ -82,6 +134,7 @@ app.add_middleware(RateLimitMiddleware)
 class CrawlDetailRequest(BaseModel):
     type: str
     url: str
+    refresh: bool = False  # Bỏ qua detail cache, luôn crawl lại
 
 
 def get_listing_log_path() -> Path:
@@ -225,9 +278,9 @@ def find_json_file(filename: str, source_type: str = None) -> Optional[Path]:
         if config:
             data_dir = config["data_dir"]
             possible_paths = [
-                BASE_DIR / "mycrawler" / "data" / data_dir / filename,
-                BASE_DIR / "mycrawler" / "mycrawler" / "data" / data_dir / filename,
-                BASE_DIR / "mycrawler" / "mycrawler" / "mycrawler" / "data" / data_dir / filename,
+                MYCRAWLER_DIR / "data" / data_dir / filename,
+                MYCRAWLER_DIR / "mycrawler" / "data" / data_dir / filename,
+                MYCRAWLER_DIR / "mycrawler" / "mycrawler" / "data" / data_dir / filename,
             ]
             
             for path in possible_paths:
@@ -235,7 +288,7 @@ def find_json_file(filename: str, source_type: str = None) -> Optional[Path]:
                     return path
     
     # Tìm đệ quy trong thư mục mycrawler nếu không tìm thấy ở các đường dẫn trên
-    mycrawler_path = BASE_DIR / "mycrawler"
+    mycrawler_path = MYCRAWLER_DIR
     if mycrawler_path.exists():
         for root, dirs, files in os.walk(mycrawler_path):
             if filename in files:
@@ -246,6 +299,36 @@ def find_json_file(filename: str, source_type: str = None) -> Optional[Path]:
     return None
 
 
+def get_latest_run_stats(spider_name: str) -> Optional[dict]:
+    """Lấy stats của lần chạy gần nhất từ run-history store (None nếu lỗi hoặc chưa có)"""
+    try:
+        return run_history_store.get_latest_run(spider_name)
+    except Exception as e:
+        logger.warning(f"Không đọc được run stats cho {spider_name}: {e}")
+        return None
+
+
+def get_cached_detail(detail_spider: str, url: str) -> Optional[dict]:
+    """
+    Lấy detail đã cache của URL (None nếu chưa có hoặc lỗi đọc cache)
+    
+    Nếu URL là bản gần trùng của một bài đã có detail (kể cả ở source khác), trả về
+    detail của bài gốc kèm duplicate_of thay vì crawl lại.
+    """
+    try:
+        cached = detail_store.get(detail_spider, url)
+        if cached:
+            return cached
+        duplicate_of = content_hash_store.get_duplicate_of(url)
+        original = detail_store.get_any(duplicate_of) if duplicate_of else None
+        if original:
+            return {**original, "link": url, "duplicate_of": duplicate_of}
+        return None
+    except Exception as e:
+        logger.warning(f"Không đọc được detail cache cho {url}: {e}")
+        return None
+
+
 async def run_listing_spider(spider_name: str) -> dict:
     """
     Chạy listing spider với timeout 15 phút, force kill nếu quá timeout
@@ -254,7 +337,7 @@ async def run_listing_spider(spider_name: str) -> dict:
         spider_name: Tên spider (ví dụ: 'openai-com-listing')
     
     Returns:
-        dict: Kết quả chạy spider {'success': bool, 'message': str}
+        dict: Kết quả chạy spider {'success': bool, 'message': str, 'stats': dict}
     """
     # Lấy source_type từ spider_name
     source_type = SPIDER_TO_SOURCE.get(spider_name)
@@ -316,7 +399,11 @@ async def run_listing_spider(spider_name: str) -> dict:
         await asyncio.sleep(2)
         
         logger.info(f"Spider {listing_spider} chạy thành công")
-        return {"success": True, "message": f"Spider {listing_spider} chạy thành công"}
+        return {
+            "success": True,
+            "message": f"Spider {listing_spider} chạy thành công",
+            "stats": get_latest_run_stats(listing_spider)
+        }
         
     except Exception as e:
         error_msg = f"Lỗi khi chạy spider {listing_spider}: {str(e)}"
@@ -324,6 +411,102 @@ async def run_listing_spider(spider_name: str) -> dict:
         return {"success": False, "message": error_msg}
 
 
+async def run_detail_prefetch(spider_name: str) -> dict:
+    """
+    Crawl trước detail của các link trong listing chưa có trong detail cache
+    
+    Các link mới nhất được ưu tiên, tối đa DETAIL_PREFETCH_BUDGET link mỗi lần, crawl trong
+    một lần chạy detail spider (-a urls_file=...). Output ghi ra file prefetch riêng để không
+    ghi đè file detail của /api/crawl-detail.
+    
+    Link vẫn chưa có detail sau lần chạy được ghi là thất bại và bị bỏ qua theo backoff
+    (DETAIL_PREFETCH_RETRY_AFTER, DETAIL_PREFETCH_MAX_ATTEMPTS), để link lỗi liên tục không
+    chiếm budget của link mới.
+    
+    Args:
+        spider_name: Tên listing spider vừa chạy xong
+    
+    Returns:
+        dict: {'success': bool, 'message': str, 'queued': int, 'failed': int, 'remaining': int}
+    """
+    source_type = SPIDER_TO_SOURCE.get(spider_name)
+    config = get_source_config(source_type) if source_type else None
+    if not config:
+        return {"success": False, "message": f"Không tìm thấy config cho spider: {spider_name}", "queued": 0, "remaining": 0}
+    
+    detail_spider = config["detail_spider"]
+    missing = detail_store.filter_missing(detail_spider, listing_store.get_links(spider_name))
+    # Bài trùng một bài đã có detail dùng chung detail đó, không cần render lại
+    missing = [link for link in missing if not get_cached_detail(detail_spider, link)]
+    missing = detail_store.filter_prefetch_due(
+        detail_spider, missing, settings.DETAIL_PREFETCH_RETRY_AFTER, settings.DETAIL_PREFETCH_MAX_ATTEMPTS
+    )
+    batch = missing[:settings.DETAIL_PREFETCH_BUDGET]
+    if not batch:
+        return {"success": True, "message": "Không có link mới cần prefetch", "queued": 0, "failed": 0, "remaining": 0}
+    
+    data_dir = MYCRAWLER_DIR / "data" / config["data_dir"]
+    data_dir.mkdir(parents=True, exist_ok=True)
+    urls_file = data_dir / f"{detail_spider}-prefetch-urls.txt"
+    output_file = data_dir / f"{detail_spider}-prefetch.json"
+    urls_file.write_text("\n".join(batch) + "\n", encoding="utf-8")
+    
+    logger.info(f"Prefetch {len(batch)}/{len(missing)} detail cho {detail_spider}")
+    
+    cmd = [
+        sys.executable,
+        "-m",
+        "scrapy",
+        "crawl",
+        detail_spider,
+        "-a",
+        f"urls_file={urls_file}",
+        "-O",
+        str(output_file)
+    ]
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=str(MYCRAWLER_DIR),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=settings.DETAIL_PREFETCH_TIMEOUT)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        message = f"Timeout: Prefetch {detail_spider} chạy quá {settings.DETAIL_PREFETCH_TIMEOUT} giây, đã force kill"
+        logger.warning(message)
+        failed = record_prefetch_failures(detail_spider, batch, "timeout")
+        return {"success": False, "message": message, "queued": len(batch), "failed": failed, "remaining": len(missing) - len(batch)}
+    
+    if process.returncode != 0:
+        error_msg = stderr.decode('utf-8', errors='ignore') if stderr else "Unknown error"
+        logger.error(f"Prefetch {detail_spider} thất bại (returncode: {process.returncode}): {error_msg}")
+        failed = record_prefetch_failures(detail_spider, batch, f"returncode {process.returncode}")
+        return {"success": False, "message": f"Prefetch thất bại: {error_msg}", "queued": len(batch), "failed": failed, "remaining": len(missing) - len(batch)}
+    
+    # Spider chạy xong nhưng không ra item (404, không extract được nội dung...)
+    failed = record_prefetch_failures(detail_spider, batch, "không có detail sau prefetch")
+    return {
+        "success": True,
+        "message": f"Đã prefetch {len(batch) - failed}/{len(batch)} detail cho {detail_spider}",
+        "queued": len(batch),
+        "failed": failed,
+        "remaining": len(missing) - len(batch)
+    }
+
+
+def record_prefetch_failures(detail_spider: str, batch: list, error: str) -> int:
+    """Ghi các link trong batch vẫn chưa có detail sau prefetch, trả về số link thất bại"""
+    failed = [link for link in batch if not get_cached_detail(detail_spider, link)]
+    if failed:
+        detail_store.record_prefetch_failures(detail_spider, failed, error)
+        logger.warning(f"Prefetch {detail_spider}: {len(failed)} link chưa có detail ({error}), sẽ thử lại theo backoff")
+    return len(failed)
+
+
 def run_async_in_sync(coro):
     """
     Chạy async function từ sync context một cách an toàn
@@ -349,6 +532,16 @@ def check_and_run_listing():
     """
     logger.info("=== Bắt đầu check listing scheduler ===")
     
+    # Tránh chạy trùng giữa các worker (cron job của leader và test-scheduler thủ công)
+    with try_file_lock(Path(settings.SCHEDULER_RUN_LOCK_FILE)) as acquired:
+        if not acquired:
+            logger.warning("Một worker khác đang chạy check_and_run_listing, bỏ qua lần này")
+            return
+        _check_and_run_listing()
+
+
+def _check_and_run_listing():
+    """Phần thân của check_and_run_listing, chạy khi đã giữ run lock"""
     try:
         # Tìm listing cũ nhất
         spider_name = get_next_listing_to_run()
@@ -367,6 +560,11 @@ def check_and_run_listing():
             log_data[spider_name] = current_time
             save_listing_log(log_data)
             logger.info(f"Đã cập nhật log cho {spider_name}: {current_time}")
+            
+            # Crawl trước detail của các link mới để cache sẵn sàng trước khi client gọi
+            if settings.DETAIL_PREFETCH_ENABLED:
+                prefetch = run_async_in_sync(run_detail_prefetch(spider_name))
+                logger.info(f"Detail prefetch cho {spider_name}: {prefetch['message']} (còn lại: {prefetch['remaining']})")
         else:
             # Không cập nhật log nếu spider fail, lần check sau sẽ chọn lại nếu vẫn cũ nhất
             logger.warning(f"Spider {spider_name} chạy thất bại, không cập nhật log: {result['message']}")
@@ -378,14 +576,22 @@ def check_and_run_listing():
 
 
 @app.get("/api/listings")
+@profiled_route
 async def get_listings(
     type: str = Query(..., description="Loại source (ví dụ: openai.com, techcrunch.com, anthropic.com)"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Số bài tối đa (mặc định: tất cả)"),
+    offset: int = Query(0, ge=0, description="Bỏ qua bao nhiêu bài đầu tiên"),
+    collapse_duplicates: bool = Query(False, description="Bỏ các bài gần trùng một bài đã lưu (duplicate_of)"),
     api_key_verified: bool = Depends(verify_api_key_header)
 ):
     """
-    Lấy danh sách listings từ file JSON
+    Lấy danh sách listings đã gộp qua các lần chạy (bài thấy lần đầu gần nhất trước)
     Query params:
     - type: Loại source (ví dụ: 'openai.com', 'techcrunch.com', 'anthropic.com', 'adobe.com')
+    - limit, offset: Phân trang kết quả
+    - collapse_duplicates: true để chỉ giữ bài gốc của mỗi nhóm bài gần trùng (kể cả trùng với source khác)
+    
+    Nếu listing store chưa có dữ liệu của source, đọc file JSON của lần chạy gần nhất.
     
     Yêu cầu: API key trong header X-API-Key
     """
@@ -394,6 +600,22 @@ async def get_listings(
         supported_types = ", ".join(["'openai.com'", "'techcrunch.com'", "'anthropic.com'", "'adobe.com'"])
         raise HTTPException(status_code=400, detail=f"Type '{type}' không được hỗ trợ. Chỉ hỗ trợ: {supported_types}")
     
+    try:
+        if listing_store.count(config["listing_spider"]):
+            total = listing_store.count(config["listing_spider"], collapse_duplicates=collapse_duplicates)
+            data = listing_store.get_listings(
+                config["listing_spider"], limit=limit, offset=offset, collapse_duplicates=collapse_duplicates
+            )
+            return JSONResponse(content={
+                "success": True,
+                "type": type,
+                "count": len(data),
+                "total": total,
+                "data": data
+            })
+    except Exception as e:
+        logger.warning(f"Không đọc được listing store cho {type}: {e}")
+    
     json_file = find_json_file(config["listing_file"], type)
     
     if not json_file:
@@ -403,10 +625,15 @@ async def get_listings(
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
+        if collapse_duplicates:
+            data = [item for item in data if not item.get("duplicate_of")]
+        total = len(data)
+        data = data[offset:offset + limit] if limit is not None else data[offset:]
         return JSONResponse(content={
             "success": True,
             "type": type,
             "count": len(data),
+            "total": total,
             "data": data
         })
     except json.JSONDecodeError:
@@ -416,6 +643,7 @@ async def get_listings(
 
 
 @app.post("/api/crawl-detail")
+@profiled_route
 async def crawl_detail(
     request: CrawlDetailRequest,
     api_key_verified: bool = Depends(verify_api_key_header)
@@ -425,6 +653,7 @@ async def crawl_detail(
     Body:
     - type: Loại source (ví dụ: 'openai.com', 'techcrunch.com', 'anthropic.com', 'adobe.com')
     - url: URL của detail page cần crawl
+    - refresh: true để bỏ qua detail cache và crawl lại (mặc định: false)
     
     Yêu cầu: API key trong header X-API-Key
     """
@@ -437,10 +666,25 @@ async def crawl_detail(
         supported_types = ", ".join(["'openai.com'", "'techcrunch.com'", "'anthropic.com'", "'adobe.com'"])
         raise HTTPException(status_code=400, detail=f"Type '{request.type}' không được hỗ trợ. Chỉ hỗ trợ: {supported_types}")
     
-    # Validate URL với validation function mới
+    # Validate URL với validation function mới (trước khi chuẩn hóa: URL sai format làm urlsplit lỗi)
     is_valid, error_msg = validate_url(request.url)
     if not is_valid:
         raise HTTPException(status_code=400, detail=f"URL không hợp lệ: {error_msg}")
+    # Chuẩn hóa URL (bỏ tracking params, fragment...) để cache và crawl cùng một URL
+    request.url = canonicalize_url(request.url)
+    
+    # Detail đã có trong cache (crawl trước đó hoặc prefetch) -> trả về ngay, không chạy spider
+    if not request.refresh:
+        cached = get_cached_detail(config["detail_spider"], request.url)
+        if cached:
+            return JSONResponse(content={
+                "success": True,
+                "type": request.type,
+                "url": request.url,
+                "count": 1,
+                "data": [cached],
+                "cached": True
+            })
     
     try:
         # Chạy scrapy command bằng subprocess
@@ -490,7 +734,9 @@ async def crawl_detail(
             "type": request.type,
             "url": request.url,
             "count": len(data) if data else 0,
-            "data": data
+            "data": data,
+            "cached": False,
+            "run_stats": get_latest_run_stats(config["detail_spider"])
         })
         
     except HTTPException:
@@ -499,6 +745,66 @@ async def crawl_detail(
         raise HTTPException(status_code=500, detail=f"Lỗi crawl: {str(e)}")
 
 
+@app.get("/api/run-stats")
+async def get_run_stats(
+    type: str = Query(..., description="Loại source (ví dụ: openai.com, techcrunch.com, anthropic.com, adobe.com)"),
+    limit: int = Query(20, ge=1, le=200, description="Số lần chạy gần nhất cho mỗi spider"),
+    api_key_verified: bool = Depends(verify_api_key_header)
+):
+    """
+    Lấy lịch sử chạy spider và xu hướng thời gian render theo source
+    Query params:
+    - type: Loại source
+    - limit: Số lần chạy gần nhất cho mỗi spider (listing và detail)
+    
+    Yêu cầu: API key trong header X-API-Key
+    """
+    config = get_source_config(type)
+    if not config:
+        supported_types = ", ".join(["'openai.com'", "'techcrunch.com'", "'anthropic.com'", "'adobe.com'"])
+        raise HTTPException(status_code=400, detail=f"Type '{type}' không được hỗ trợ. Chỉ hỗ trợ: {supported_types}")
+    
+    spiders = [config["listing_spider"], config["detail_spider"]]
+    try:
+        return JSONResponse(content={
+            "success": True,
+            "type": type,
+            "trends": run_history_store.get_trends(spiders, limit=limit),
+            "runs": run_history_store.get_runs(spiders, limit=limit)
+        })
+    except Exception as e:
+        logger.error(f"Lỗi khi đọc run stats: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Lỗi đọc run stats: {str(e)}")
+
+
+@app.get("/api/run-stats/{run_id}/pages")
+async def get_run_pages(
+    run_id: int,
+    api_key_verified: bool = Depends(verify_api_key_header)
+):
+    """
+    Lấy thời gian tải/render từng page của một lần chạy spider
+    (kèm thông tin thêm như số request bị chặn khi render)
+    
+    Yêu cầu: API key trong header X-API-Key
+    """
+    try:
+        pages = run_history_store.get_page_timings(run_id)
+    except Exception as e:
+        logger.error(f"Lỗi khi đọc page timings: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Lỗi đọc page timings: {str(e)}")
+    
+    if not pages:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy page timings cho run {run_id}")
+    
+    return JSONResponse(content={
+        "success": True,
+        "run_id": run_id,
+        "count": len(pages),
+        "pages": pages
+    })
+
+
 @app.get("/api/test-scheduler")
 async def test_scheduler(api_key_verified: bool = Depends(verify_api_key_header)):
     """
@@ -544,6 +850,7 @@ async def get_scheduler_status(api_key_verified: bool = Depends(verify_api_key_h
         return JSONResponse(content={
             "success": True,
             "scheduler": scheduler_status,
+            "leader": leader_election.status() if leader_election else None,
             "log_data": log_data,
             "next_listing": get_next_listing_to_run()
         })
@@ -552,6 +859,55 @@ async def get_scheduler_status(api_key_verified: bool = Depends(verify_api_key_h
         raise HTTPException(status_code=500, detail=f"Lỗi: {str(e)}")
 
 
+@app.get("/api/profiles")
+async def list_profiles(api_key_verified: bool = Depends(verify_api_key_header)):
+    """
+    Danh sách report profiling của spider và API (mới nhất trước)
+    Report của API worker hiện tại được ghi lại trước khi liệt kê
+    
+    Yêu cầu: API key trong header X-API-Key
+    """
+    if api_profiler is not None:
+        api_profiler.save()
+    
+    profiles_dir = get_profiles_dir(settings.PROFILES_DIR or None)
+    files = sorted(profiles_dir.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True) if profiles_dir.exists() else []
+    return JSONResponse(content={
+        "success": True,
+        "mode": api_profiler.mode if api_profiler is not None else None,
+        "count": len(files),
+        "profiles": [
+            {
+                "name": path.name,
+                "size": path.stat().st_size,
+                "modified_at": datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+            }
+            for path in files
+        ]
+    })
+
+
+@app.get("/api/profiles/{name}")
+async def download_profile(
+    name: str,
+    api_key_verified: bool = Depends(verify_api_key_header)
+):
+    """
+    Tải một report profiling (JSON) theo tên trong /api/profiles
+    
+    Yêu cầu: API key trong header X-API-Key
+    """
+    profiles_dir = get_profiles_dir(settings.PROFILES_DIR or None)
+    path = profiles_dir / name
+    # Chỉ cho phép tên file trong thư mục profiles (không có đường dẫn)
+    if Path(name).name != name or not name.endswith(".json") or not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy profile '{name}'")
+    
+    if api_profiler is not None and path == api_profiler.path:
+        api_profiler.save()
+    return FileResponse(path, media_type="application/json", filename=name)
+
+
 @app.get("/")
 async def root():
     return {
@@ -559,8 +915,12 @@ async def root():
         "endpoints": {
             "GET /api/listings?type={source}": "Lấy danh sách listings (source: openai.com, techcrunch.com, anthropic.com, adobe.com)",
             "POST /api/crawl-detail": "Crawl detail page (body: {type: 'openai.com'|'techcrunch.com'|'anthropic.com'|'adobe.com', url: '...'})",
+            "GET /api/run-stats?type={source}": "Lịch sử chạy spider và xu hướng thời gian render theo source",
+            "GET /api/run-stats/{run_id}/pages": "Thời gian render và số request bị chặn của từng page trong một run",
             "GET /api/test-scheduler": "Test scheduler thủ công (chạy check_and_run_listing ngay)",
-            "GET /api/scheduler-status": "Lấy trạng thái scheduler và log file"
+            "GET /api/scheduler-status": "Lấy trạng thái scheduler và log file",
+            "GET /api/profiles": "Danh sách report profiling (bật bằng MYCRAWLER_PROFILE=cpu|mem)",
+            "GET /api/profiles/{name}": "Tải một report profiling"
         },
         "supported_sources": ["openai.com", "techcrunch.com", "anthropic.com", "adobe.com"]
     }
@@ -618,5 +978,10 @@ if __name__ == "__main__":
         logger.warning(f"Port {port} đang được sử dụng, thử port {port + 1}")
         port = 8001
     
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    if settings.API_WORKERS > 1:
+        # Nhiều workers: scheduler chỉ chạy ở worker giữ leader lock (xem LeaderElection)
+        logger.info(f"Khởi động {settings.API_WORKERS} workers")
+        uvicorn.run("asgi:app", host="0.0.0.0", port=port, workers=settings.API_WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
 
@@ -44,6 +44,30 @@ class Settings:
         "openai.com,techcrunch.com,anthropic.com,adobe.com"
     ).split(",")
     
+    # Scheduler / Multi-worker Settings
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    SCHEDULER_LOCK_FILE: str = os.getenv(
+        "SCHEDULER_LOCK_FILE",
+        str(BASE_DIR / "mycrawler" / "data" / "scheduler.lock")
+    )
+    SCHEDULER_RUN_LOCK_FILE: str = os.getenv(
+        "SCHEDULER_RUN_LOCK_FILE",
+        str(BASE_DIR / "mycrawler" / "data" / "scheduler-run.lock")
+    )
+    SCHEDULER_LEADER_RETRY_SECONDS: float = float(os.getenv("SCHEDULER_LEADER_RETRY_SECONDS", "15"))
+    
+    # Detail Prefetch Settings (crawl trước detail của link mới sau mỗi lần chạy listing)
+    DETAIL_PREFETCH_ENABLED: bool = os.getenv("DETAIL_PREFETCH_ENABLED", "true").lower() == "true"
+    DETAIL_PREFETCH_BUDGET: int = int(os.getenv("DETAIL_PREFETCH_BUDGET", "10"))  # Số link tối đa mỗi lần
+    DETAIL_PREFETCH_TIMEOUT: int = int(os.getenv("DETAIL_PREFETCH_TIMEOUT", "900"))  # giây
+    # Link prefetch thất bại được thử lại sau RETRY_AFTER giây, gấp đôi sau mỗi lần, bỏ sau MAX_ATTEMPTS lần
+    DETAIL_PREFETCH_RETRY_AFTER: int = int(os.getenv("DETAIL_PREFETCH_RETRY_AFTER", "3600"))  # giây
+    DETAIL_PREFETCH_MAX_ATTEMPTS: int = int(os.getenv("DETAIL_PREFETCH_MAX_ATTEMPTS", "5"))
+    
+    # Profiling (MYCRAWLER_PROFILE=cpu|mem): profile route được chọn, spider chạy từ API cũng đọc biến này
+    MYCRAWLER_PROFILE: str = os.getenv("MYCRAWLER_PROFILE", "")
+    PROFILES_DIR: str = os.getenv("PROFILES_DIR", "")  # Mặc định: mycrawler/data/profiles
+    
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     SECURITY_LOG_ENABLED: bool = os.getenv("SECURITY_LOG_ENABLED", "true").lower() == "true"
@@ -0,0 +1,339 @@
+"""
+Load test cho API với latency p50/p95/p99, throughput và tỉ lệ lỗi theo endpoint
+
+App được chạy trong process (ASGI, không qua mạng) hoặc trên localhost (uvicorn trong thread
+riêng). Trong cả hai cách, subprocess của spider được thay bằng stub đợi --spider-seconds rồi ghi
+một item giả lập vào file output của detail spider. Thư mục mycrawler của app (file JSON của các
+lần chạy, output của spider) và các store (listing, detail, content hash, run history, kể cả store
+tạo khi import app) trỏ vào thư mục tạm được seed dữ liệu giả lập, nên load test không chạy spider
+thật, không đọc và không ghi data/. Với --base-url, request được gửi tới một server đang chạy
+(ví dụ staging) và không có gì bị stub.
+
+Scenario:
+- listings-hot: GET /api/listings của source có trong listing store
+- listings-cold: GET /api/listings của source chưa có trong listing store (đọc file JSON của lần chạy
+  gần nhất, được seed trong thư mục tạm)
+- rate-limited: một client gửi vượt RATE_LIMIT_PER_MINUTE, 429 là kết quả mong đợi
+- detail-burst: POST /api/crawl-detail đồng thời, --detail-cached phần trăm URL đã có trong detail cache
+
+Kết quả được in và ghi ra JSON (--output) để so sánh giữa các lần chạy.
+
+Chạy: python -m app.loadtest [--scenarios listings-hot,detail-burst] [--transport asgi|http]
+      [--concurrency 20] [--requests 500] [--output loadtest.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import httpx
+
+from app.config import settings
+
+# Source của từng scenario: hot được seed vào listing store, cold chỉ có file JSON
+HOT_SOURCE = "techcrunch.com"
+COLD_SOURCE = "anthropic.com"
+DETAIL_SOURCE = "techcrunch.com"
+
+DEFAULT_SCENARIOS = ("listings-hot", "listings-cold", "rate-limited", "detail-burst")
+
+
+def _load_api_module():
+    """Module app.py (bị package app/ che tên, được load qua asgi.py)"""
+    import asgi  # noqa: F401
+
+    return sys.modules["crawler_api"]
+
+
+class StubSpiderProcess:
+    """
+    Thay cho process `scrapy crawl`: đợi `seconds` rồi kết thúc thành công
+
+    Nếu có `output` (detail spider chạy với -a start_url=...), ghi item giả lập của `url` vào
+    file đó như feed của spider thật.
+    """
+
+    def __init__(self, seconds: float, output: Path = None, url: str = None):
+        self.seconds = seconds
+        self.output = output
+        self.url = url
+        self.returncode = None
+
+    async def communicate(self):
+        await asyncio.sleep(self.seconds)
+        if self.output is not None:
+            self.output.parent.mkdir(parents=True, exist_ok=True)
+            # Ghi file tạm rồi đổi tên để request đồng thời không đọc file đang ghi dở
+            partial = self.output.with_name(f"{self.output.name}.{id(self)}.tmp")
+            partial.write_text(json.dumps([_detail_item(self.url)]), encoding="utf-8")
+            partial.replace(self.output)
+        self.returncode = 0
+        return b"", b""
+
+    def kill(self):
+        self.returncode = -9
+
+
+def _listing_items(count: int) -> list:
+    return [
+        {
+            "title": f"Load test story {index}",
+            "link": f"https://techcrunch.com/2025/10/{index % 28 + 1:02d}/loadtest-story-{index}/",
+            "date": f"2025-10-{index % 28 + 1:02d}T10:00:00",
+            "description": None,
+            "authors": ["Load Tester"],
+        }
+        for index in range(count)
+    ]
+
+
+def detail_url(index: int) -> str:
+    return f"https://techcrunch.com/2025/10/01/loadtest-detail-{index}/"
+
+
+def _detail_item(url: str) -> dict:
+    return {"title": f"Load test detail {url}", "link": url, "content": "Lorem ipsum. " * 200}
+
+
+@contextmanager
+def isolated_app(data_dir: Path, spider_seconds: float, listing_items: int, detail_urls: int):
+    """
+    App với thư mục mycrawler và store trong `data_dir`, spider được stub; khôi phục khi thoát
+
+    Listing store có `listing_items` bài của HOT_SOURCE, file JSON listing của COLD_SOURCE có
+    `listing_items` bài, detail cache có `detail_urls` URL đầu tiên (detail_url(0..detail_urls-1)).
+    """
+    from mycrawler.mycrawler import detail_store, listing_store, near_duplicates, run_history
+
+    store_classes = {
+        "listing_store": (listing_store, listing_store.ListingStore, "listings.sqlite3"),
+        "detail_store": (detail_store, detail_store.DetailStore, "details.sqlite3"),
+        "content_hash_store": (near_duplicates, near_duplicates.ContentHashStore, "content_hashes.sqlite3"),
+        "run_history_store": (run_history, run_history.RunHistoryStore, "run_history.sqlite3"),
+    }
+    with ExitStack() as stack:
+        # Store mặc định (tạo khi import app.py) cũng nằm trong data_dir
+        for module, _, filename in store_classes.values():
+            stack.enter_context(mock.patch.object(module, "DEFAULT_DB_PATH", data_dir / filename))
+        api = _load_api_module()
+        stores = {name: store_cls(data_dir / filename) for name, (_, store_cls, filename) in store_classes.items()}
+
+        hot, cold, detail = (api.get_source_config(source) for source in (HOT_SOURCE, COLD_SOURCE, DETAIL_SOURCE))
+        stores["listing_store"].upsert_many(hot["listing_spider"], _listing_items(listing_items))
+        cold_file = data_dir / "data" / cold["data_dir"] / cold["listing_file"]
+        cold_file.parent.mkdir(parents=True, exist_ok=True)
+        cold_file.write_text(json.dumps(_listing_items(listing_items)), encoding="utf-8")
+        stores["detail_store"].save_many(detail["detail_spider"], [_detail_item(detail_url(index)) for index in range(detail_urls)])
+
+        # File output của từng detail spider (feed data/<Source>/<spider>.json, tương đối với cwd)
+        detail_outputs = {}
+        for source in api.SPIDER_TO_SOURCE.values():
+            config = api.get_source_config(source)
+            detail_outputs[config["detail_spider"]] = Path(config["data_dir"]) / config["detail_file"]
+
+        async def create_stub_process(*args, cwd=None, **kwargs):
+            spider = args[args.index("crawl") + 1] if "crawl" in args else None
+            url = next((arg[len("start_url="):] for arg in args if str(arg).startswith("start_url=")), None)
+            output = Path(cwd) / "data" / detail_outputs[spider] if spider in detail_outputs and url and cwd else None
+            return StubSpiderProcess(spider_seconds, output, url)
+
+        for name, store in stores.items():
+            stack.enter_context(mock.patch.object(api, name, store))
+        stack.enter_context(mock.patch.object(api, "MYCRAWLER_DIR", data_dir))
+        stack.enter_context(mock.patch.object(asyncio, "create_subprocess_exec", create_stub_process))
+        yield api.app
+
+
+@contextmanager
+def local_server(app, port: int):
+    """Chạy app bằng uvicorn trên 127.0.0.1:<port> trong thread riêng (không chạy lifespan/scheduler)"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Không khởi động được uvicorn trên cổng {port}")
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_request(scenario: str, index: int, run_id: int, args) -> dict:
+    """Request thứ `index` của scenario: method, path, params/json, header và status mong đợi"""
+    # Mỗi request một IP (X-Forwarded-For) để rate limit theo IP không ảnh hưởng scenario khác
+    client_ip = f"10.{run_id % 256}.{index // 256 % 256}.{index % 256}"
+    if scenario == "listings-hot":
+        request = {"method": "GET", "path": "/api/listings", "params": {"type": HOT_SOURCE, "limit": args.page_limit}}
+    elif scenario == "listings-cold":
+        request = {"method": "GET", "path": "/api/listings", "params": {"type": COLD_SOURCE, "limit": args.page_limit}}
+    elif scenario == "rate-limited":
+        client_ip = f"10.255.{run_id % 256}.1"
+        request = {"method": "GET", "path": "/api/listings", "params": {"type": HOT_SOURCE, "limit": args.page_limit}}
+        request["expected"] = (200, 429)
+    elif scenario == "detail-burst":
+        cached = index % 100 < args.detail_cached
+        url = detail_url(index % args.detail_urls) if cached else detail_url(args.detail_urls + index)
+        request = {"method": "POST", "path": "/api/crawl-detail", "json": {"type": DETAIL_SOURCE, "url": url}}
+    else:
+        raise ValueError(f"Scenario không hợp lệ: {scenario}")
+    request.setdefault("expected", (200,))
+    request["headers"] = {settings.API_KEY_HEADER: args.api_key, "X-Forwarded-For": client_ip}
+    return request
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """Percentile theo nearest-rank của danh sách đã sắp xếp"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(latencies_ms: list) -> dict:
+    values = sorted(latencies_ms)
+    return {
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "mean": round(sum(values) / len(values), 2) if values else 0.0,
+        "max": round(values[-1], 2) if values else 0.0,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, args, run_id: int) -> dict:
+    """Gửi --requests request của scenario với --concurrency worker đồng thời"""
+    requests = [build_request(scenario, index, run_id, args) for index in range(args.requests)]
+    pending = iter(requests)
+    results = []
+
+    async def worker():
+        for request in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.request(
+                    request["method"], request["path"],
+                    params=request.get("params"), json=request.get("json"), headers=request["headers"],
+                )
+                status, error = response.status_code, None
+            except Exception as e:
+                status, error = None, type(e).__name__
+            results.append({
+                "endpoint": f"{request['method']} {request['path']}",
+                "ms": (time.perf_counter() - start) * 1000,
+                "status": status,
+                "error": error or (None if status in request["expected"] else f"HTTP {status}"),
+            })
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    duration = time.perf_counter() - start
+
+    endpoints = {}
+    for endpoint in sorted({result["endpoint"] for result in results}):
+        endpoint_results = [result for result in results if result["endpoint"] == endpoint]
+        errors = Counter(result["error"] for result in endpoint_results if result["error"])
+        endpoints[endpoint] = {
+            "requests": len(endpoint_results),
+            "throughput_rps": round(len(endpoint_results) / duration, 1) if duration else 0.0,
+            "latency_ms": summarize([result["ms"] for result in endpoint_results]),
+            "status_counts": dict(Counter(str(result["status"]) for result in endpoint_results)),
+            "errors": dict(errors),
+            "error_rate": round(sum(errors.values()) / len(endpoint_results), 4),
+        }
+    return {
+        "scenario": scenario,
+        "requests": len(results),
+        "concurrency": args.concurrency,
+        "duration_s": round(duration, 3),
+        "endpoints": endpoints,
+    }
+
+
+async def run_all(base_url, transport, args) -> list:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=args.timeout) as client:
+        results = []
+        for run_id, scenario in enumerate(args.scenarios.split(","), start=random.randrange(256)):
+            results.append(await run_scenario(client, scenario, args, run_id))
+        return results
+
+
+def print_results(results: list) -> None:
+    print(f"{'scenario':<15} {'endpoint':<22} {'req':>6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'lỗi':>7}  status")
+    for result in results:
+        for endpoint, stats in result["endpoints"].items():
+            latency = stats["latency_ms"]
+            statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats["status_counts"].items()))
+            print(
+                f"{result['scenario']:<15} {endpoint:<22} {stats['requests']:>6} {stats['throughput_rps']:>8.1f}"
+                f" {latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} {stats['error_rate']:>7.1%}  {statuses}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS), help="Các scenario, cách nhau bởi dấu phẩy")
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi", help="asgi: trong process, http: uvicorn trên localhost")
+    parser.add_argument("--base-url", help="Gửi tới server đang chạy thay vì app trong process (không stub spider)")
+    parser.add_argument("--api-key", default=settings.API_KEY)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="Số request mỗi scenario")
+    parser.add_argument("--timeout", type=float, default=180, help="Timeout (giây) của mỗi request")
+    parser.add_argument("--page-limit", type=int, default=50, help="limit của /api/listings")
+    parser.add_argument("--listing-items", type=int, default=2000, help="Số bài seed vào listing store")
+    parser.add_argument("--detail-urls", type=int, default=200, help="Số URL đã có trong detail cache")
+    parser.add_argument("--detail-cached", type=int, default=80, help="Phần trăm request detail-burst trúng cache")
+    parser.add_argument("--spider-seconds", type=float, default=1.0, help="Thời gian chạy của spider stub")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    args = parser.parse_args()
+    # app.py bật log INFO cho mọi logger, httpx log từng request
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    started_at = datetime.now().isoformat()
+    if args.base_url:
+        results = asyncio.run(run_all(args.base_url, None, args))
+    else:
+        with tempfile.TemporaryDirectory(prefix="api-loadtest-") as tmp:
+            with isolated_app(Path(tmp), args.spider_seconds, args.listing_items, args.detail_urls) as app:
+                if args.transport == "asgi":
+                    results = asyncio.run(run_all("http://loadtest", httpx.ASGITransport(app=app), args))
+                else:
+                    with local_server(app, _free_port()) as base_url:
+                        results = asyncio.run(run_all(base_url, None, args))
+
+    print_results(results)
+    if args.output:
+        report = {
+            "started_at": started_at,
+            "target": args.base_url or args.transport,
+            "settings": {key: value for key, value in vars(args).items() if key not in ("api_key", "output")},
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nĐã ghi kết quả: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
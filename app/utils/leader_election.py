@@ -0,0 +1,171 @@
+"""
+Leader election cho scheduler khi chạy nhiều uvicorn workers trên cùng một host
+Dùng fcntl lock file: chỉ worker giữ lock mới chạy BackgroundScheduler,
+khi worker đó chết OS tự nhả lock và một worker khác sẽ tiếp quản
+"""
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows không có fcntl
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def _try_lock(path: Path) -> Optional[int]:
+    """
+    Thử lấy exclusive lock (non-blocking) trên file
+
+    Returns:
+        Optional[int]: File descriptor đang giữ lock, None nếu process khác đang giữ
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _release_lock(fd: int) -> None:
+    """Nhả lock và đóng file descriptor"""
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def try_file_lock(path: Path) -> Iterator[bool]:
+    """
+    Context manager lấy lock non-blocking, yield True nếu lấy được
+
+    Dùng để tránh chạy trùng một tác vụ giữa các worker (ví dụ test-scheduler thủ công
+    trùng với cron job của leader).
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    fd = _try_lock(path)
+    try:
+        yield fd is not None
+    finally:
+        if fd is not None:
+            _release_lock(fd)
+
+
+class LeaderElection:
+    """
+    Bầu leader giữa các process trên cùng host bằng fcntl lock file
+
+    Process lấy được lock là leader và gọi `on_elected`. Các process còn lại
+    thử lại định kỳ trong background thread, nên khi leader chết (lock tự nhả)
+    sẽ có process khác tiếp quản.
+    """
+
+    def __init__(self, lock_path: Path, on_elected: Callable[[], None], retry_interval: float = 15.0):
+        self.lock_path = Path(lock_path)
+        self.on_elected = on_elected
+        self.retry_interval = retry_interval
+        self._fd: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.elected_at: Optional[str] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """Process hiện tại có đang là leader không"""
+        return self.elected_at is not None
+
+    def start(self) -> None:
+        """Thử trở thành leader ngay, nếu không được thì chạy thread thử lại định kỳ"""
+        if fcntl is None:
+            logger.warning("fcntl không khả dụng trên hệ điều hành này, coi process hiện tại là leader (chỉ nên chạy 1 worker)")
+            self._become_leader()
+            return
+
+        if self._try_acquire():
+            return
+
+        logger.info(f"Worker pid={os.getpid()} là follower, sẽ thử lấy leader lock mỗi {self.retry_interval}s")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._retry_loop, name="scheduler-leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Dừng thread thử lại và nhả lock nếu đang là leader"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+        if self._fd is not None:
+            _release_lock(self._fd)
+            self._fd = None
+            logger.info(f"Worker pid={os.getpid()} đã nhả leader lock")
+        self.elected_at = None
+
+    def status(self) -> dict:
+        """Thông tin leader cho endpoint scheduler-status"""
+        return {
+            "pid": os.getpid(),
+            "is_leader": self.is_leader,
+            "elected_at": self.elected_at,
+            "leader": self._read_leader_info(),
+            "lock_file": str(self.lock_path),
+        }
+
+    def _retry_loop(self) -> None:
+        """Thử lấy lock định kỳ cho đến khi thành công hoặc bị stop"""
+        while not self._stop_event.wait(self.retry_interval):
+            if self._try_acquire():
+                return
+
+    def _try_acquire(self) -> bool:
+        """Thử lấy lock, nếu được thì ghi thông tin leader và gọi on_elected"""
+        try:
+            fd = _try_lock(self.lock_path)
+        except OSError as e:
+            logger.error(f"Lỗi mở lock file {self.lock_path}: {e}")
+            return False
+
+        if fd is None:
+            return False
+
+        self._fd = fd
+        # Ghi pid của leader vào lock file để các worker khác đọc được
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n".encode())
+        self._become_leader()
+        return True
+
+    def _become_leader(self) -> None:
+        """Đánh dấu leader và khởi động scheduler"""
+        self.elected_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        logger.info(f"Worker pid={os.getpid()} trở thành scheduler leader")
+        try:
+            self.on_elected()
+        except Exception as e:
+            logger.error(f"Lỗi khi khởi động scheduler sau khi được bầu làm leader: {e}", exc_info=True)
+
+    def _read_leader_info(self) -> Optional[dict]:
+        """Đọc pid và thời điểm được bầu của leader hiện tại từ lock file"""
+        try:
+            content = self.lock_path.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        if not content:
+            return None
+
+        pid, _, elected_at = content.partition(" ")
+        return {"pid": int(pid) if pid.isdigit() else pid, "elected_at": elected_at or None}
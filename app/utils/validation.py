@@ -37,6 +37,9 @@ def validate_url(url: str) -> Tuple[bool, Optional[str]]:
         if not parsed.netloc:
             return False, "URL không hợp lệ: thiếu domain"
         
+        # Port phải là số trong khoảng 0-65535 (parsed.port raise ValueError nếu không)
+        parsed.port
+        
         # Kiểm tra domain whitelist (nếu có)
         if settings.ALLOWED_DOMAINS and settings.ALLOWED_DOMAINS[0]:
             allowed_domains = [d.strip().lower() for d in settings.ALLOWED_DOMAINS if d.strip()]
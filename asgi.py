@@ -0,0 +1,19 @@
+"""
+ASGI entrypoint để chạy nhiều uvicorn workers
+`uvicorn --workers N` cần import string, nhưng module app.py bị package app/ che tên,
+nên load app.py theo đường dẫn file
+
+Sử dụng: uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+_APP_FILE = Path(__file__).parent / "app.py"
+
+_spec = importlib.util.spec_from_file_location("crawler_api", _APP_FILE)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules["crawler_api"] = _module
+_spec.loader.exec_module(_module)
+
+app = _module.app
@@ -0,0 +1,4 @@
+"""
+Benchmark chạy offline trên các file dữ liệu trong data/
+Chạy từ thư mục mycrawler: python -m benchmarks.<tên module>
+"""
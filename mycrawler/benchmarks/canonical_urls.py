@@ -0,0 +1,138 @@
+"""
+Benchmark chuẩn hóa URL trên các file listing/detail đã crawl
+
+So sánh dedupe và tỉ lệ cache hit khi dùng link thô với khi dùng `url_key`:
+- dedupe: số link duy nhất trong từng source và khi gộp tất cả source
+  (listing Adobe và TechCrunch đều là URL techcrunch.com)
+- cache hit: tra cứu detail cache bằng các biến thể thường gặp của link đã cache
+  (tracking params, fragment, www., dấu / ở cuối, chữ hoa ở host)
+- thời gian chuẩn hóa mỗi URL
+
+Chạy: cd mycrawler && python -m benchmarks.canonical_urls [--data-dir data] [--json]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from mycrawler.canonical import url_key
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def load_links(data_dir: Path, kind: str) -> dict:
+    """Đọc link của các file '*-<kind>.json' theo source (tên thư mục)"""
+    links = {}
+    for path in sorted(data_dir.glob(f"*/*-{kind}.json")):
+        try:
+            items = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        links.setdefault(path.parent.name, []).extend(
+            item["link"] for item in items if isinstance(item, dict) and item.get("link")
+        )
+    return links
+
+
+def url_variants(url: str) -> list:
+    """Các biến thể của cùng một URL mà API và listing thường nhận được"""
+    parts = urlsplit(url)
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else f"www.{parts.netloc}"
+    path = parts.path.rstrip("/") if parts.path.endswith("/") else f"{parts.path}/"
+    return [
+        url,
+        f"{url}?utm_source=twitter&utm_medium=social",
+        f"{url}#comments",
+        urlunsplit((parts.scheme, host, parts.path, parts.query, "")),
+        urlunsplit((parts.scheme, parts.netloc, path, parts.query, "")),
+        urlunsplit((parts.scheme, parts.netloc.upper(), parts.path, parts.query, "")),
+    ]
+
+
+def dedupe_stats(links: dict) -> dict:
+    """Số link thô và số link duy nhất (thô / theo url_key) của từng source và tổng"""
+    stats = {}
+    for source, source_links in links.items():
+        stats[source] = {
+            "links": len(source_links),
+            "unique_raw": len(set(source_links)),
+            "unique_canonical": len({url_key(link) for link in source_links}),
+        }
+    all_links = [link for source_links in links.values() for link in source_links]
+    stats["all_sources"] = {
+        "links": len(all_links),
+        "unique_raw": len(set(all_links)),
+        "unique_canonical": len({url_key(link) for link in all_links}),
+    }
+    return stats
+
+
+def cache_hit_stats(details: dict) -> dict:
+    """Tỉ lệ cache hit khi tra detail cache bằng các biến thể của link đã cache"""
+    cached_raw = {link for source_links in details.values() for link in source_links}
+    cached_keys = {url_key(link) for link in cached_raw}
+    lookups = [variant for link in cached_raw for variant in url_variants(link)]
+    hits_raw = sum(1 for url in lookups if url in cached_raw)
+    hits_canonical = sum(1 for url in lookups if url_key(url) in cached_keys)
+    total = len(lookups) or 1
+    return {
+        "lookups": len(lookups),
+        "hit_rate_raw": round(hits_raw / total, 3),
+        "hit_rate_canonical": round(hits_canonical / total, 3),
+    }
+
+
+def timing_stats(links: list, repeat: int = 20) -> dict:
+    """Thời gian trung bình của url_key cho mỗi URL (micro giây)"""
+    if not links:
+        return {"urls": 0, "us_per_url": 0.0}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for link in links:
+            url_key(link)
+    elapsed = time.perf_counter() - start
+    return {"urls": len(links), "us_per_url": round(elapsed / (repeat * len(links)) * 1e6, 2)}
+
+
+def run(data_dir: Path) -> dict:
+    listings = load_links(data_dir, "listing")
+    details = load_links(data_dir, "detail")
+    # Link của listing cũng là các URL mà crawl_detail sẽ nhận
+    lookup_pool = {source: details.get(source, []) + listings.get(source, []) for source in listings}
+    all_links = [link for source_links in listings.values() for link in source_links]
+    return {
+        "dedupe": dedupe_stats(listings),
+        "cache": cache_hit_stats(lookup_pool),
+        "timing": timing_stats([variant for link in all_links for variant in url_variants(link)]),
+    }
+
+
+def print_report(report: dict) -> None:
+    print("Dedupe listing (links / unique raw / unique canonical)")
+    for source, stats in report["dedupe"].items():
+        print(f"  {source:<12} {stats['links']:>6} {stats['unique_raw']:>6} {stats['unique_canonical']:>6}")
+    cache = report["cache"]
+    print(
+        f"Detail cache: {cache['lookups']} lookups, hit rate raw {cache['hit_rate_raw']:.1%}"
+        f" -> canonical {cache['hit_rate_canonical']:.1%}"
+    )
+    timing = report["timing"]
+    print(f"url_key: {timing['us_per_url']} µs/URL ({timing['urls']} URL)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--json", action="store_true", help="In kết quả dạng JSON")
+    args = parser.parse_args()
+
+    report = run(args.data_dir)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
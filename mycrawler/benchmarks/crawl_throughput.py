@@ -0,0 +1,137 @@
+"""
+Đo throughput crawl trên site giả lập (benchmarks/mock_site.py) theo CONCURRENT_REQUESTS và số page
+của browser (PLAYWRIGHT_MAX_PAGES_PER_CONTEXT)
+
+Mỗi tổ hợp chạy `scrapy crawl` trong một process riêng, trỏ spider vào site giả lập (listing qua
+start_url với backfill, detail qua urls_file). Các store SQLite và feed output được ghi vào thư mục
+tạm nên không ảnh hưởng dữ liệu thật. Kết quả:
+- items/phút: item_scraped_count / elapsed của run (từ run history của lần chạy)
+- CPU s: thời gian CPU (user + sys) của process crawl và các process con đã kết thúc (driver, Chromium)
+- RSS MB: RSS lớn nhất của một process trong số đó
+
+Chạy: cd mycrawler && python -m benchmarks.crawl_throughput [--spiders techcrunch-listing,techcrunch-detail]
+      [--concurrency 1,8,32] [--browser-pages 1,4] [--articles 10000] [--latency-ms 100]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.mock_site import SOURCES, MockSite, make_server, write_urls_files
+from mycrawler.run_history import RunHistoryStore
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Setting của các store SQLite, ghi vào thư mục tạm của lần benchmark
+STORE_SETTINGS = {
+    "RUN_HISTORY_DB": "run_history.sqlite3",
+    "SEEN_URLS_DB": "seen_urls.sqlite3",
+    "NEAR_DUPLICATES_DB": "content_hashes.sqlite3",
+    "LISTING_STORE_DB": "listings.sqlite3",
+    "DETAIL_STORE_DB": "details.sqlite3",
+    "EXTRACTION_STATS_DB": "extraction_stats.sqlite3",
+}
+
+
+def spider_args(site, base_url, spider, urls_files) -> list:
+    """Argument `-a` để spider crawl site giả lập"""
+    if spider in urls_files:
+        return ["-a", f"urls_file={urls_files[spider]}"]
+    for source, config in SOURCES.items():
+        if config["listing_spider"] == spider:
+            return ["-a", f"start_url={site.listing_url(base_url, source)}", "-a", "backfill=1", "-a", f"max_pages={site.pages}"]
+    raise ValueError(f"Spider không có trên site giả lập: {spider}")
+
+
+def run_crawl(spider, args, concurrency, browser_pages, work_dir) -> dict:
+    """Chạy một lần crawl, trả về thời gian, số item, CPU và bộ nhớ"""
+    output = work_dir / f"{spider}-c{concurrency}-p{browser_pages}.json"
+    command = [
+        sys.executable, "-m", "scrapy", "crawl", spider, "-O", str(output),
+        "-s", f"CONCURRENT_REQUESTS={concurrency}",
+        "-s", f"CONCURRENT_REQUESTS_PER_DOMAIN={concurrency}",
+        "-s", "DOWNLOAD_DELAY=0",
+        "-s", f"PLAYWRIGHT_MAX_PAGES_PER_CONTEXT={browser_pages}",
+        "-s", "LOG_LEVEL=ERROR",
+    ]
+    for name, filename in STORE_SETTINGS.items():
+        command += ["-s", f"{name}={work_dir / filename}"]
+    command += args
+
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=BASE_DIR)
+    _, status, usage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    run = RunHistoryStore(work_dir / STORE_SETTINGS["RUN_HISTORY_DB"]).get_latest_run(spider) or {}
+    items = run.get("item_scraped_count") or 0
+    elapsed = run.get("elapsed_seconds") or wall
+    return {
+        "spider": spider,
+        "concurrency": concurrency,
+        "browser_pages": browser_pages,
+        "exit_code": process.returncode,
+        "items": items,
+        "responses": run.get("response_count") or 0,
+        "elapsed_s": round(elapsed, 2),
+        "items_per_min": round(items / elapsed * 60, 1) if elapsed else 0.0,
+        "avg_page_s": run.get("avg_page_seconds"),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 2),
+        # ru_maxrss tính bằng KB trên Linux
+        "rss_mb": round(usage.ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spiders", default="techcrunch-listing,techcrunch-detail", help="Các spider, cách nhau bởi dấu phẩy")
+    parser.add_argument("--concurrency", default="1,8,32", help="Các giá trị CONCURRENT_REQUESTS")
+    parser.add_argument("--browser-pages", default="4", help="Các giá trị PLAYWRIGHT_MAX_PAGES_PER_CONTEXT")
+    parser.add_argument("--articles", type=int, default=10_000, help="Số bài mỗi source của site giả lập")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--detail-urls", type=int, default=500, help="Số URL detail mỗi lần chạy detail spider")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--json", help="Ghi kết quả ra file JSON")
+    args = parser.parse_args()
+
+    site = MockSite(articles=args.articles, page_size=args.page_size)
+    server = make_server(site, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="crawl-throughput-") as tmp:
+            work_dir = Path(tmp)
+            urls_files = write_urls_files(site, base_url, work_dir, limit=args.detail_urls)
+            print(f"{'spider':<20} {'conc':>5} {'pages':>5} {'items':>7} {'resp':>7} {'giây':>8} {'items/phút':>11} {'CPU s':>7} {'RSS MB':>7}")
+            for spider in args.spiders.split(","):
+                crawl_args = spider_args(site, base_url, spider, urls_files)
+                for concurrency in (int(value) for value in args.concurrency.split(",")):
+                    for browser_pages in (int(value) for value in args.browser_pages.split(",")):
+                        result = run_crawl(spider, crawl_args, concurrency, browser_pages, work_dir)
+                        results.append(result)
+                        print(
+                            f"{spider:<20} {concurrency:>5} {browser_pages:>5} {result['items']:>7} {result['responses']:>7}"
+                            f" {result['elapsed_s']:>8.1f} {result['items_per_min']:>11.1f} {result['cpu_s']:>7.1f} {result['rss_mb']:>7.1f}"
+                            + (f"  (exit {result['exit_code']})" if result["exit_code"] else "")
+                        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nĐã ghi kết quả: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark throughput của engine trích xuất dùng chung so với cách trích xuất cũ (mỗi field một chuỗi
+`response.css(...)`, xem selector_baseline.py) trên các page đã lưu
+
+Page: các file HTML trong debug_output/ (hoặc --pages), cộng các bài viết tổng hợp (cỡ một bài
+TechCrunch, một bài dài và một bài lồng rất sâu) để có số liệu cho detail page. Cả hai cách dùng rule của TechCrunch.
+Cột 'học' là engine với thứ tự strategy đã học (AdaptiveExtractor, strategy thắng lấy từ chính page).
+Cột 'khác' liệt kê các field cho kết quả khác nhau giữa cách cũ và engine.
+
+Chạy: cd mycrawler && python -m benchmarks.extraction_throughput [--pages 'dir/*.html'] [--repeat 50]
+"""
+import argparse
+import glob
+import logging
+import statistics
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+
+from benchmarks.selector_baseline import SelectorBaseline
+from mycrawler.extraction import AdaptiveExtractor, ArticleExtractor, get_extraction_rules
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_PAGES = str(BASE_DIR / "debug_output" / "*.html")
+PAGE_URL = "https://techcrunch.com/2025/11/06/benchmark-article/"
+
+
+def synthetic_article(paragraphs: int = 40) -> str:
+    """Bài viết tổng hợp: header/nav, byline, nội dung có ảnh, tags và footer"""
+    nav = "".join(f'<li><a href="/category/c{i}/">Category {i}</a></li>' for i in range(30))
+    body = "".join(
+        f"<p>Paragraph {i} of the article body with <a href='/l{i}'>a link</a> and some more words to read.</p>"
+        + (f'<figure><img data-src="/img/{i}.jpg"><figcaption>Caption {i}</figcaption></figure>' if i % 8 == 0 else "")
+        for i in range(paragraphs)
+    )
+    tags = "".join(f'<a class="tag-link" href="/tag/t{i}/">Tag {i}</a>' for i in range(6))
+    footer = "".join(f'<div class="related"><a href="/r{i}">Related {i}</a></div>' for i in range(40))
+    return (
+        "<html><head><title>Benchmark article | TechCrunch</title>"
+        '<meta property="og:image" content="/img/hero.jpg"><meta name="description" content="Benchmark">'
+        f"</head><body><header><nav><ul>{nav}</ul></nav></header><article><h1>Benchmark article</h1>"
+        '<div class="byline"><a class="author-link" href="/author/a/">Author Name</a></div>'
+        '<time datetime="2025-11-06T10:00:00Z">Nov 6, 2025</time>'
+        f'<div class="entry-content">{body}</div><div class="tags">{tags}</div></article>'
+        f"<footer>{footer}</footer></body></html>"
+    )
+
+
+def deeply_nested_article(depth: int = 1500) -> str:
+    """Bài viết bọc trong `depth` thẻ div lồng nhau (page builder), vượt giới hạn đệ quy của Python"""
+    body = "".join(f"<p>Paragraph {i} of a deeply nested article body.</p>" for i in range(10))
+    return (
+        "<html><head><title>Nested article | TechCrunch</title></head><body><article><h1>Nested article</h1>"
+        f'<div class="entry-content">{"<div>" * depth}{body}{"</div>" * depth}</div></article></body></html>'
+    )
+
+
+def load_pages(pattern: str) -> dict:
+    pages = {Path(path).name: Path(path).read_bytes() for path in sorted(glob.glob(pattern))}
+    pages["synthetic-article"] = synthetic_article().encode("utf-8")
+    pages["synthetic-long-article"] = synthetic_article(paragraphs=400).encode("utf-8")
+    pages["synthetic-deep-nesting"] = deeply_nested_article().encode("utf-8")
+    return pages
+
+
+def time_extract(extract, body: bytes, repeat: int) -> float:
+    """Thời gian median (ms) cho mỗi page, tính cả parse HTML như trong spider"""
+    timings = []
+    for _ in range(repeat):
+        response = HtmlResponse(url=PAGE_URL, body=body, encoding="utf-8")
+        start = time.perf_counter()
+        extract(response)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(pattern: str, repeat: int) -> list:
+    spider = SimpleNamespace(name="techcrunch-detail", settings=Settings())
+    rules = get_extraction_rules(spider)
+    engine = ArticleExtractor(rules)
+    baseline = SelectorBaseline()
+
+    results = []
+    for name, body in load_pages(pattern).items():
+        response = HtmlResponse(url=PAGE_URL, body=body, encoding="utf-8")
+        expected = baseline.extract(response)
+        actual, strategies = engine.extract_with_strategies(response)
+        learned = AdaptiveExtractor(rules, {field: strategy for field, strategy in strategies.items() if strategy})
+        results.append({
+            "page": name,
+            "kb": round(len(body) / 1024, 1),
+            "baseline_ms": time_extract(baseline.extract, body, repeat),
+            "engine_ms": time_extract(engine.extract, body, repeat),
+            "learned_ms": time_extract(learned.extract, body, repeat),
+            "diff": [field for field in expected if expected[field] != actual.get(field)],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default=DEFAULT_PAGES, help="Glob các file HTML đã lưu")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    # Log của baseline (không tìm thấy container...) làm rối bảng kết quả
+    logging.getLogger("benchmarks").setLevel(logging.ERROR)
+
+    print(f"{'page':<28} {'KB':>7} {'baseline ms':>12} {'engine ms':>10} {'học ms':>8} {'speedup':>8}  khác")
+    for result in run(args.pages, args.repeat):
+        speedup = result["baseline_ms"] / result["engine_ms"] if result["engine_ms"] else 0
+        print(
+            f"{result['page']:<28} {result['kb']:>7} {result['baseline_ms']:>12.2f} {result['engine_ms']:>10.2f}"
+            f" {result['learned_ms']:>8.2f}"
+            f" {speedup:>7.1f}x  {', '.join(result['diff']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
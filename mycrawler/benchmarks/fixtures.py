@@ -0,0 +1,204 @@
+"""
+Tạo HTML fixture cho benchmark parse (benchmarks/parse_suite.py) từ các feed output thật trong data/
+
+Mỗi source có một listing page (các item của feed listing, dựng theo cấu trúc HTML mà listing
+spider của source đọc) và một detail page (item của feed detail: title, meta, byline, content với
+ảnh đúng vị trí {{IMAGE_n}}), cùng header/nav/footer như page thật. Page đã lưu trong
+debug_output/ được thêm vào manifest như một fixture thật.
+
+Chạy: cd mycrawler && python -m benchmarks.fixtures
+"""
+import html
+import json
+import shutil
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+MANIFEST = FIXTURES_DIR / "manifest.json"
+
+# Page đã lưu từ crawl thật: (file, spider, url)
+CAPTURED_PAGES = [
+    ("debug_output/adobe_news_page.html", "adobe-com-detail", "https://news.adobe.com/news/2025/10/adobe-max-2025-news"),
+]
+
+SOURCES = {
+    "techcrunch": {
+        "dir": "TechCrunch",
+        "listing_spider": "techcrunch-listing",
+        "detail_spider": "techcrunch-detail",
+        "listing_url": "https://techcrunch.com/category/artificial-intelligence/",
+        "site_name": "TechCrunch",
+    },
+    "adobe-com": {
+        "dir": "Adobe",
+        "listing_spider": "adobe-com-listing",
+        "detail_spider": "adobe-com-detail",
+        "listing_url": "https://techcrunch.com/tag/adobe/",
+        "site_name": "Adobe Newsroom",
+    },
+    "anthropic": {
+        "dir": "Anthropic",
+        "listing_spider": "anthropic-listing",
+        "detail_spider": "anthropic-detail",
+        "listing_url": "https://www.anthropic.com/news",
+        "site_name": "Anthropic",
+    },
+    "openai-com": {
+        "dir": "OpenAI",
+        "listing_spider": "openai-com-listing",
+        "detail_spider": "openai-com-detail",
+        "listing_url": "https://openai.com/research/index/",
+        "site_name": "OpenAI",
+    },
+}
+
+
+def _e(value) -> str:
+    return html.escape(str(value or ""), quote=True)
+
+
+def _page(title: str, head: str, body: str) -> str:
+    nav = "".join(f'<li><a href="/section-{i}/">Section {i}</a></li>' for i in range(25))
+    footer = "".join(f'<li><a href="/legal/page-{i}/">Footer link {i}</a></li>' for i in range(30))
+    return (
+        f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{_e(title)}</title>{head}'
+        '<script>window.dataLayer = window.dataLayer || [];</script></head>'
+        f'<body><header class="site-header"><nav><ul class="menu">{nav}</ul></nav></header>'
+        f'{body}<footer class="site-footer"><ul>{footer}</ul></footer></body></html>'
+    )
+
+
+def _authors(item) -> list:
+    return item.get("authors") or []
+
+
+def render_techcrunch_listing(items, site_name) -> str:
+    """Cấu trúc loop-card của TechCrunch (link trong h3, author/time trong hàng meta)"""
+    cards = []
+    for item in items:
+        authors = "".join(
+            f'<a class="loop-card__author" href="/author/{_e(name.lower().replace(" ", "-"))}/">{_e(name)}</a>'
+            for name in _authors(item)
+        )
+        cards.append(
+            '<li class="wp-block-post"><div class="loop-card"><div class="loop-card__content">'
+            f'<span class="loop-card__cat"><a href="/category/ai/">AI</a></span>'
+            f'<h3 class="loop-card__title"><a class="loop-card__title-link" href="{_e(item["link"])}">{_e(item["title"])}</a></h3>'
+            f'<div class="loop-card__meta"><div class="loop-card__author-list">{authors}</div>'
+            f'<time datetime="{_e(item.get("date"))}">{_e(item.get("date"))}</time></div></div></div></li>'
+        )
+    body = f'<main><h1>{_e(site_name)}</h1><ul class="wp-block-post-template">{"".join(cards)}</ul></main>'
+    return _page(f"Latest | {site_name}", "", body)
+
+
+def render_anthropic_listing(items, site_name) -> str:
+    """Card dạng link bao toàn bộ (title + ngày) như trang /news của Anthropic"""
+    cards = "".join(
+        f'<a class="PostCard" href="{_e(item["link"])}"><div class="PostCard_content">'
+        f'<h3 class="PostCard_title">{_e(item["title"])}</h3>'
+        f'<div class="PostCard_meta"><span class="PostCard_category">Announcements</span>'
+        f'<div class="PostCard_date">{_e(item.get("date"))}</div></div></div></a>'
+        for item in items
+    )
+    body = f'<main><h1>Newsroom</h1><div class="PostList">{cards}</div></main>'
+    return _page(f"Newsroom \\ {site_name}", "", body)
+
+
+def render_openai_listing(items, site_name) -> str:
+    """Hàng kết quả của research index: <time> đứng trước link trong cùng container"""
+    rows = "".join(
+        f'<div class="ResearchRow"><time datetime="{_e(item.get("date"))}">{_e(item.get("date"))}</time>'
+        f'<a href="{_e(item["link"].replace("https://openai.com", ""))}"><span>{_e(item["title"])}</span></a>'
+        '<span class="ResearchRow_tag">Publication</span></div>'
+        for item in items
+    )
+    body = f'<main><h1>Research index</h1><div class="ResearchList">{rows}</div></main>'
+    return _page(f"Research index | {site_name}", "", body)
+
+
+def render_detail(item, site_name) -> str:
+    """Detail page: meta/og, byline, content (mỗi đoạn một <p>, {{IMAGE_n}} thành ảnh) và tags"""
+    images = item.get("images") or []
+    featured = images[0] if images and "{{IMAGE_0}}" in (item.get("content") or "") else None
+    blocks = []
+    for paragraph in (item.get("content") or "").split("\n\n"):
+        paragraph = paragraph.strip()
+        if paragraph.startswith("{{IMAGE_") and paragraph.endswith("}}"):
+            index = int(paragraph[len("{{IMAGE_"):-2])
+            if index == 0 or index >= len(images):
+                continue
+            blocks.append(f'<figure class="wp-block-image"><img src="{_e(images[index])}" alt=""></figure>')
+        elif paragraph:
+            blocks.append(f"<p>{_e(paragraph)}</p>")
+
+    head = (
+        f'<meta name="description" content="{_e(item.get("description"))}">'
+        f'<meta property="og:title" content="{_e(item["title"])}">'
+        + (f'<meta property="og:image" content="{_e(featured)}">' if featured else "")
+    )
+    authors = "".join(f'<a class="author-link" href="/author/a{i}/">{_e(name)}</a>' for i, name in enumerate(_authors(item)))
+    tags = "".join(f'<a class="tag-link" href="/tag/t{i}/">{_e(tag)}</a>' for i, tag in enumerate(item.get("tags") or []))
+    date = f'<time datetime="{_e(item["date"])}">{_e(item["date"])}</time>' if item.get("date") else ""
+    related = "".join(f'<li><a href="/related/{i}/">Related story {i}</a></li>' for i in range(12))
+    body = (
+        f'<main><article><header><h1>{_e(item["title"])}</h1><div class="byline">{authors}</div>{date}</header>'
+        f'<div class="entry-content article-content">{"".join(blocks)}</div>'
+        f'<div class="tags">{tags}</div></article><aside class="related"><ul>{related}</ul></aside></main>'
+    )
+    return _page(f"{item['title']} | {site_name}", head, body)
+
+
+LISTING_RENDERERS = {
+    "techcrunch": render_techcrunch_listing,
+    "adobe-com": render_techcrunch_listing,
+    "anthropic": render_anthropic_listing,
+    "openai-com": render_openai_listing,
+}
+
+
+def build_fixtures() -> list:
+    """Ghi các fixture và manifest, trả về manifest"""
+    if FIXTURES_DIR.exists():
+        shutil.rmtree(FIXTURES_DIR)
+    FIXTURES_DIR.mkdir(parents=True)
+
+    manifest = []
+    for source, config in SOURCES.items():
+        for kind in ("listing", "detail"):
+            spider = config[f"{kind}_spider"]
+            feed = DATA_DIR / config["dir"] / f"{spider}.json"
+            if not feed.exists():
+                continue
+            items = json.loads(feed.read_text(encoding="utf-8"))
+            if not items:
+                continue
+            if kind == "listing":
+                page, url = LISTING_RENDERERS[source](items, config["site_name"]), config["listing_url"]
+            else:
+                page, url = render_detail(items[0], config["site_name"]), items[0]["link"]
+            name = f"{source}-{kind}.html"
+            (FIXTURES_DIR / name).write_text(page, encoding="utf-8")
+            manifest.append({"file": name, "spider": spider, "url": url})
+
+    for path, spider, url in CAPTURED_PAGES:
+        source_path = BASE_DIR / path
+        if source_path.exists():
+            name = f"captured-{source_path.name}"
+            shutil.copyfile(source_path, FIXTURES_DIR / name)
+            manifest.append({"file": name, "spider": spider, "url": url})
+
+    MANIFEST.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main():
+    manifest = build_fixtures()
+    for entry in manifest:
+        size = (FIXTURES_DIR / entry["file"]).stat().st_size
+        print(f"{entry['file']:<40} {entry['spider']:<22} {size / 1024:>7.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark tìm date/author trên listing page: ListingIndex (một lần duyệt DOM + tra dict) so với
+các query XPath lên tổ tiên cho từng link (xem ListingSelectorBaseline trong selector_baseline.py)
+
+Page là trang infinite scroll tổng hợp với N card. Layout 'flat': link, <time> và author là anh em
+trong card. Layout 'nested': link nằm trong <h3>, <time>/author nằm trong hàng meta riêng, nên cách
+cũ phải dò lên tổ tiên xa (và lấy nhầm date của card đầu tiên). Thời gian không tính parse HTML.
+
+Chạy: cd mycrawler && python -m benchmarks.listing_index [--cards 100,1000,3000] [--layout nested]
+"""
+import argparse
+import time
+
+from scrapy.http import HtmlResponse
+
+from benchmarks.selector_baseline import ListingSelectorBaseline
+from mycrawler.listing_index import ListingIndex
+
+PAGE_URL = "https://techcrunch.com/category/artificial-intelligence/"
+
+
+def infinite_scroll_page(cards: int, layout: str = "flat") -> str:
+    """Listing page với `cards` bài, mỗi bài có link, ngày (khác nhau) và author"""
+    items = []
+    for i in range(cards):
+        link = f'<a href="/2025/{i % 12 + 1:02d}/{i % 28 + 1:02d}/story-{i}/">Story number {i}</a>'
+        date = f'<time datetime="2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T10:00:00Z">Day {i}</time>'
+        author = f'<span class="loop-card__author"><a href="/author/writer-{i % 7}/">Writer {i % 7}</a></span>'
+        if layout == "nested":
+            items.append(
+                f'<li class="loop-card"><div class="loop-card__content"><h3 class="loop-card__title">{link}</h3>'
+                f'<div class="loop-card__meta">{author}{date}</div></div></li>'
+            )
+        else:
+            items.append(f'<li class="loop-card">{link}{author}{date}</li>')
+    return (
+        "<html><body><header><nav><a href='/'>Home</a></nav></header><main><div class='river'>"
+        f"<ul class='loop'>{''.join(items)}</ul></div></main></body></html>"
+    )
+
+
+def run(cards: int, layout: str) -> dict:
+    response = HtmlResponse(url=PAGE_URL, body=infinite_scroll_page(cards, layout).encode("utf-8"), encoding="utf-8")
+    links = response.css("li.loop-card a[href*='/story-']")
+    baseline = ListingSelectorBaseline()
+
+    start = time.perf_counter()
+    expected = [
+        (baseline._extract_date_from_listing(link, response), baseline._extract_author_from_listing(link, response))
+        for link in links
+    ]
+    baseline_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    index = ListingIndex(response)
+    actual = [(index.date_for(link), index.author_for(link)) for link in links]
+    index_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "cards": cards,
+        "baseline_ms": baseline_ms,
+        "index_ms": index_ms,
+        "diff": sum(1 for old, new in zip(expected, actual) if old != new),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", default="100,1000,3000", help="Số card của mỗi page, cách nhau bởi dấu phẩy")
+    parser.add_argument("--layout", choices=("flat", "nested"), default="flat")
+    args = parser.parse_args()
+
+    print(f"{'cards':>6} {'baseline ms':>12} {'index ms':>9} {'speedup':>8} {'khác':>6}")
+    for cards in (int(value) for value in args.cards.split(",")):
+        result = run(cards, args.layout)
+        speedup = result["baseline_ms"] / result["index_ms"] if result["index_ms"] else 0
+        print(
+            f"{result['cards']:>6} {result['baseline_ms']:>12.1f} {result['index_ms']:>9.1f}"
+            f" {speedup:>7.1f}x {result['diff']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
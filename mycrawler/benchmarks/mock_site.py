@@ -0,0 +1,322 @@
+"""
+Site giả lập cục bộ để đo throughput crawl ở quy mô lớn (mặc định 10k bài mỗi source)
+
+Mỗi source có listing và detail page cùng cấu trúc HTML với fixture của benchmark parse
+(benchmarks/fixtures.py), nội dung bài sinh tất định theo số thứ tự bài:
+- techcrunch, adobe: listing phân trang /page/N/, link bài dạng /YYYY/MM/DD/slug/
+- anthropic: /news chỉ có trang đầu, các card tiếp theo được script thêm vào khi scroll
+- openai: /research/index/ tải danh sách bài từ JSON API (/api/research) như Next.js
+Mỗi request bị trễ --latency-ms (+ ngẫu nhiên tới --jitter-ms) để giả lập mạng.
+
+Spider trỏ vào site qua `-a start_url=...` (listing) hoặc `-a urls_file=...` (detail, xem
+--urls-dir). Xem benchmarks/crawl_throughput.py để đo items/phút, CPU và bộ nhớ.
+
+Chạy: cd mycrawler && python -m benchmarks.mock_site [--articles 10000] [--latency-ms 100] [--port 8900]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fixtures import (
+    render_anthropic_listing,
+    render_detail,
+    render_openai_listing,
+    render_techcrunch_listing,
+)
+
+# Cấu trúc URL của từng source trên site giả lập (prefix là source key)
+SOURCES = {
+    "techcrunch": {
+        "site_name": "TechCrunch",
+        "listing_spider": "techcrunch-listing",
+        "detail_spider": "techcrunch-detail",
+        "listing_path": "category/artificial-intelligence/",
+        "article_path": "{date:%Y/%m/%d}/{slug}/",
+    },
+    "adobe": {
+        "site_name": "Adobe Newsroom",
+        "listing_spider": "adobe-com-listing",
+        "detail_spider": "adobe-com-detail",
+        "listing_path": "tag/adobe/",
+        "article_path": "{date:%Y/%m/%d}/{slug}/",
+    },
+    "anthropic": {
+        "site_name": "Anthropic",
+        "listing_spider": "anthropic-listing",
+        "detail_spider": "anthropic-detail",
+        "listing_path": "news",
+        "article_path": "news/{slug}",
+    },
+    "openai": {
+        "site_name": "OpenAI",
+        "listing_spider": "openai-com-listing",
+        "detail_spider": "openai-com-detail",
+        "listing_path": "research/index/",
+        "article_path": "index/{slug}/",
+    },
+}
+
+# Bài mới nhất được đăng lúc LATEST_DATE, mỗi bài trước đó cách nhau HOURS_BETWEEN_POSTS giờ
+LATEST_DATE = datetime(2025, 10, 31, 9, 0, tzinfo=timezone.utc)
+HOURS_BETWEEN_POSTS = 3
+
+WORDS = (
+    "model training inference agents safety research release developers enterprise cloud data "
+    "benchmark latency throughput pipeline platform customers partners evaluation compute "
+    "open source reasoning multimodal product launch funding startup team infrastructure scale"
+).split()
+AUTHORS = ("Kyle Wiggers", "Maxwell Zeff", "Sarah Perez", "Anthony Ha", "Ingrid Lunden", "Rebecca Bellan")
+TAGS = ("AI", "Enterprise", "Startups", "Research", "Cloud", "Security", "Developers")
+
+# Script thêm card khi scroll (Anthropic): tải fragment HTML tiếp theo khi tới cuối trang
+INFINITE_SCROLL_SCRIPT = """<script>
+(function () {
+  var offset = %d, total = %d, size = %d, loading = false;
+  window.addEventListener('scroll', function () {
+    if (loading || offset >= total) return;
+    if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+    loading = true;
+    fetch('/anthropic/news/more?offset=' + offset).then(function (r) { return r.text(); }).then(function (html) {
+      document.querySelector('.PostList').insertAdjacentHTML('beforeend', html);
+      offset += size;
+      loading = false;
+    });
+  });
+})();
+</script>"""
+
+# Script tải danh sách bài từ JSON API (OpenAI)
+JSON_LISTING_SCRIPT = "<script>fetch('/openai/api/research').then(function (r) { return r.json(); });</script>"
+
+# GIF 1x1 cho mọi ảnh
+PIXEL_GIF = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+
+class MockSite:
+    """
+    Nội dung của site giả lập: `articles` bài mỗi source, listing `page_size` bài mỗi trang
+
+    Bài thứ i (0 là mới nhất) luôn có cùng title, ngày, author, content và ảnh, nên các lần
+    chạy benchmark crawl cùng một nội dung.
+    """
+
+    def __init__(self, articles=10_000, page_size=20, paragraphs=12):
+        self.articles = articles
+        self.page_size = page_size
+        self.paragraphs = paragraphs
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.articles // self.page_size))
+
+    def article_url(self, base_url, source, index) -> str:
+        path = SOURCES[source]["article_path"].format(date=self._date(index), slug=f"story-{index}")
+        return f"{base_url}/{source}/{path}"
+
+    def listing_url(self, base_url, source) -> str:
+        return f"{base_url}/{source}/{SOURCES[source]['listing_path']}"
+
+    def _date(self, index) -> datetime:
+        return LATEST_DATE - timedelta(hours=index * HOURS_BETWEEN_POSTS)
+
+    def article(self, base_url, source, index) -> dict:
+        """Item của bài thứ `index` (cùng dạng với item trong feed output)"""
+        rng = random.Random(f"{source}-{index}")
+        title = " ".join(rng.choice(WORDS) for _ in range(7)).capitalize() + f" (story {index})"
+        paragraphs = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 90))).capitalize() + "."
+            for _ in range(self.paragraphs)
+        ]
+        images = [f"{base_url}/static/{source}/{index}-{n}.jpg" for n in range(3)]
+        # Ảnh đầu là featured image, hai ảnh còn lại nằm giữa content
+        blocks = ["{{IMAGE_0}}"] + paragraphs
+        blocks.insert(len(blocks) // 3, "{{IMAGE_1}}")
+        blocks.insert(2 * len(blocks) // 3, "{{IMAGE_2}}")
+        return {
+            "title": title,
+            "link": self.article_url(base_url, source, index),
+            "date": self._date(index).isoformat(),
+            "authors": rng.sample(AUTHORS, rng.randint(1, 2)),
+            "description": paragraphs[0][:160],
+            "content": "\n\n".join(blocks),
+            "images": images,
+            "tags": rng.sample(TAGS, 3),
+        }
+
+    def articles_range(self, base_url, source, start, stop) -> list:
+        return [self.article(base_url, source, index) for index in range(start, min(stop, self.articles))]
+
+    def listing_page(self, base_url, source, page):
+        """HTML của trang listing `page` (từ 1), None nếu vượt quá số trang"""
+        if page > self.pages:
+            return None
+        start = (page - 1) * self.page_size
+        items = self.articles_range(base_url, source, start, start + self.page_size)
+        site_name = SOURCES[source]["site_name"]
+        if source == "anthropic":
+            script = INFINITE_SCROLL_SCRIPT % (self.page_size, self.articles, self.page_size)
+            return render_anthropic_listing(items, site_name).replace("</body>", f"{script}</body>")
+        if source == "openai":
+            return render_openai_listing(items, site_name).replace("</body>", f"{JSON_LISTING_SCRIPT}</body>")
+        return render_techcrunch_listing(items, site_name)
+
+    def anthropic_fragment(self, base_url, offset) -> str:
+        """Các card Anthropic tiếp theo từ `offset` (chỉ phần card, không có page)"""
+        page = render_anthropic_listing(self.articles_range(base_url, "anthropic", offset, offset + self.page_size), "")
+        return page.split('<div class="PostList">', 1)[1].split("</div></main>", 1)[0]
+
+    def research_payload(self, base_url) -> dict:
+        """Payload JSON của OpenAI research index: mọi bài, link là đường dẫn chứa /index/"""
+        return {
+            "items": [
+                {
+                    "title": item["title"],
+                    "url": item["link"][len(base_url):],
+                    "publicationDate": item["date"],
+                    "description": item["description"],
+                }
+                for item in self.articles_range(base_url, "openai", 0, self.articles)
+            ]
+        }
+
+    def detail_page(self, base_url, source, index):
+        if not 0 <= index < self.articles:
+            return None
+        return render_detail(self.article(base_url, source, index), SOURCES[source]["site_name"])
+
+
+def _story_index(path) -> int:
+    """Số thứ tự bài từ đường dẫn .../story-<i>/, -1 nếu không phải link bài"""
+    slug = path.rstrip("/").rsplit("/", 1)[-1]
+    if not slug.startswith("story-") or not slug[len("story-"):].isdigit():
+        return -1
+    return int(slug[len("story-"):])
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """Route request tới listing/detail/JSON/ảnh của site, có trễ giả lập"""
+
+    site = None
+    latency_ms = 0
+    jitter_ms = 0
+    quiet = True
+
+    def do_GET(self):
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+
+        parts = urlsplit(self.path)
+        base_url = f"http://{self.headers.get('Host')}"
+        source, _, rest = parts.path.lstrip("/").partition("/")
+
+        if parts.path == "/robots.txt":
+            return self._send(200, "text/plain", "User-agent: *\nAllow: /\n")
+        if source == "static":
+            return self._send(200, "image/gif", PIXEL_GIF)
+        if source not in SOURCES:
+            return self._send(404, "text/plain", "Not found")
+
+        config = SOURCES[source]
+        listing_path = config["listing_path"]
+        body = None
+        content_type = "text/html; charset=utf-8"
+
+        if rest == listing_path or rest == listing_path.rstrip("/"):
+            body = self.site.listing_page(base_url, source, 1)
+        elif rest.startswith(listing_path + "page/"):
+            page = rest[len(listing_path + "page/"):].strip("/")
+            if page.isdigit():
+                body = self.site.listing_page(base_url, source, int(page))
+        elif source == "anthropic" and rest == "news/more":
+            offset = parse_qs(parts.query).get("offset", ["0"])[0]
+            body = self.site.anthropic_fragment(base_url, int(offset)) if offset.isdigit() else None
+        elif source == "openai" and rest == "api/research":
+            body, content_type = json.dumps(self.site.research_payload(base_url)), "application/json"
+        else:
+            index = _story_index(rest)
+            if index >= 0 and self.site.article_url(base_url, source, index) == base_url + parts.path:
+                body = self.site.detail_page(base_url, source, index)
+
+        if body is None:
+            return self._send(404, "text/html; charset=utf-8", "<html><body><h1>Not found</h1></body></html>")
+        return self._send(200, content_type, body)
+
+    def _send(self, status, content_type, body):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(site, host="127.0.0.1", port=8900, latency_ms=0, jitter_ms=0, quiet=True) -> ThreadingHTTPServer:
+    """Tạo server (chưa chạy) cho site, mỗi request được xử lý trong một thread riêng"""
+    handler = type("BoundMockSiteHandler", (MockSiteHandler,), {
+        "site": site,
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "quiet": quiet,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def write_urls_files(site, base_url, directory, limit=None) -> dict:
+    """Ghi danh sách URL detail của từng source (cho `-a urls_file=`), trả về {detail spider: file}"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    count = min(limit or site.articles, site.articles)
+    files = {}
+    for source, config in SOURCES.items():
+        path = directory / f"mock-{source}-urls.txt"
+        path.write_text("\n".join(site.article_url(base_url, source, index) for index in range(count)) + "\n", encoding="utf-8")
+        files[config["detail_spider"]] = path
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--articles", type=int, default=10_000, help="Số bài mỗi source")
+    parser.add_argument("--page-size", type=int, default=20, help="Số bài mỗi trang listing")
+    parser.add_argument("--paragraphs", type=int, default=12, help="Số đoạn văn mỗi bài")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Độ trễ của mỗi request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Độ trễ ngẫu nhiên thêm tối đa")
+    parser.add_argument("--urls-dir", help="Ghi danh sách URL detail của từng source vào thư mục này")
+    parser.add_argument("--verbose", action="store_true", help="Log từng request")
+    args = parser.parse_args()
+
+    site = MockSite(articles=args.articles, page_size=args.page_size, paragraphs=args.paragraphs)
+    server = make_server(site, args.host, args.port, args.latency_ms, args.jitter_ms, quiet=not args.verbose)
+    base_url = f"http://{args.host}:{args.port}"
+
+    print(f"Site giả lập: {base_url} ({args.articles} bài/source, {site.pages} trang listing, trễ {args.latency_ms:g}+{args.jitter_ms:g} ms)")
+    for source, config in SOURCES.items():
+        print(f"  scrapy crawl {config['listing_spider']} -a start_url={site.listing_url(base_url, source)} -a backfill=1 -a max_pages={site.pages}")
+    if args.urls_dir:
+        for spider, path in write_urls_files(site, base_url, args.urls_dir).items():
+            print(f"  scrapy crawl {spider} -a urls_file={path}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark offline cho `parse` của mọi listing/detail spider trên các HTML fixture đã lưu
+
+Mỗi fixture trong benchmarks/fixtures/manifest.json (tạo bằng `python -m benchmarks.fixtures`) được
+parse bằng spider tương ứng với scrapy.http.HtmlResponse, không cần mạng. Kết quả:
+- pages/s: từ thời gian tốt nhất của một lần parse trong --repeat lần, GC tắt như timeit (ổn định
+  hơn median trên page nhỏ); tính cả parse HTML như khi chạy thật
+- peak KB: đỉnh bộ nhớ Python (tracemalloc) của một lần parse, không gồm bộ nhớ C của lxml
+- thời gian theo field (detail page): thời gian thêm của từng field so với khi không có rule nào
+
+Với --save-baseline, kết quả được ghi làm baseline. Các lần chạy sau so với baseline và trả về exit
+code 1 nếu pages/s giảm hoặc peak KB tăng quá --threshold (mặc định 20%).
+
+Chạy: cd mycrawler && python -m benchmarks.parse_suite [--repeat 30] [--threshold 0.2] [--save-baseline]
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from scrapy.http import HtmlResponse, Request
+from scrapy.spiderloader import SpiderLoader
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.test import get_crawler
+
+from benchmarks.fixtures import FIXTURES_DIR
+from mycrawler.extraction import ArticleExtractor, get_extraction_rules
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = BASE_DIR / "data" / "parse_benchmark.json"
+
+# Các field của bảng rule được đo riêng (featured_image và content tính cả ảnh fallback)
+FIELD_RULES = ("title", "description", "authors", "date", "tags", "featured_image", "content")
+
+
+def load_settings():
+    """Settings của project, không cài reactor và không học thứ tự strategy (kết quả ổn định giữa các lần chạy)"""
+    settings = get_project_settings().copy_to_dict()
+    settings.update({
+        "TWISTED_REACTOR_ENABLED": False,
+        "EXTRACTION_LEARNING_ENABLED": False,
+        "LOG_LEVEL": "ERROR",
+    })
+    return settings
+
+
+class FixtureRunner:
+    """Gọi `parse` của spider trên một fixture như khi Scrapy gọi callback"""
+
+    def __init__(self, spidercls, settings, url, body):
+        self.crawler = get_crawler(spidercls, settings)
+        self.spidercls = spidercls
+        self.url = url
+        self.body = body
+        # Spider đầu tiên compile rule trích xuất, các spider sau dùng lại như trong một lần chạy thật
+        self._warm = self.new_spider()
+        self.items = self.parse(self._warm)
+
+    def new_spider(self):
+        spider = self.spidercls.from_crawler(self.crawler)
+        if hasattr(self, "_warm") and hasattr(self._warm, "_article_extractor"):
+            spider._article_extractor = self._warm._article_extractor
+        return spider
+
+    def response(self):
+        return HtmlResponse(url=self.url, body=self.body, encoding="utf-8", request=Request(self.url))
+
+    def parse(self, spider, response=None):
+        """Số item mà parse trả về (bỏ qua request trang tiếp theo)"""
+        results = spider.parse(response or self.response())
+        return sum(1 for result in results or () if not isinstance(result, Request))
+
+    def time_parse(self, repeat):
+        """Thời gian tốt nhất (ms) của một lần parse, mỗi lần với spider và response mới"""
+        timings = []
+        for _ in range(repeat):
+            # Listing spider giữ link đã thấy trên spider, nên mỗi lần đo dùng spider mới
+            spider, response = self.new_spider(), self.response()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                self.parse(spider, response)
+                timings.append((time.perf_counter() - start) * 1000)
+            finally:
+                gc.enable()
+        return min(timings)
+
+    def peak_memory_kb(self):
+        spider, response = self.new_spider(), self.response()
+        tracemalloc.start()
+        try:
+            self.parse(spider, response)
+            return tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+
+def field_timings(spider, url, body, repeat):
+    """
+    Thời gian trích xuất thêm (µs) của từng field trên detail page
+
+    Mỗi field được đo bằng extractor chỉ có rule của field đó, trừ đi extractor không có rule nào
+    (duyệt cây + dữ liệu có cấu trúc, cột 'walk'). Response được parse trước khi đo.
+    """
+    rules = get_extraction_rules(spider)
+    empty = dict(rules, fallback_images=None, **{field: [] for field in FIELD_RULES})
+
+    def measure(field_rules):
+        extractor = ArticleExtractor(field_rules)
+        responses = [HtmlResponse(url=url, body=body, encoding="utf-8") for _ in range(repeat)]
+        timings = []
+        for response in responses:
+            response.selector.root
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                extractor.extract(response)
+                timings.append((time.perf_counter() - start) * 1_000_000)
+            finally:
+                gc.enable()
+        return min(timings)
+
+    walk = measure(empty)
+    timings = {"walk": walk}
+    for field in FIELD_RULES:
+        field_rules = dict(empty, **{field: rules.get(field) or []})
+        if field in ("featured_image", "content"):
+            field_rules["fallback_images"] = rules.get("fallback_images")
+        timings[field] = max(measure(field_rules) - walk, 0.0)
+    return timings
+
+
+def run(fixtures_dir, repeat):
+    settings = load_settings()
+    loader = SpiderLoader.from_settings(get_project_settings())
+    manifest = json.loads((Path(fixtures_dir) / "manifest.json").read_text(encoding="utf-8"))
+
+    results = {}
+    for entry in manifest:
+        body = (Path(fixtures_dir) / entry["file"]).read_bytes()
+        runner = FixtureRunner(loader.load(entry["spider"]), settings, entry["url"], body)
+        parse_ms = runner.time_parse(repeat)
+        result = {
+            "spider": entry["spider"],
+            "kb": round(len(body) / 1024, 1),
+            "items": runner.items,
+            "parse_ms": round(parse_ms, 3),
+            "pages_per_sec": round(1000 / parse_ms, 1) if parse_ms else 0.0,
+            "peak_kb": round(runner.peak_memory_kb(), 1),
+        }
+        if entry["spider"].endswith("-detail"):
+            result["fields_us"] = {
+                field: round(value, 1)
+                for field, value in field_timings(runner._warm, entry["url"], body, repeat).items()
+            }
+        results[entry["file"]] = result
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """Các dòng mô tả fixture chậm hơn hoặc tốn bộ nhớ hơn baseline quá threshold"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if result["pages_per_sec"] < previous["pages_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: {result['pages_per_sec']} pages/s < baseline {previous['pages_per_sec']}")
+        if result["peak_kb"] > previous["peak_kb"] * (1 + threshold):
+            regressions.append(f"{name}: peak {result['peak_kb']} KB > baseline {previous['peak_kb']} KB")
+        if result["items"] != previous["items"]:
+            regressions.append(f"{name}: {result['items']} item, baseline {previous['items']} item")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=str(FIXTURES_DIR), help="Thư mục chứa manifest.json và các fixture")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--threshold", type=float, default=0.2, help="Mức giảm/tăng tối đa so với baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Ghi kết quả làm baseline")
+    args = parser.parse_args()
+
+    results = run(args.fixtures, args.repeat)
+
+    print(f"{'fixture':<32} {'spider':<20} {'KB':>6} {'items':>6} {'ms':>7} {'pages/s':>8} {'peak KB':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<32} {result['spider']:<20} {result['kb']:>6} {result['items']:>6} {result['parse_ms']:>7.2f}"
+            f" {result['pages_per_sec']:>8.1f} {result['peak_kb']:>8.1f}"
+        )
+
+    print(f"\nThời gian theo field (µs)\n{'fixture':<32} " + " ".join(f"{field[:8]:>8}" for field in ("walk",) + FIELD_RULES))
+    for name, result in results.items():
+        if "fields_us" in result:
+            print(f"{name:<32} " + " ".join(f"{value:>8.0f}" for value in result["fields_us"].values()))
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nĐã ghi baseline: {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"\nChưa có baseline ({baseline_path}), chạy với --save-baseline để tạo")
+        return
+
+    regressions = find_regressions(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.threshold)
+    if regressions:
+        print(f"\n❌ Regression so với baseline (threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print(f"\n✅ Không có regression so với baseline (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Chuẩn hóa URL dùng chung cho listing spiders, seen-URL store, listing store, detail cache và API
+
+- `canonicalize_url`: URL vẫn tải được (bỏ fragment, tracking params, port mặc định, chữ hoa ở host)
+- `url_key`: key để dedupe/cache, coi các biến thể http/https, www./không www. và dấu / ở cuối là một
+"""
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query params chỉ dùng để tracking, không ảnh hưởng nội dung page
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "referrer", "guccounter", "guce_referrer", "guce_referrer_sig",
+    "tpcc", "_ga", "_gl", "cmpid", "ncid", "sr_share",
+})
+TRACKING_PREFIXES = ("utm_", "mkt_", "hsa_", "pk_", "trk_")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Chuẩn hóa URL nhưng vẫn giữ dạng tải được
+
+    Ví dụ: 'HTTPS://TechCrunch.com:443/2025/01/02/x/?utm_source=rss#comments'
+        -> 'https://techcrunch.com/2025/01/02/x/'
+    """
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    while "//" in path:
+        path = path.replace("//", "/")
+
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(key)
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_key(url: str) -> str:
+    """
+    Key để dedupe và cache: URL đã chuẩn hóa, bỏ scheme, 'www.' và dấu / ở cuối path
+
+    Ví dụ: 'http://www.anthropic.com/news/x/' và 'https://anthropic.com/news/x' -> 'anthropic.com/news/x'
+    """
+    if not url:
+        return url
+    parts = urlsplit(canonicalize_url(url))
+    host = parts.netloc
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    key = f"{host}{path}"
+    return f"{key}?{parts.query}" if parts.query else key
+
+
+def migrate_link_key(conn, table: str) -> None:
+    """
+    Thêm cột link_key (url_key của link) cho bảng SQLite tạo trước khi có canonicalization
+
+    Các dòng cũ được backfill key, các dòng trùng key chỉ giữ dòng đầu tiên (rowid nhỏ nhất).
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if "link_key" in columns:
+        return
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN link_key TEXT")
+    rows = conn.execute(f"SELECT rowid, link FROM {table}").fetchall()
+    conn.executemany(f"UPDATE {table} SET link_key = ? WHERE rowid = ?", [(url_key(row[1]), row[0]) for row in rows])
+    conn.execute(
+        f"DELETE FROM {table} WHERE rowid NOT IN (SELECT MIN(rowid) FROM {table} GROUP BY source, link_key)"
+    )
+
+
+def _is_tracking_param(key: str) -> bool:
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
@@ -0,0 +1,161 @@
+"""
+Detail cache: kết quả crawl detail page theo (detail spider, link), tra cứu theo `url_key` của link
+Được ghi bởi DetailStorePipeline (crawl theo yêu cầu và detail prefetch), API trả về
+từ cache thay vì chạy lại spider. Bài gần trùng (duplicate_of) dùng chung nội dung của bài gốc
+Các lần prefetch thất bại được ghi lại để link lỗi liên tục (404, không extract được) được thử lại
+thưa dần thay vì chiếm hết budget prefetch của mỗi lần chạy
+"""
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .canonical import migrate_link_key, url_key
+from .run_history import DATA_DIR
+
+DEFAULT_DB_PATH = DATA_DIR / "details.sqlite3"
+
+# Các field lấy từ bài gốc thay vì lưu lại với bài trùng
+SHARED_FIELDS = ("content", "content_length", "images")
+
+
+class DetailStore:
+    """
+    Lưu item detail mới nhất của từng link
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS details (
+                    source TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    item_json TEXT NOT NULL,
+                    crawled_at TEXT NOT NULL,
+                    link_key TEXT,
+                    PRIMARY KEY (source, link)
+                )
+                """
+            )
+            migrate_link_key(conn, "details")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_details_link_key ON details (source, link_key)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS prefetch_attempts (
+                    source TEXT NOT NULL,
+                    link_key TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    last_error TEXT,
+                    last_attempt_at TEXT NOT NULL,
+                    PRIMARY KEY (source, link_key)
+                )
+                """
+            )
+
+    def save_many(self, source: str, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ghi (hoặc thay thế) các item detail, trả về số item đã ghi
+
+        Item có duplicate_of mà bài gốc đã có trong cache chỉ lưu metadata, nội dung
+        được lấy từ bài gốc khi đọc.
+        """
+        now = datetime.now().isoformat()
+        rows = []
+        for item in items:
+            if not item.get("link"):
+                continue
+            if item.get("duplicate_of") and self.get_any(item["duplicate_of"]):
+                item = {key: value for key, value in item.items() if key not in SHARED_FIELDS}
+            rows.append((source, item["link"], url_key(item["link"]), json.dumps(item, ensure_ascii=False, default=str), now))
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO details (source, link, link_key, item_json, crawled_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def get(self, source: str, link: str) -> Optional[Dict[str, Any]]:
+        """Lấy item detail đã cache của link (None nếu chưa có)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT item_json, crawled_at FROM details WHERE source = ? AND link_key = ?", (source, url_key(link))
+            ).fetchone()
+        if row is None:
+            return None
+        item = json.loads(row["item_json"])
+        item["crawled_at"] = row["crawled_at"]
+        if item.get("duplicate_of") and "content" not in item:
+            original = self.get_any(item["duplicate_of"]) or {}
+            item.update({field: original.get(field) for field in SHARED_FIELDS})
+        return item
+
+    def get_any(self, link: str) -> Optional[Dict[str, Any]]:
+        """Item detail đã cache của link ở bất kỳ source nào (không gộp nội dung bài gốc)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT item_json, crawled_at FROM details WHERE link_key = ? ORDER BY crawled_at DESC LIMIT 1",
+                (url_key(link),),
+            ).fetchone()
+        if row is None:
+            return None
+        item = json.loads(row["item_json"])
+        item["crawled_at"] = row["crawled_at"]
+        return item
+
+    def filter_missing(self, source: str, links: Iterable[str]) -> List[str]:
+        """Lọc các link chưa có trong cache (giữ thứ tự)"""
+        with self._connect() as conn:
+            cached = {row["link_key"] for row in conn.execute("SELECT link_key FROM details WHERE source = ?", (source,))}
+        return [link for link in links if url_key(link) not in cached]
+
+    def record_prefetch_failures(self, source: str, links: Iterable[str], error: str) -> None:
+        """Tăng số lần prefetch thất bại của các link"""
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO prefetch_attempts (source, link_key, attempts, last_error, last_attempt_at)
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT (source, link_key) DO UPDATE SET
+                    attempts = attempts + 1, last_error = excluded.last_error, last_attempt_at = excluded.last_attempt_at
+                """,
+                [(source, url_key(link), error, now) for link in links],
+            )
+
+    def filter_prefetch_due(self, source: str, links: Iterable[str], retry_after: int, max_attempts: int) -> List[str]:
+        """
+        Lọc các link được phép prefetch (giữ thứ tự)
+
+        Link thất bại n lần được thử lại sau retry_after * 2^(n-1) giây, bỏ hẳn sau max_attempts lần.
+        """
+        with self._connect() as conn:
+            attempts = {
+                row["link_key"]: row
+                for row in conn.execute(
+                    "SELECT link_key, attempts, last_attempt_at FROM prefetch_attempts WHERE source = ?", (source,)
+                )
+            }
+        now = datetime.now()
+        due = []
+        for link in links:
+            row = attempts.get(url_key(link))
+            if row is not None:
+                if row["attempts"] >= max_attempts:
+                    continue
+                backoff = timedelta(seconds=retry_after * 2 ** (row["attempts"] - 1))
+                if datetime.fromisoformat(row["last_attempt_at"]) + backoff > now:
+                    continue
+            due.append(link)
+        return due
@@ -0,0 +1,85 @@
+# Define here your Scrapy extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from .fetch_strategy import FETCH_META_KEY
+from .readiness import READINESS_META_KEY, summarize_readiness
+from .resource_blocking import BLOCKING_META_KEY
+from .run_history import RunHistoryStore
+from .scrolling import SCROLL_META_KEY, summarize_scroll
+
+# Các meta key của request được lưu kèm page timing
+PAGE_META_KEYS = (FETCH_META_KEY, BLOCKING_META_KEY, READINESS_META_KEY, SCROLL_META_KEY)
+
+
+class RunStatsExtension:
+    """
+    Lưu stats cuối cùng của mỗi lần chạy spider vào run-history store
+
+    Ngoài stats có sẵn của Scrapy (response theo status, bytes, item_scraped_count,
+    elapsed_time_seconds, memusage) còn ghi lại thời gian tải/render của từng page
+    (download_latency, với Playwright bao gồm cả các PageMethod).
+    """
+
+    def __init__(self, stats, store: RunHistoryStore):
+        self.stats = stats
+        self.store = store
+        self.page_timings = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("RUN_HISTORY_ENABLED", True):
+            raise NotConfigured
+
+        store = RunHistoryStore(crawler.settings.get("RUN_HISTORY_DB") or None)
+        ext = cls(crawler.stats, store)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def response_received(self, response, request, spider):
+        """Ghi lại thời gian tải/render của từng response"""
+        fetch_path = request.meta.get(FETCH_META_KEY)
+        if fetch_path:
+            # Số page theo đường tải (http / playwright / playwright_fallback)
+            self.stats.inc_value(f"fetch/{fetch_path}")
+
+        readiness = summarize_readiness(request.meta)
+        if readiness:
+            # Thời gian tiết kiệm so với các lần sleep cố định trước đây
+            request.meta[READINESS_META_KEY] = readiness
+            self.stats.inc_value("readiness/waited_ms", readiness["waited_ms"])
+            self.stats.inc_value("readiness/saved_ms", readiness["saved_ms"])
+            self.stats.inc_value("readiness/timed_out", readiness["timed_out"])
+
+        scroll = summarize_scroll(request.meta)
+        if scroll:
+            # Số lần scroll và lý do dừng của adaptive scroll
+            request.meta[SCROLL_META_KEY] = scroll
+            self.stats.inc_value("scroll/rounds", scroll.get("rounds") or 0)
+            self.stats.inc_value("scroll/elapsed_ms", scroll.get("elapsed_ms") or 0)
+            self.stats.inc_value(f"scroll/stop_reason/{scroll.get('reason')}")
+
+        self.page_timings.append({
+            "url": response.url,
+            "status": response.status,
+            "seconds": request.meta.get("download_latency"),
+            "playwright": bool(request.meta.get("playwright")),
+            "meta": {key: request.meta[key] for key in PAGE_META_KEYS if key in request.meta},
+        })
+
+    def spider_closed(self, spider, reason):
+        """Ghi stats cuối cùng vào store khi spider đóng"""
+        stats = dict(self.stats.get_stats())
+        # CoreStats set finish_reason trong cùng signal, đảm bảo luôn có giá trị
+        stats.setdefault("finish_reason", reason)
+
+        try:
+            run_id = self.store.record_run(spider.name, stats, self.page_timings)
+            spider.logger.info("📊 Đã lưu run stats (run_id=%s, pages=%d)", run_id, len(self.page_timings))
+        except Exception as e:
+            spider.logger.error(f"Lỗi lưu run stats: {e}")
@@ -0,0 +1,886 @@
+"""
+Engine trích xuất detail page dùng chung cho mọi detail spider
+Response được parse thành cây lxml một lần (cây của `response.selector`), engine duyệt cây
+đúng một lần và với mỗi element đánh giá bảng rule của source (title, description, content,
+ảnh, authors, date, tags) cùng các nguồn dữ liệu có cấu trúc (JSON-LD, __NEXT_DATA__, meta),
+thay cho hàng chục lần `response.css(...)` quét lại toàn bộ page
+
+Bảng rule theo source nằm trong SOURCE_RULES, có thể ghi đè từng key bằng setting
+EXTRACTION_RULES (dict theo source như các setting khác). Detail spider dùng AdaptiveExtractor:
+strategy thắng ổn định ở các lần chạy trước được thử trước (xem strategy_stats.py).
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from copy import deepcopy
+
+from lxml import etree
+from scrapy import signals
+
+from .sources import get_source_key, get_source_setting
+from .strategy_stats import MISS, StrategyStatsStore
+from .structured_data import extract_structured_data
+
+# Mỗi field là danh sách strategy theo thứ tự ưu tiên, strategy đầu tiên có kết quả được dùng.
+# Strategy là một selector CSS (dấu ',' = hợp, lấy theo thứ tự trong document) hoặc dict:
+#   {"selector": ..., "strip": regex bỏ khỏi kết quả, "min_length": n, "max_length": n}
+#   {"pattern": regex} -> match đầu tiên trên các text node của page (group 1 nếu có)
+# Selector hỗ trợ tag, .class, [attr], [attr='x'], [attr*='x'] và tổ hợp con cháu (dấu cách);
+# '::text' lấy text trực tiếp, '::attr(x)' lấy attribute, không có pseudo -> URL ảnh của element.
+# Selector ngoài tập con này (>, +, ~, :pseudo-class...) báo ValueError khi compile rule.
+DEFAULT_RULES = {
+    "title": [
+        "h1::text",
+        "meta[property='og:title']::attr(content)",
+        "title::text",
+    ],
+    "description": [
+        "meta[name='description']::attr(content)",
+        "meta[property='og:description']::attr(content)",
+        "p.lead::text, p.summary::text, div.summary p::text",
+    ],
+    "authors": [
+        "span[class*='author']::text",
+        "div[class*='author']::text",
+        "a[class*='author']::text",
+        "meta[name='author']::attr(content)",
+    ],
+    "date": [
+        "time::attr(datetime)",
+        "time::text",
+        "meta[property='article:published_time']::attr(content)",
+        "span[class*='date']::text",
+        "div[class*='date']::text",
+        "time[class*='date']::text",
+    ],
+    "tags": [
+        "a[class*='tag']::text",
+        "span[class*='tag']::text",
+        "div[class*='tag']::text",
+        "meta[property='article:tag']::attr(content)",
+        "a[class*='category']::text, span[class*='category']::text",
+    ],
+    # Container của nội dung chính, container đầu tiên có hơn `min_text_nodes` đoạn text (> 5 ký tự)
+    # và tỷ lệ text nằm trong link không quá `max_link_density` được dùng
+    "content": [
+        "main article",
+        "article",
+        "main div[class*='content']",
+        "main div[class*='article']",
+        "div[class*='content']",
+        "div[class*='article']",
+    ],
+    "min_text_nodes": 3,
+    # Container toàn link (menu, related posts) không phải nội dung bài viết
+    "max_link_density": 0.5,
+    "min_content_length": 50,
+    # Ảnh đại diện đặt ở đầu content ({{IMAGE_0}}), [] nếu source không dùng
+    "featured_image": [],
+    # Khi content không có ảnh nào: lấy ảnh trong các element này (không chèn placeholder)
+    "fallback_images": None,
+    # Bỏ ảnh có URL chứa một trong các chuỗi này (không phân biệt hoa thường), ảnh data: luôn bị bỏ
+    "image_skip": [],
+}
+
+SOURCE_RULES = {
+    "techcrunch": {
+        "title": [
+            "h1::text, h1.article__title::text, h1.entry-title::text",
+            "meta[property='og:title']::attr(content)",
+            {"selector": "title::text", "strip": r"(?i)\s*\|\s*TechCrunch.*$"},
+        ],
+        "description": [
+            "meta[name='description']::attr(content)",
+            "meta[property='og:description']::attr(content)",
+            "p.lead::text, p.summary::text, div.summary p::text, .article__excerpt::text",
+        ],
+        "authors": [
+            "a[class*='author']::text",
+            "span[class*='author']::text",
+            "div[class*='author']::text",
+            ".article__byline a::text",
+            ".byline a::text",
+            "meta[name='author']::attr(content)",
+            "a[href*='/author/']::text",
+        ],
+        "date": [
+            "time::attr(datetime)",
+            "time::text",
+            "meta[property='article:published_time']::attr(content)",
+            "meta[itemprop='datePublished']::attr(content)",
+            "span[class*='date']::text",
+            "div[class*='date']::text",
+            "time[class*='date']::text",
+            ".article__date::text",
+            ".published-date::text",
+        ],
+        "tags": [
+            "a[class*='tag']::text",
+            "span[class*='tag']::text",
+            "div[class*='tag']::text",
+            ".article__tags a::text",
+            ".tags a::text",
+            "meta[property='article:tag']::attr(content)",
+            "a[class*='category']::text, span[class*='category']::text, .article__categories a::text",
+            "a[href*='/tag/']::text, a[href*='/category/']::text",
+        ],
+        "content": [
+            "article div[class*='article-content']",
+            "article div[class*='entry-content']",
+            "article div[class*='post-content']",
+            "main article",
+            "article",
+            "main div[class*='content']",
+            "div[class*='article-content']",
+        ],
+        "featured_image": [
+            "meta[property='og:image']::attr(content)",
+            "meta[name='twitter:image']::attr(content), meta[property='twitter:image']::attr(content)",
+            "article figure img",
+            "article header img",
+            "article .featured-image img",
+            "article .article-featured-image img",
+            "article .post-thumbnail img",
+            "article .entry-thumbnail img",
+            "article img",
+        ],
+        "fallback_images": "article img",
+        # Ảnh lazy-load placeholder và pixel tracking 1x1
+        "image_skip": ["placeholder", "1x1"],
+    },
+    "anthropic": {
+        "title": [
+            "h1::text",
+            "meta[property='og:title']::attr(content)",
+            {"selector": "title::text", "strip": r"(?i)\s*\|\s*Anthropic.*$"},
+        ],
+        "description": [
+            "meta[name='description']::attr(content)",
+            "meta[property='og:description']::attr(content)",
+            "p.lead::text, p.summary::text, div.summary p::text, .article__excerpt::text",
+        ],
+        "authors": [
+            "a[class*='author']::text",
+            "span[class*='author']::text",
+            "div[class*='author']::text",
+            ".article__byline a::text",
+            ".byline a::text",
+            "meta[name='author']::attr(content)",
+            "a[href*='/author/']::text",
+        ],
+        "date": [
+            "time::attr(datetime)",
+            "time::text",
+            "meta[property='article:published_time']::attr(content)",
+            "meta[itemprop='datePublished']::attr(content)",
+            "span[class*='date']::text",
+            "div[class*='date']::text",
+            "time[class*='date']::text",
+            ".article__date::text",
+            ".published-date::text",
+        ],
+        "tags": [
+            "a[class*='tag']::text",
+            "span[class*='tag']::text",
+            "div[class*='tag']::text",
+            ".article__tags a::text",
+            ".tags a::text",
+            "meta[property='article:tag']::attr(content)",
+            "a[class*='category']::text, span[class*='category']::text, .article__categories a::text",
+            "a[href*='/tag/']::text, a[href*='/category/']::text",
+        ],
+    },
+    "adobe-com": {
+        "title": [
+            "h1::text",
+            "meta[property='og:title']::attr(content)",
+            # Bỏ suffix như " | Adobe Newsroom"
+            {"selector": "title::text", "strip": r"\s*\|\s*.*$"},
+        ],
+        "description": [
+            "meta[name='description']::attr(content)",
+            "meta[property='og:description']::attr(content)",
+            "p.lead::text, p.summary::text, div.summary p::text, [class*='excerpt'] p::text, [class*='summary'] p::text",
+            # Đoạn đầu tiên của content (chỉ lấy nếu đủ dài)
+            {"selector": "article p::text, main p::text", "min_length": 51, "max_length": 500},
+        ],
+        "authors": [
+            {"selector": "span[class*='author']::text", "min_length": 3},
+            {"selector": "div[class*='author']::text", "min_length": 3},
+            {"selector": "a[class*='author']::text", "min_length": 3},
+            {"selector": "meta[name='author']::attr(content)", "min_length": 3},
+            {"selector": "[class*='byline']::text", "min_length": 3},
+            {"selector": "[class*='writer']::text", "min_length": 3},
+            {"pattern": r"(?:By|Written by|Author:)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)"},
+        ],
+        "date": [
+            "time::attr(datetime)",
+            "time::text",
+            "meta[property='article:published_time']::attr(content)",
+            "meta[property='article:published']::attr(content)",
+            {"selector": "span[class*='date']::text", "min_length": 6},
+            {"selector": "div[class*='date']::text", "min_length": 6},
+            {"selector": "time[class*='date']::text", "min_length": 6},
+            {"selector": "span[class*='publish']::text", "min_length": 6},
+            {"selector": "div[class*='publish']::text", "min_length": 6},
+            # "October 28, 2025" hoặc "2025-10-28"
+            {"pattern": r"(\w+\s+\d{1,2},\s+\d{4}|\d{4}-\d{2}-\d{2})"},
+        ],
+        "tags": [
+            {"selector": "a[class*='tag']::text", "min_length": 2},
+            {"selector": "span[class*='tag']::text", "min_length": 2},
+            {"selector": "div[class*='tag']::text", "min_length": 2},
+            {"selector": "meta[property='article:tag']::attr(content)", "min_length": 2},
+            {"selector": "a[class*='category']::text", "min_length": 2},
+            {"selector": "span[class*='category']::text", "min_length": 2},
+        ],
+        "content": [
+            "main article",
+            "article",
+            "main div[class*='content']",
+            "main div[class*='article']",
+            "div[class*='content']",
+            "div[class*='post-content']",
+            "div[class*='article-content']",
+        ],
+    },
+}
+
+SCALAR_FIELDS = ("title", "description", "date")
+LIST_FIELDS = ("authors", "tags")
+# Các field được ghi thống kê strategy (featured_image/content: strategy của ảnh đại diện và container)
+LEARNED_FIELDS = SCALAR_FIELDS + LIST_FIELDS + ("featured_image", "content")
+
+# strategy_key của giá trị lấy từ dữ liệu có cấu trúc (JSON-LD, __NEXT_DATA__, meta)
+STRUCTURED_DATA = "structured_data"
+
+# Thứ tự attribute chứa URL ảnh (ảnh lazy-load dùng data-*)
+IMAGE_ATTRS = ("src", "data-src", "data-lazy-src", "data-original")
+
+# Số cặp (tag, class) tối đa được cache kết quả match
+MAX_CLASS_CACHE = 20000
+
+# Text trong các element này không phải nội dung bài viết
+SKIP_TEXT_TAGS = frozenset({"script", "style", "noscript", "template"})
+
+_COMPOUND_RE = re.compile(
+    r"(?P<tag>[a-zA-Z][\w-]*|\*)?"
+    r"(?P<rest>(?:\.[\w-]+|\[[\w-]+(?:[*^$]?=['\"][^'\"]*['\"])?\])*)$"
+)
+_PART_RE = re.compile(r"\.([\w-]+)|\[([\w-]+)(?:([*^$]?=)['\"]([^'\"]*)['\"])?\]")
+_PSEUDO_RE = re.compile(r"::(text|attr\(([\w-]+)\))$")
+
+
+class _Compound:
+    """Một selector đơn (tag + class + attribute), không có combinator"""
+
+    __slots__ = ("tag", "classes", "attrs")
+
+    def __init__(self, text):
+        match = _COMPOUND_RE.match(text)
+        if not match or not text:
+            raise ValueError(f"Selector không được hỗ trợ: {text!r}")
+        tag = match.group("tag")
+        self.tag = None if tag in (None, "*") else tag.lower()
+        self.classes = []
+        self.attrs = []
+        for class_name, attr, op, value in _PART_RE.findall(match.group("rest")):
+            if class_name:
+                self.classes.append(class_name)
+            else:
+                self.attrs.append((attr, op, value))
+
+    def matches(self, element, classes):
+        """Element đã cùng tag; `classes` là danh sách class của element (tách sẵn một lần)"""
+        for name in self.classes:
+            if name not in classes:
+                return False
+        for attr, op, value in self.attrs:
+            actual = element.get(attr)
+            if actual is None:
+                return False
+            if op == "=" and actual != value:
+                return False
+            if op == "*=" and value not in actual:
+                return False
+            if op == "^=" and not actual.startswith(value):
+                return False
+            if op == "$=" and not actual.endswith(value):
+                return False
+        return True
+
+
+class _ContentCandidate:
+    """
+    Một container ứng viên: đoạn [start, end) trong danh sách text/ảnh chung của lần duyệt
+
+    Các container lồng nhau (article > div.entry-content) dùng chung một danh sách, số đoạn text
+    và số ký tự (trong link) được tính một lần từ hiệu các bộ đếm lúc mở và lúc đóng element.
+    """
+
+    __slots__ = ("start", "end", "text_nodes", "chars", "link_chars")
+
+    def __init__(self, walk):
+        self.start = len(walk.parts)
+        self.end = None
+        self.text_nodes = walk.text_nodes
+        self.chars = walk.chars
+        self.link_chars = walk.link_chars
+
+    def close(self, walk):
+        self.end = len(walk.parts)
+        self.text_nodes = walk.text_nodes - self.text_nodes
+        self.chars = walk.chars - self.chars
+        self.link_chars = walk.link_chars - self.link_chars
+
+    @property
+    def link_density(self):
+        return self.link_chars / self.chars if self.chars else 0.0
+
+
+class ArticleExtractor:
+    """
+    Trích xuất các field của MycrawlerItem từ detail page theo bảng rule của một source
+
+    Rule được compile một lần khi tạo extractor: các compound selector giống nhau được gộp và
+    mỗi element chỉ so với compound cùng tag. Tổ hợp con cháu ('article div p') được theo dõi
+    bằng bộ đếm các tiền tố đang mở ('article', 'article div') thay vì dò ngược tổ tiên.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._options = {}
+        self._patterns = []
+        self._compounds = []  # id -> _Compound
+        self._compound_ids = {}  # text -> id
+        self._prefix_ids = {}  # tuple compound id -> id tiền tố
+        self._prefixes_by_last = {}  # compound id -> [(id tiền tố, id tiền tố cha hoặc None)]
+        self._rules_by_last = {}  # compound id -> [(key, kind, attr, id tiền tố cần mở hoặc None)]
+        self._tag_compounds = {}
+        self._class_cache = {}
+        self.image_skip = tuple(value.lower() for value in rules.get("image_skip") or ())
+
+        for field in SCALAR_FIELDS + LIST_FIELDS + ("featured_image",):
+            for index, strategy in enumerate(rules.get(field) or ()):
+                with _rule_errors(field, index, strategy):
+                    self._add_strategy((field, index), strategy)
+
+        self._content_count = len(rules.get("content") or ())
+        for index, selector in enumerate(rules.get("content") or ()):
+            with _rule_errors("content", index, selector):
+                self._add_rule(("content", index), selector, element_only=True)
+        if rules.get("fallback_images"):
+            with _rule_errors("fallback_images", 0, rules["fallback_images"]):
+                self._add_rule(("fallback_images", 0), rules["fallback_images"], element_only=True)
+
+        # Selector của các nguồn dữ liệu có cấu trúc
+        self._add_rule(("ld_json", 0), "script[type='application/ld+json']::text")
+        self._add_rule(("next_data", 0), "script[id='__NEXT_DATA__']::text")
+
+    def _compound_id(self, text):
+        if text not in self._compound_ids:
+            self._compound_ids[text] = len(self._compounds)
+            self._compounds.append(_Compound(text))
+        return self._compound_ids[text]
+
+    def _add_strategy(self, key, strategy):
+        if isinstance(strategy, str):
+            strategy = {"selector": strategy}
+        if not isinstance(strategy, dict) or ("selector" in strategy) == ("pattern" in strategy):
+            raise ValueError("strategy phải là selector hoặc dict có đúng một trong 'selector', 'pattern'")
+        if strategy.get("strip"):
+            re.compile(strategy["strip"])
+        self._options[key] = strategy
+        if "pattern" in strategy:
+            self._patterns.append((key, re.compile(strategy["pattern"])))
+        else:
+            for selector in strategy["selector"].split(","):
+                self._add_rule(key, selector.strip())
+
+    def _add_rule(self, key, selector, element_only=False):
+        pseudo = _PSEUDO_RE.search(selector)
+        if pseudo:
+            if element_only:
+                raise ValueError("rule này chọn element, không dùng '::text' hoặc '::attr()'")
+            selector = selector[: pseudo.start()]
+            kind = "text" if pseudo.group(1) == "text" else "attr"
+        else:
+            kind = "element"
+        parts = selector.split()
+        if not parts:
+            raise ValueError("selector rỗng")
+        for part in parts:
+            if part in (">", "+", "~"):
+                raise ValueError(f"combinator {part!r} không được hỗ trợ, chỉ có tổ hợp con cháu (dấu cách)")
+        ids = [self._compound_id(part) for part in parts]
+
+        parent = None
+        for length in range(1, len(ids)):
+            prefix = tuple(ids[:length])
+            if prefix not in self._prefix_ids:
+                self._prefix_ids[prefix] = len(self._prefix_ids)
+                self._prefixes_by_last.setdefault(ids[length - 1], []).append((self._prefix_ids[prefix], parent))
+            parent = self._prefix_ids[prefix]
+        self._rules_by_last.setdefault(ids[-1], []).append((key, kind, pseudo and pseudo.group(2), parent))
+
+    def _compounds_for(self, tag):
+        """
+        Các compound (id, _Compound) có thể khớp element có tag này
+
+        Returns:
+            tuple: (compound chỉ phụ thuộc class, compound có điều kiện attribute khác)
+        """
+        compounds = self._tag_compounds.get(tag)
+        if compounds is None:
+            candidates = [
+                (compound_id, compound)
+                for compound_id, compound in enumerate(self._compounds)
+                if compound.tag in (tag, None)
+            ]
+            compounds = (
+                [(i, c) for i, c in candidates if all(attr == "class" for attr, _, _ in c.attrs)],
+                [(i, c) for i, c in candidates if any(attr != "class" for attr, _, _ in c.attrs)],
+            )
+            self._tag_compounds[tag] = compounds
+        return compounds
+
+    def _match(self, element, tag):
+        """Id các compound khớp element"""
+        class_only, others = self._compounds_for(tag)
+        class_attr = element.get("class")
+        classes = class_attr.split() if class_attr else ()
+
+        # Kết quả của compound chỉ phụ thuộc class được cache theo (tag, class)
+        cache_key = (tag, class_attr)
+        matched = self._class_cache.get(cache_key)
+        if matched is None:
+            matched = [compound_id for compound_id, compound in class_only if compound.matches(element, classes)]
+            if len(self._class_cache) < MAX_CLASS_CACHE:
+                self._class_cache[cache_key] = matched
+        if others:
+            matched = matched + [compound_id for compound_id, compound in others if compound.matches(element, classes)]
+        return matched
+
+    def extract(self, response, stats=None):
+        """
+        Trích xuất các field từ response
+
+        Dữ liệu có cấu trúc (JSON-LD -> __NEXT_DATA__ -> meta) được ưu tiên, rule của source
+        chỉ dùng cho field còn thiếu.
+
+        Returns:
+            dict: title, description, content, content_length, images, authors, date, tags
+        """
+        return self.extract_with_strategies(response, stats)[0]
+
+    def extract_with_strategies(self, response, stats=None):
+        """
+        Như extract, kèm strategy đã cho giá trị của từng field
+
+        Returns:
+            tuple: (dict các field, {field: strategy_key hoặc None nếu field không có giá trị})
+        """
+        walk = _TreeWalk(self, response)
+        walk.run(response.selector.root)
+        values = walk.values
+
+        parts = {
+            "ld_json": values.get(("ld_json", 0), []),
+            "next_data": next(iter(values.get(("next_data", 0), [])), None),
+            "meta": walk.meta,
+        }
+        data = extract_structured_data(response, stats, parts=parts)
+
+        strategies = {}
+        for field in SCALAR_FIELDS + LIST_FIELDS:
+            if data.get(field):
+                strategies[field] = STRUCTURED_DATA
+                continue
+            data[field], strategies[field] = self._pick(field, values, first_only=field in SCALAR_FIELDS)
+
+        featured = None
+        strategies["featured_image"] = None
+        for strategy, cleaned in self._candidates("featured_image", values):
+            urls = [url for url in cleaned if not url.startswith("data:")]
+            if urls:
+                featured = response.urljoin(urls[0])
+                strategies["featured_image"] = strategy
+                break
+
+        content, images, strategies["content"] = self._content(walk, featured)
+        data["content"] = content
+        data["content_length"] = len(content) if content else 0
+        data["images"] = images
+        return data, strategies
+
+    def _candidates(self, field, values):
+        """(strategy_key, giá trị đã chuẩn hóa, lọc) của từng strategy theo thứ tự ưu tiên"""
+        for index, strategy in enumerate(self.rules.get(field) or ()):
+            key = (field, index)
+            options = self._options[key]
+            cleaned = []
+            for value in values.get(key, []):
+                value = " ".join(value.split())
+                if options.get("strip"):
+                    value = re.sub(options["strip"], "", value).strip()
+                if not value or len(value) < options.get("min_length", 1):
+                    continue
+                if options.get("max_length"):
+                    value = value[: options["max_length"]]
+                cleaned.append(value)
+            yield strategy_key(strategy), cleaned
+
+    def _pick(self, field, values, first_only):
+        """
+        Giá trị của strategy đầu tiên có kết quả
+
+        Returns:
+            tuple: (giá trị đầu tiên nếu first_only, ngược lại cả danh sách; strategy_key), (None, None) nếu không có
+        """
+        for strategy, cleaned in self._candidates(field, values):
+            if cleaned:
+                return (cleaned[0] if first_only else cleaned), strategy
+        return None, None
+
+    def _select_container(self, candidates):
+        """
+        Container đầu tiên (theo thứ tự rule) đủ nội dung và không phải khối link
+
+        Returns:
+            tuple: (selector của container, _ContentCandidate), (None, None) nếu không có
+        """
+        min_text_nodes = self.rules.get("min_text_nodes", 3)
+        max_link_density = self.rules.get("max_link_density")
+        for index in range(self._content_count):
+            candidate = candidates.get(("content", index))
+            if candidate is None or candidate.text_nodes <= min_text_nodes:
+                continue
+            if max_link_density is not None and candidate.link_density > max_link_density:
+                continue
+            return self.rules["content"][index], candidate
+        return None, None
+
+    def _content(self, walk, featured):
+        """
+        Ghép content từ container được chọn, đánh số placeholder ảnh
+
+        Returns:
+            tuple: (content, images, selector của container), các giá trị None nếu không có content
+        """
+        strategy, candidate = self._select_container(walk.candidates)
+        if candidate is None:
+            return None, None, None
+
+        parts = []
+        images = []
+        seen = set()
+        # IMAGE_0 dành cho ảnh đại diện, ảnh trong content đánh số từ 1
+        image_counter = 1
+        if featured:
+            images.append(featured)
+            seen.add(featured)
+            parts.append("{{IMAGE_0}}")
+        for part in walk.parts[candidate.start:candidate.end]:
+            if not isinstance(part, tuple):
+                parts.append(part)
+            else:
+                url = walk.response.urljoin(part[1])
+                if url not in seen:
+                    seen.add(url)
+                    images.append(url)
+                    parts.append(f"{{{{IMAGE_{image_counter}}}}}")
+                    image_counter += 1
+
+        if not images:
+            for url in walk.fallback_images:
+                url = walk.response.urljoin(url)
+                if url != featured and url not in images:
+                    images.append(url)
+
+        # Các đoạn đã được chuẩn hóa khi duyệt cây, content chỉ cần một lần join
+        content = "\n\n".join(parts) if parts else None
+        if not content or len(content) < self.rules.get("min_content_length", 50):
+            return None, None, None
+        return content, images or None, strategy
+
+
+class _TreeWalk:
+    """
+    Một lần duyệt cây theo thứ tự document (etree.iterwalk, không đệ quy)
+
+    Text node được gán cho rule '::text' của element chứa trực tiếp nó và cho các pattern. Khi có
+    container ứng viên đang mở, text và ảnh được ghi một lần vào `parts`, mỗi container chỉ giữ
+    vị trí đầu/cuối của nó trong danh sách này.
+    """
+
+    def __init__(self, extractor, response):
+        self.extractor = extractor
+        self.response = response
+        self.values = {}
+        self.candidates = {}
+        self.fallback_images = []
+        self.meta = {}
+        self.patterns = dict(extractor._patterns)
+        self.open_prefixes = [0] * len(extractor._prefix_ids)
+        # Text/ảnh của các container ứng viên (chuỗi text hoặc ('image', url)) và các bộ đếm
+        self.parts = []
+        self.open_candidates = 0
+        self.text_nodes = 0
+        self.chars = 0
+        self.link_chars = 0
+        self.link_depth = 0
+
+    def run(self, root):
+        # Mỗi frame: (rule '::text' của element, id tiền tố mở tại element, container mở tại element)
+        frames = []
+        for event, element in etree.iterwalk(root, events=("start", "end")):
+            if not isinstance(element.tag, str):
+                # Comment/processing instruction: bỏ qua, chỉ giữ tail
+                if event == "end" and element.tail and frames:
+                    self._text(element.tail, element.getparent(), frames[-1][0])
+                continue
+
+            if event == "start":
+                frames.append(self._open(element))
+                continue
+
+            text_rules, prefixes, opened = frames.pop()
+            for prefix_id in prefixes:
+                self.open_prefixes[prefix_id] -= 1
+            for candidate in opened:
+                candidate.close(self)
+                self.open_candidates -= 1
+            if element.tag == "a":
+                self.link_depth -= 1
+            if element.tail and frames:
+                # Tail nằm ngoài element vừa đóng, thuộc element cha
+                self._text(element.tail, element.getparent(), frames[-1][0])
+
+    def _open(self, element):
+        """Đánh giá rule cho element, xử lý text đầu tiên của nó và trả về frame"""
+        extractor = self.extractor
+        tag = element.tag
+        open_prefixes = self.open_prefixes
+        matched = extractor._match(element, tag)
+
+        text_rules = []
+        opened = []
+        for compound_id in matched:
+            for key, kind, attr, required in extractor._rules_by_last.get(compound_id, ()):
+                if required is not None and not open_prefixes[required]:
+                    continue
+                field = key[0]
+                if field == "content":
+                    # Như response.css(selector).get(): chỉ element khớp đầu tiên
+                    if key not in self.candidates:
+                        candidate = _ContentCandidate(self)
+                        self.candidates[key] = candidate
+                        opened.append(candidate)
+                        self.open_candidates += 1
+                elif field == "fallback_images":
+                    url = _image_src(element, extractor.image_skip)
+                    if url and url not in self.fallback_images:
+                        self.fallback_images.append(url)
+                elif kind == "text":
+                    text_rules.append(key)
+                elif kind == "attr":
+                    value = element.get(attr)
+                    if value is not None:
+                        self.values.setdefault(key, []).append(value)
+                else:
+                    url = _image_src(element, extractor.image_skip)
+                    if url:
+                        self.values.setdefault(key, []).append(url)
+
+        # Mở các tiền tố kết thúc bằng compound khớp element (dùng cho con cháu của element)
+        prefixes = []
+        for compound_id in matched:
+            for prefix_id, parent in extractor._prefixes_by_last.get(compound_id, ()):
+                if parent is None or open_prefixes[parent]:
+                    prefixes.append(prefix_id)
+        for prefix_id in prefixes:
+            open_prefixes[prefix_id] += 1
+
+        if tag == "meta" and element.get("content") is not None:
+            for attr in ("property", "name"):
+                if element.get(attr):
+                    self.meta.setdefault(element.get(attr), []).append(element.get("content"))
+
+        if tag == "a":
+            self.link_depth += 1
+        if tag == "img":
+            if self.open_candidates:
+                url = _image_src(element, extractor.image_skip)
+                if url:
+                    self.parts.append(("image", url))
+        elif element.text:
+            self._text(element.text, element, text_rules)
+        return text_rules, prefixes, opened
+
+    def _text(self, text, owner, text_rules):
+        """Text node thuộc trực tiếp element `owner`"""
+        for key in text_rules:
+            self.values.setdefault(key, []).append(text)
+        if owner.tag in SKIP_TEXT_TAGS:
+            return
+        stripped = text.strip()
+        if not stripped:
+            return
+
+        if self.patterns:
+            for key, pattern in list(self.patterns.items()):
+                match = pattern.search(stripped)
+                if match:
+                    self.values[key] = [match.group(1) if pattern.groups else match.group(0)]
+                    del self.patterns[key]
+
+        if self.open_candidates:
+            # Chuẩn hóa khoảng trắng ngay khi ghi: mỗi dòng của text node là một đoạn của content
+            if "\n" in stripped:
+                lines = [" ".join(line.split()) for line in stripped.split("\n")]
+                self.parts.extend(line for line in lines if line)
+            else:
+                self.parts.append(" ".join(stripped.split()))
+            self.chars += len(stripped)
+            if self.link_depth:
+                self.link_chars += len(stripped)
+            if len(stripped) > 5:
+                self.text_nodes += 1
+
+
+class AdaptiveExtractor:
+    """
+    ArticleExtractor thử trước các strategy đã thắng ổn định ở các lần chạy trước
+
+    Với mỗi field có strategy thắng (xem StrategyStatsStore.winners), extractor nhanh chỉ compile
+    strategy đó, các field khác giữ nguyên cả chuỗi strategy. Page mà extractor nhanh không có giá
+    trị cho một field đã học được trích xuất lại bằng toàn bộ chuỗi strategy. Strategy cho ra giá
+    trị của từng page được đếm và ghi vào store khi spider đóng.
+    """
+
+    def __init__(self, rules, winners=None, store=None, source=None):
+        self.full = ArticleExtractor(rules)
+        self.winners = {}
+        narrowed = dict(rules)
+        for field, winner in (winners or {}).items():
+            if winner == STRUCTURED_DATA:
+                narrowed[field] = []
+            else:
+                matching = [strategy for strategy in rules.get(field) or () if strategy_key(strategy) == winner]
+                if not matching:
+                    # Rule đã thay đổi từ lần chạy trước
+                    continue
+                narrowed[field] = matching[:1]
+            self.winners[field] = winner
+        self.fast = ArticleExtractor(narrowed) if self.winners else None
+        self.store = store
+        self.source = source
+        self.hits = Counter()
+
+    def extract(self, response, stats=None):
+        if self.fast is not None:
+            data, strategies = self.fast.extract_with_strategies(response, stats)
+            if all(strategies.get(field) for field in self.winners):
+                if stats:
+                    stats.inc_value("extraction/learned_order")
+                self._record(strategies)
+                return data
+            if stats:
+                stats.inc_value("extraction/full_cascade")
+            # Dữ liệu có cấu trúc đã được đếm vào stats ở lần trích xuất trên
+            stats = None
+        data, strategies = self.full.extract_with_strategies(response, stats)
+        self._record(strategies)
+        return data
+
+    def _record(self, strategies):
+        for field in LEARNED_FIELDS:
+            self.hits[(field, strategies.get(field) or MISS)] += 1
+
+    def save(self):
+        """Ghi số lần thắng của các page đã trích xuất vào store"""
+        if self.store is not None and self.hits:
+            self.store.add_hits(self.source, dict(self.hits))
+            self.hits.clear()
+
+
+@contextmanager
+def _rule_errors(field, index, strategy):
+    """Lỗi compile của một strategy -> ValueError chỉ rõ field và strategy"""
+    try:
+        yield
+    except (ValueError, re.error) as e:
+        raise ValueError(f"Rule trích xuất {field}[{index}] {strategy!r} không hợp lệ: {e}") from e
+
+
+def strategy_key(strategy):
+    """Định danh ổn định của strategy giữa các lần chạy: selector hoặc pattern của nó"""
+    if isinstance(strategy, str):
+        return strategy
+    return strategy.get("selector") or strategy["pattern"]
+
+
+def get_extraction_rules(spider):
+    """Bảng rule của spider: DEFAULT_RULES <- SOURCE_RULES của source <- setting EXTRACTION_RULES"""
+    rules = deepcopy(DEFAULT_RULES)
+    rules.update(deepcopy(SOURCE_RULES.get(get_source_key(spider.name), {})))
+    rules.update(get_source_setting(spider.settings, "EXTRACTION_RULES", spider.name, {}))
+    return rules
+
+
+def get_article_extractor(spider):
+    """
+    Extractor của spider, compile rule ở lần gọi đầu tiên
+
+    Detail spider gọi hàm này trong start() để rule không hợp lệ báo ValueError ngay khi spider mở,
+    thay vì ở response đầu tiên.
+    """
+    extractor = getattr(spider, "_article_extractor", None)
+    if extractor is None:
+        extractor = _create_extractor(spider)
+        spider._article_extractor = extractor
+    return extractor
+
+
+def extract_article(spider, response):
+    """Trích xuất detail page bằng extractor của spider (compile rule một lần mỗi spider)"""
+    return get_article_extractor(spider).extract(response, spider.crawler.stats)
+
+
+def _create_extractor(spider):
+    """AdaptiveExtractor với strategy đã học của source, hoặc ArticleExtractor nếu tắt EXTRACTION_LEARNING_ENABLED"""
+    rules = get_extraction_rules(spider)
+    if not spider.settings.getbool("EXTRACTION_LEARNING_ENABLED", True):
+        return ArticleExtractor(rules)
+
+    source = get_source_key(spider.name)
+    store = StrategyStatsStore(spider.settings.get("EXTRACTION_STATS_DB") or None)
+    winners = store.winners(source)
+    if winners:
+        spider.logger.debug(f"Strategy đã học của {source}: {winners}")
+    extractor = AdaptiveExtractor(rules, winners, store=store, source=source)
+    spider.crawler.signals.connect(extractor.save, signal=signals.spider_closed)
+    return extractor
+
+
+def _image_src(element, skip=()):
+    """
+    URL ảnh của element (src/data-*/data-srcset) như trong HTML, None nếu là data URI hoặc chứa
+    một chuỗi trong `skip` (chữ thường, xem rule image_skip)
+
+    URL chỉ được urljoin khi ảnh được chọn (xem ArticleExtractor._content), không phải cho mọi
+    ảnh của page.
+    """
+    url = next((element.get(attr) for attr in IMAGE_ATTRS if element.get(attr)), None)
+    if not url and element.get("data-srcset"):
+        # srcset dạng "url1 1x, url2 2x" -> lấy url1
+        url = element.get("data-srcset").split(",")[0].strip().split()[0]
+    if not url:
+        return None
+    url = url.strip()
+    if not url or url.startswith("data:"):
+        return None
+    if skip and any(value in url.lower() for value in skip):
+        return None
+    return url
+
@@ -0,0 +1,253 @@
+"""
+Listing từ feed (RSS/Atom hoặc WordPress REST API) thay cho trang category render bằng Playwright
+Feed được tải bằng HTTP thường, hỗ trợ phân trang và conditional GET (ETag/Last-Modified):
+feed không đổi trả về 304 nên listing của lần trước được giữ nguyên
+"""
+import json
+import threading
+from pathlib import Path
+from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse
+
+import scrapy
+from scrapy.selector import Selector
+from w3lib.html import remove_tags, replace_entities
+
+from .canonical import canonicalize_url
+from .items import MycrawlerItem
+from .pagination import get_max_pages, should_stop
+from .run_history import DATA_DIR
+from .sources import get_source_setting
+
+# Meta key chứa số trang feed của request
+FEED_PAGE_KEY = "feed_page"
+
+FEED_RSS = "rss"
+FEED_WORDPRESS = "wordpress"
+
+DEFAULT_STATE_PATH = DATA_DIR / "feed_state.json"
+
+
+class FeedStateStore:
+    """
+    Lưu ETag/Last-Modified của từng feed URL để gửi conditional GET ở lần chạy sau
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else DEFAULT_STATE_PATH
+
+    def _load(self):
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, url):
+        """Lấy {'etag', 'last_modified'} đã lưu của feed URL"""
+        return self._load().get(url, {})
+
+    def set(self, url, etag, last_modified):
+        """Lưu validators của feed URL"""
+        with self._lock:
+            state = self._load()
+            state[url] = {"etag": etag, "last_modified": last_modified}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def get_feed_config(spider):
+    """
+    Lấy cấu hình feed của listing spider (None nếu source không có feed hoặc feed bị tắt)
+
+    Feed không dùng khi chạy với `-a listing_mode=rendered` hoặc `-a start_url=...` (trang tùy chỉnh).
+    """
+    if not spider.settings.getbool("LISTING_FEED_ENABLED", True):
+        return None
+    if getattr(spider, "listing_mode", None) == "rendered" or getattr(spider, "start_url", None):
+        return None
+    return get_source_setting(spider.settings, "LISTING_FEEDS", spider.name)
+
+
+def build_feed_request(spider, callback, errback, page=1):
+    """
+    Tạo request tải một trang feed (HTTP thường, không qua Playwright)
+
+    Trang đầu tiên gửi If-None-Match/If-Modified-Since nếu đã có validators từ lần chạy trước.
+
+    Returns:
+        scrapy.Request hoặc None nếu source không có feed
+    """
+    config = get_feed_config(spider)
+    if not config:
+        return None
+
+    url = _page_url(config, page)
+    headers = {}
+    if page == 1:
+        validators = FeedStateStore(spider.settings.get("LISTING_FEED_STATE_FILE")).get(url)
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    return scrapy.Request(
+        url,
+        headers=headers,
+        callback=callback,
+        errback=errback,
+        meta={FEED_PAGE_KEY: page, "handle_httpstatus_list": [304]},
+        dont_filter=page == 1,
+    )
+
+
+def next_feed_request(spider, response, entries, callback, errback):
+    """
+    Tạo request trang feed tiếp theo
+
+    Returns:
+        scrapy.Request hoặc None nếu đã hết trang, đạt `max_pages`, hoặc cả trang đều là bài đã lưu
+    """
+    config = get_feed_config(spider)
+    page = response.meta.get(FEED_PAGE_KEY, 1)
+    if config.get("type") == FEED_WORDPRESS and 0 < len(entries) < config.get("per_page", 20):
+        return None
+    links = [entry["link"] for entry in entries]
+    if should_stop(spider, page, links, get_max_pages(spider, config)):
+        return None
+    return build_feed_request(spider, callback, errback, page=page + 1)
+
+
+def remember_validators(spider, response):
+    """Lưu ETag/Last-Modified của trang feed đầu tiên cho conditional GET lần sau"""
+    if response.meta.get(FEED_PAGE_KEY) != 1:
+        return
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        FeedStateStore(spider.settings.get("LISTING_FEED_STATE_FILE")).set(
+            response.request.url,
+            etag.decode("latin-1") if etag else None,
+            last_modified.decode("latin-1") if last_modified else None,
+        )
+
+
+def parse_feed_entries(response, feed_type):
+    """
+    Parse một trang feed thành danh sách entry
+
+    Returns:
+        list: [{'title', 'link', 'date', 'authors', 'description', 'tags'}]
+    """
+    if feed_type == FEED_WORDPRESS:
+        return _parse_wordpress(response)
+    return _parse_rss(response)
+
+
+def entry_to_item(entry):
+    """Chuyển một feed entry thành listing item"""
+    item = MycrawlerItem()
+    item["title"] = entry["title"]
+    item["link"] = canonicalize_url(entry["link"])
+    item["date"] = entry.get("date")
+    item["description"] = entry.get("description")
+    item["authors"] = entry.get("authors")
+    item["tags"] = entry.get("tags")
+    # Content chỉ có ở detail page
+    item["content"] = None
+    item["content_length"] = 0
+    item["images"] = None
+    return item
+
+
+def _page_url(config, page):
+    """Thêm tham số phân trang vào feed URL (RSS của WordPress: paged, REST API: page)"""
+    parsed = urlparse(config["url"])
+    params = dict(parse_qsl(parsed.query))
+    params.update(config.get("params", {}))
+    if config.get("type") == FEED_WORDPRESS:
+        params.setdefault("per_page", config.get("per_page", 20))
+        params.setdefault("_embed", "author,wp:term")
+        if page > 1:
+            params["page"] = page
+    elif page > 1:
+        params["paged"] = page
+    return urlunparse(parsed._replace(query=urlencode(params)))
+
+
+def _parse_rss(response):
+    """Parse RSS 2.0 hoặc Atom"""
+    selector = Selector(text=response.text, type="xml")
+    selector.remove_namespaces()
+
+    entries = []
+    for node in selector.xpath("//item"):
+        entries.append({
+            "title": _clean_html(node.xpath("title/text()").get()),
+            "link": _clean_text(node.xpath("link/text()").get()),
+            "date": _clean_text(node.xpath("pubDate/text()").get()),
+            "authors": _unique(_clean_text(a) for a in node.xpath("creator/text() | author/text()").getall()),
+            "description": _clean_html(node.xpath("description/text()").get()),
+            "tags": _unique(_clean_text(t) for t in node.xpath("category/text()").getall()),
+        })
+    for node in selector.xpath("//entry"):
+        link = node.xpath("link[@rel='alternate']/@href | link[not(@rel)]/@href").get()
+        entries.append({
+            "title": _clean_html(node.xpath("title/text()").get()),
+            "link": _clean_text(link),
+            "date": _clean_text(node.xpath("published/text()").get() or node.xpath("updated/text()").get()),
+            "authors": _unique(_clean_text(a) for a in node.xpath("author/name/text()").getall()),
+            "description": _clean_html(node.xpath("summary/text()").get()),
+            "tags": _unique(_clean_text(t) for t in node.xpath("category/@term").getall()),
+        })
+    return [entry for entry in entries if entry["title"] and entry["link"]]
+
+
+def _parse_wordpress(response):
+    """Parse response JSON của WordPress REST API (/wp-json/wp/v2/posts?_embed)"""
+    try:
+        posts = json.loads(response.text)
+    except ValueError:
+        return []
+    if not isinstance(posts, list):
+        return []
+
+    entries = []
+    for post in posts:
+        embedded = post.get("_embedded", {})
+        terms = [term for group in embedded.get("wp:term", []) for term in group if isinstance(term, dict)]
+        entries.append({
+            "title": _clean_html((post.get("title") or {}).get("rendered")),
+            "link": post.get("link"),
+            "date": post.get("date_gmt") or post.get("date"),
+            "authors": _unique(_clean_text(a.get("name")) for a in embedded.get("author", []) if isinstance(a, dict)),
+            "description": _clean_html((post.get("excerpt") or {}).get("rendered")),
+            "tags": _unique(_clean_html(t.get("name")) for t in terms),
+        })
+    return [entry for entry in entries if entry["title"] and entry["link"]]
+
+
+def _clean_text(value):
+    if not value:
+        return None
+    value = " ".join(value.split())
+    return value or None
+
+
+def _clean_html(value):
+    """Bỏ thẻ HTML và entities (title/excerpt của feed thường là HTML)"""
+    if not value:
+        return None
+    return _clean_text(replace_entities(remove_tags(value)))
+
+
+def _unique(values):
+    result = []
+    for value in values:
+        if value and value not in result:
+            result.append(value)
+    return result or None
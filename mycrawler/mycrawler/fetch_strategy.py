@@ -0,0 +1,95 @@
+"""
+Chiến lược tải page theo source: HTTP thường trước, Playwright khi cần
+Với các site render phía server (WordPress...), HTML từ một request HTTP thường đã đủ
+cho parser nên không cần mở Chromium. Nếu parser thiếu title/content thì mới tải lại bằng Playwright
+"""
+import scrapy
+
+from .sources import get_source_setting
+
+# Meta key ghi lại đường tải của request: 'http', 'playwright' hoặc 'playwright_fallback'
+FETCH_META_KEY = "fetch_path"
+# Meta key giữ tên các meta key do spider truyền vào build_request (được chép sang request fallback)
+SPIDER_META_KEYS = "fetch_spider_meta_keys"
+
+FETCH_HTTP = "http"
+FETCH_PLAYWRIGHT = "playwright"
+FETCH_PLAYWRIGHT_FALLBACK = "playwright_fallback"
+
+# Giá trị của setting FETCH_STRATEGY
+STRATEGY_HTTP_FIRST = "http_first"
+STRATEGY_PLAYWRIGHT = "playwright"
+
+# Các field bắt buộc, thiếu field nào thì fallback sang Playwright
+REQUIRED_FIELDS = ("title", "content")
+
+# Status HTTP vẫn được đưa vào parse để quyết định fallback (thường do chặn bot/rate limit)
+FALLBACK_STATUSES = [403, 429, 503]
+
+
+def get_fetch_strategy(spider):
+    """Đọc chiến lược tải của spider từ setting FETCH_STRATEGY"""
+    return get_source_setting(spider.settings, "FETCH_STRATEGY", spider.name, default=STRATEGY_PLAYWRIGHT)
+
+
+def build_request(spider, url, callback, playwright_meta, **kwargs):
+    """
+    Tạo request đầu tiên cho một URL theo chiến lược tải của source
+
+    Args:
+        spider: Spider đang chạy
+        url: URL cần tải
+        callback: Callback parse response
+        playwright_meta: Meta dùng khi tải bằng Playwright (playwright, playwright_page_methods...)
+        **kwargs: Tham số khác của scrapy.Request
+    """
+    meta = dict(kwargs.pop("meta", None) or {})
+    meta[SPIDER_META_KEYS] = tuple(meta)
+    if get_fetch_strategy(spider) == STRATEGY_HTTP_FIRST:
+        meta[FETCH_META_KEY] = FETCH_HTTP
+        meta["handle_httpstatus_list"] = FALLBACK_STATUSES
+    else:
+        meta.update(playwright_meta)
+        meta[FETCH_META_KEY] = FETCH_PLAYWRIGHT
+    return scrapy.Request(url, callback=callback, meta=meta, **kwargs)
+
+
+def playwright_fallback(spider, response, item, playwright_meta):
+    """
+    Kiểm tra kết quả parse của response tải bằng HTTP thường
+
+    Returns:
+        scrapy.Request hoặc None: Request tải lại bằng Playwright nếu response bị chặn
+        hoặc item thiếu field bắt buộc, None nếu item dùng được
+    """
+    if response.meta.get(FETCH_META_KEY) != FETCH_HTTP:
+        return None
+
+    stats = spider.crawler.stats
+    if response.status in FALLBACK_STATUSES:
+        reasons = [f"status_{response.status}"]
+    else:
+        reasons = [field for field in REQUIRED_FIELDS if not (item or {}).get(field)]
+
+    if not reasons:
+        stats.inc_value("fetch/browserless_pages")
+        return None
+
+    for reason in reasons:
+        stats.inc_value(f"fetch/fallback_reason/{reason}")
+    spider.logger.info("↩️ HTTP thiếu %s, tải lại bằng Playwright: %s", ", ".join(reasons), response.url)
+
+    # Chỉ chép meta của spider: state của lần tải HTTP (retry_times, redirect_urls, download_slot,
+    # depth...) và của middleware không được làm hụt retry/redirect của lần tải bằng Playwright
+    spider_keys = response.meta.get(SPIDER_META_KEYS, ())
+    meta = {key: response.meta[key] for key in spider_keys if key in response.meta}
+    meta[SPIDER_META_KEYS] = spider_keys
+    meta.update(playwright_meta)
+    meta[FETCH_META_KEY] = FETCH_PLAYWRIGHT_FALLBACK
+    return response.request.replace(url=response.url, meta=meta, dont_filter=True)
+
+
+def read_urls_file(path):
+    """Đọc danh sách URL (mỗi dòng một URL, bỏ dòng trống và dòng bắt đầu bằng #)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
@@ -23,3 +23,10 @@ class MycrawlerItem(scrapy.Item):
     
     # Media
     images = scrapy.Field()  # List of image URLs
+    
+    # Crawl state
+    is_new = scrapy.Field()  # True nếu link chưa từng thấy ở các lần chạy trước của spider
+    
+    # Near-duplicate detection
+    content_hash = scrapy.Field()  # SimHash 64-bit (hex) của nội dung
+    duplicate_of = scrapy.Field()  # Link của bài gốc nếu item gần trùng một bài đã lưu (có thể ở source khác)
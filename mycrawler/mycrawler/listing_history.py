@@ -0,0 +1,63 @@
+"""
+Các link listing đã lưu từ các lần chạy trước
+Dùng để dừng sớm (scroll, phân trang) khi gặp lại bài viết đã có
+"""
+import json
+from pathlib import Path
+
+from .canonical import url_key
+from .listing_store import ListingStore
+
+
+def load_previous_links(spider, limit=None):
+    """
+    Đọc các link đã lưu từ các lần chạy trước
+
+    Nguồn chính là listing store (toàn bộ lịch sử); nếu store chưa có dữ liệu của spider
+    thì đọc feed listing của lần chạy trước. Phải gọi lần đầu trước khi item đầu tiên được
+    export, vì feed được ghi đè khi bắt đầu export. Kết quả được cache trên spider.
+
+    Returns:
+        list: Tối đa `limit` link mới nhất
+    """
+    if not hasattr(spider, "_previous_links"):
+        spider._previous_links = _read_store_links(spider) or _read_feed_links(spider)
+    links = spider._previous_links
+    return links[:limit] if limit is not None else list(links)
+
+
+def is_known_page(spider, links):
+    """Tất cả link của một trang đều đã có trong listing đã lưu (trang rỗng không tính)"""
+    if not links:
+        return False
+    known = {url_key(link) for link in load_previous_links(spider)}
+    return all(url_key(link) in known for link in links)
+
+
+def _read_store_links(spider):
+    if not spider.settings.getbool("LISTING_STORE_ENABLED", True):
+        return []
+    try:
+        return ListingStore(spider.settings.get("LISTING_STORE_DB") or None).get_links(spider.name)
+    except Exception as e:
+        spider.logger.warning(f"Không đọc được listing store: {e}")
+        return []
+
+
+def _read_feed_links(spider):
+    feeds = spider.settings.getdict("FEEDS")
+    if not feeds:
+        return []
+
+    feed_path = Path(str(next(iter(feeds))))
+    if not feed_path.exists():
+        return []
+
+    try:
+        with open(feed_path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+    except (OSError, ValueError) as e:
+        spider.logger.warning(f"Không đọc được listing cũ {feed_path}: {e}")
+        return []
+
+    return [item["link"] for item in items if isinstance(item, dict) and item.get("link")]
@@ -0,0 +1,163 @@
+"""
+Index date/author của listing page
+Tìm date/author cho từng link bằng XPath (`..`, `preceding-sibling::time`, `ancestor::*[position() <= 5]`,
+mỗi query lại tìm `.//time` trong cả cây con) tốn O(số link x độ sâu x cây con), rất chậm với trang
+infinite scroll có hàng nghìn bài. ListingIndex duyệt DOM một lần và ghi cho mỗi element giá trị
+đầu tiên (theo thứ tự document) trong cây con của nó: <time>, element có class date/author, link
+/author/ và text khớp pattern date. Tra cứu cho một link chỉ còn là đi lên vài tổ tiên gần nhất
+và tra dict.
+"""
+import re
+from typing import Optional
+
+from lxml import etree
+
+# Số cấp tổ tiên được xét (ngoài chính element) khi tìm <time>/author và date theo class/pattern
+MAX_TIME_LEVELS = 5
+MAX_CLASS_LEVELS = 3
+
+# (tag, chuỗi con trong class) của element chứa text ngày, theo thứ tự ưu tiên
+DATE_CLASS_SELECTORS = (
+    ("span", "date"),
+    ("div", "date"),
+    ("time", "date"),
+    ("span", "time"),
+)
+
+# Text trong các element này không được dùng để tìm pattern date
+SKIP_TEXT_TAGS = frozenset({"script", "style", "noscript", "template"})
+
+# Vị trí giá trị trong danh sách của mỗi element; date theo class bắt đầu từ DATE_CLASS_SLOT
+TIME_SLOT = 0
+AUTHOR_CLASS_SLOT = 1
+AUTHOR_LINK_SLOT = 2
+DATE_CLASS_SLOT = 3
+
+
+class ListingIndex:
+    """
+    Map mỗi element của listing page tới <time>/author gần nhất trong cây con của nó
+
+    Date của một link là <time> trong element nhỏ nhất (chính link hoặc tổ tiên trong
+    MAX_TIME_LEVELS cấp) có chứa <time>, sau đó tới date theo class và pattern trong
+    MAX_CLASS_LEVELS cấp. Author tương tự với element có class 'author' và link /author/.
+    """
+
+    def __init__(self, response, date_selectors=DATE_CLASS_SELECTORS, date_pattern=None, min_date_length=1):
+        self.date_selectors = tuple(date_selectors)
+        self.date_pattern = re.compile(date_pattern) if date_pattern else None
+        self.min_date_length = min_date_length
+        self._pattern_slot = DATE_CLASS_SLOT + len(self.date_selectors)
+        self._slot_count = self._pattern_slot + 1
+        # element -> giá trị theo slot (chỉ các element có ít nhất một giá trị trong cây con)
+        self._values = {}
+        self._build(response.selector.root)
+
+    def _build(self, root):
+        # Mỗi phần tử: (element đang mở, danh sách giá trị của nó)
+        stack = []
+        for event, element in etree.iterwalk(root, events=("start", "end")):
+            tag = element.tag
+            if not isinstance(tag, str):
+                # Comment/processing instruction: chỉ giữ tail
+                if event == "end" and element.tail and stack:
+                    self._pattern_text(stack, element.tail, stack[-1][0].tag)
+                continue
+
+            if event == "start":
+                stack.append((element, [None] * self._slot_count))
+                self._match(stack, element, tag)
+                if element.text:
+                    self._pattern_text(stack, element.text, tag)
+                continue
+
+            _, values = stack.pop()
+            if any(value is not None for value in values):
+                self._values[element] = values
+            if element.tail and stack:
+                # Tail thuộc element cha
+                self._pattern_text(stack, element.tail, stack[-1][0].tag)
+
+    def _match(self, stack, element, tag):
+        """Ghi giá trị nếu element đang mở là <time>, element date/author theo class hoặc link /author/"""
+        class_attr = element.get("class") or ""
+        if tag == "time":
+            value = (element.get("datetime") or "").strip() or _normalized_text(element)
+            if value:
+                _assign(stack, TIME_SLOT, value)
+        if "author" in class_attr:
+            value = _normalized_text(element)
+            if value:
+                _assign(stack, AUTHOR_CLASS_SLOT, value)
+        if tag == "a" and "/author/" in (element.get("href") or ""):
+            value = _normalized_text(element)
+            if value:
+                _assign(stack, AUTHOR_LINK_SLOT, value)
+        for index, (selector_tag, class_part) in enumerate(self.date_selectors):
+            if tag == selector_tag and class_part in class_attr:
+                value = _own_text(element)
+                if value and len(value) >= self.min_date_length:
+                    _assign(stack, DATE_CLASS_SLOT + index, value)
+
+    def _pattern_text(self, stack, text, owner_tag):
+        if self.date_pattern is None or owner_tag in SKIP_TEXT_TAGS:
+            return
+        match = self.date_pattern.search(text.strip())
+        if match:
+            _assign(stack, self._pattern_slot, (match.group(1) if self.date_pattern.groups else match.group(0)).strip())
+
+    def _nearest(self, element, slot, levels):
+        """Giá trị của slot trong element hoặc tổ tiên gần nhất (tối đa `levels` cấp) có giá trị"""
+        element = getattr(element, "root", element)
+        for _ in range(levels + 1):
+            if element is None:
+                return None
+            values = self._values.get(element)
+            if values is not None and values[slot] is not None:
+                return values[slot]
+            element = element.getparent()
+        return None
+
+    def date_for(self, element) -> Optional[str]:
+        """Date gần nhất của element listing (Selector hoặc lxml element), None nếu không có"""
+        date = self._nearest(element, TIME_SLOT, MAX_TIME_LEVELS)
+        if date:
+            return date
+        for index in range(len(self.date_selectors)):
+            date = self._nearest(element, DATE_CLASS_SLOT + index, MAX_CLASS_LEVELS)
+            if date:
+                return date
+        if self.date_pattern is not None:
+            return self._nearest(element, self._pattern_slot, MAX_CLASS_LEVELS)
+        return None
+
+    def author_for(self, element) -> Optional[str]:
+        """Author gần nhất của element listing, None nếu không có"""
+        return (
+            self._nearest(element, AUTHOR_CLASS_SLOT, MAX_TIME_LEVELS)
+            or self._nearest(element, AUTHOR_LINK_SLOT, MAX_TIME_LEVELS)
+        )
+
+
+def _assign(stack, slot, value):
+    """
+    Ghi giá trị cho các element đang mở chưa có giá trị ở slot này
+
+    Đi từ element sâu nhất lên; gặp element đã có giá trị thì các tổ tiên của nó cũng đã có
+    (giá trị được ghi cho mọi element đang mở cùng lúc), nên mỗi element chỉ được ghi một lần.
+    """
+    for _, values in reversed(stack):
+        if values[slot] is not None:
+            return
+        values[slot] = value
+
+
+def _normalized_text(element):
+    """Như XPath normalize-space(.)"""
+    return " ".join("".join(element.itertext()).split())
+
+
+def _own_text(element):
+    """Text trực tiếp đầu tiên (không rỗng) của element, như `::text` rồi `.strip()`"""
+    texts = [element.text] + [child.tail for child in element]
+    return next((text.strip() for text in texts if text and text.strip()), None)
@@ -0,0 +1,159 @@
+"""
+Listing store gộp qua các lần chạy
+Mỗi bài viết là một dòng trong SQLite theo (source, link_key), link_key là `url_key` của link. Mỗi lần chạy chỉ upsert các item
+thay đổi và cập nhật thời điểm thấy lần cuối, nên bài viết đã trôi khỏi trang listing
+vẫn còn trong lịch sử mà API trả về
+"""
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .canonical import migrate_link_key, url_key
+from .run_history import DATA_DIR
+
+DEFAULT_DB_PATH = DATA_DIR / "listings.sqlite3"
+
+# Các field của listing item được lưu
+LISTING_FIELDS = ("title", "link", "description", "date", "authors", "tags", "duplicate_of")
+
+# Điều kiện chỉ lấy bài không trùng bài nào đã lưu trước (dùng khi collapse)
+NOT_DUPLICATE = "json_extract(item_json, '$.duplicate_of') IS NULL"
+
+
+class ListingStore:
+    """
+    Lưu và truy vấn listing đã gộp của từng source (namespace là tên listing spider)
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS listings (
+                    source TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    item_json TEXT NOT NULL,
+                    item_hash TEXT NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    link_key TEXT,
+                    PRIMARY KEY (source, link)
+                );
+                CREATE INDEX IF NOT EXISTS idx_listings_first_seen ON listings (source, first_seen);
+                """
+            )
+            migrate_link_key(conn, "listings")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_listings_link_key ON listings (source, link_key)")
+
+    def upsert_many(self, source: str, items: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Gộp các item của một lần chạy vào store
+
+        Item mới được thêm, item có nội dung thay đổi được cập nhật, item không đổi
+        chỉ cập nhật last_seen. Item được so khớp theo `url_key` của link nên các biến thể
+        của cùng một URL không tạo thêm dòng.
+
+        Returns:
+            dict: {'inserted', 'updated', 'unchanged'}
+        """
+        now = datetime.now().isoformat()
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+        with self._connect() as conn:
+            for item in items:
+                link = item.get("link")
+                if not link:
+                    continue
+                key = url_key(link)
+                data = {field: item.get(field) for field in LISTING_FIELDS}
+                item_json = json.dumps(data, ensure_ascii=False, sort_keys=True)
+                item_hash = hashlib.sha1(item_json.encode("utf-8")).hexdigest()
+
+                row = conn.execute(
+                    "SELECT item_hash FROM listings WHERE source = ? AND link_key = ?", (source, key)
+                ).fetchone()
+                if row is None:
+                    conn.execute(
+                        """
+                        INSERT INTO listings (source, link, link_key, item_json, item_hash, first_seen, last_seen, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (source, link, key, item_json, item_hash, now, now, now),
+                    )
+                    counts["inserted"] += 1
+                elif row["item_hash"] != item_hash:
+                    conn.execute(
+                        """
+                        UPDATE listings SET item_json = ?, item_hash = ?, last_seen = ?, updated_at = ?
+                        WHERE source = ? AND link_key = ?
+                        """,
+                        (item_json, item_hash, now, now, source, key),
+                    )
+                    counts["updated"] += 1
+                else:
+                    conn.execute(
+                        "UPDATE listings SET last_seen = ? WHERE source = ? AND link_key = ?", (now, source, key)
+                    )
+                    counts["unchanged"] += 1
+        return counts
+
+    def get_listings(
+        self, source: str, limit: Optional[int] = None, offset: int = 0, collapse_duplicates: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Lấy listing đã gộp của source, bài thấy lần đầu gần nhất trước
+
+        Mỗi item gồm các field listing cùng first_seen/last_seen. Với collapse_duplicates,
+        các bài có duplicate_of (trùng một bài đã lưu trước) bị bỏ.
+        """
+        query = "SELECT item_json, first_seen, last_seen FROM listings WHERE source = ?"
+        if collapse_duplicates:
+            query += f" AND {NOT_DUPLICATE}"
+        query += " ORDER BY first_seen DESC, rowid"
+        params: List[Any] = [source]
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        listings = []
+        for row in rows:
+            item = json.loads(row["item_json"])
+            item["first_seen"] = row["first_seen"]
+            item["last_seen"] = row["last_seen"]
+            listings.append(item)
+        return listings
+
+    def count(self, source: str, collapse_duplicates: bool = False) -> int:
+        """Số bài viết đã lưu của source"""
+        query = "SELECT COUNT(*) FROM listings WHERE source = ?"
+        if collapse_duplicates:
+            query += f" AND {NOT_DUPLICATE}"
+        with self._connect() as conn:
+            return conn.execute(query, (source,)).fetchone()[0]
+
+    def get_links(self, source: str, limit: Optional[int] = None) -> List[str]:
+        """Các link đã lưu của source, bài thấy lần đầu gần nhất trước"""
+        query = "SELECT link FROM listings WHERE source = ? ORDER BY first_seen DESC, rowid"
+        params: List[Any] = [source]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            return [row["link"] for row in conn.execute(query, params)]
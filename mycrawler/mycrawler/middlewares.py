@@ -4,10 +4,17 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.utils.misc import load_object
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from .profiling import create_profiler, get_profile_mode
+from .recording import DEFAULT_RECORDINGS_DIR, MODE_RECORD, RECORDING_MODES, SpiderRecording
+from .resource_blocking import BLOCKING_META_KEY, ResourceBlocker
+from .sources import get_source_setting
+
 
 class MycrawlerSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -98,3 +105,225 @@ class MycrawlerDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+def _wrap_page_init_callback(request, meta_key, make_callback):
+    """
+    Bọc `playwright_page_init_callback` của request bằng `make_callback(next_callback)`
+
+    Callback gốc (trước khi middleware bọc) được lưu trong meta dưới `meta_key`. Request retry copy
+    meta nên đã chứa wrapper của lần thử trước: luôn bọc lại từ callback gốc để mỗi lần thử chỉ
+    có một wrapper của middleware.
+    """
+    if meta_key not in request.meta:
+        request.meta[meta_key] = request.meta.get("playwright_page_init_callback")
+    next_callback = request.meta[meta_key]
+    if next_callback is not None:
+        next_callback = load_object(next_callback)
+    request.meta["playwright_page_init_callback"] = make_callback(next_callback)
+
+
+class ResourceBlockingMiddleware:
+    """
+    Gắn route chặn tài nguyên (ảnh, media, font, stylesheet, tracker) vào mọi
+    Playwright request, cấu hình theo source qua PLAYWRIGHT_RESOURCE_BLOCKLIST
+    """
+
+    def __init__(self, settings, stats):
+        self.settings = settings
+        self.stats = stats
+        self.blockers = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("PLAYWRIGHT_RESOURCE_BLOCKING_ENABLED"):
+            raise NotConfigured
+        return cls(crawler.settings, crawler.stats)
+
+    def _get_blocker(self, spider):
+        """Tạo (và cache) ResourceBlocker theo cấu hình source của spider"""
+        if spider.name not in self.blockers:
+            config = get_source_setting(self.settings, "PLAYWRIGHT_RESOURCE_BLOCKLIST", spider.name, default={})
+            tracker_domains = self.settings.getlist("PLAYWRIGHT_TRACKER_DOMAINS") if config.get("block_trackers", True) else ()
+            self.blockers[spider.name] = ResourceBlocker(
+                resource_types=config.get("resource_types", ()),
+                tracker_domains=tracker_domains,
+                estimated_bytes=self.settings.getdict("PLAYWRIGHT_BLOCKED_BYTES_ESTIMATE"),
+            )
+        return self.blockers[spider.name]
+
+    def process_request(self, request, spider):
+        if not request.meta.get("playwright") or request.meta.get("resource_blocking_disabled"):
+            return None
+
+        # Thống kê tính theo từng lần thử (retry copy cả counters của lần trước)
+        request.meta.pop(BLOCKING_META_KEY, None)
+        _wrap_page_init_callback(request, "_resource_blocking_page_init", self._get_blocker(spider).make_page_init_callback)
+        return None
+
+    def process_response(self, request, response, spider):
+        counters = request.meta.get(BLOCKING_META_KEY)
+        if counters:
+            self.stats.inc_value("resource_blocking/pages")
+            self.stats.inc_value("resource_blocking/blocked_requests", counters["blocked_requests"])
+            self.stats.inc_value("resource_blocking/estimated_bytes_saved", counters["estimated_bytes_saved"])
+            for reason, count in counters["by_reason"].items():
+                self.stats.inc_value(f"resource_blocking/blocked_requests/{reason}", count)
+            spider.logger.info(
+                "🚫 Đã chặn %d requests (~%d KB) khi render %s",
+                counters["blocked_requests"],
+                counters["estimated_bytes_saved"] // 1024,
+                response.url,
+            )
+        return response
+
+
+class CrawlRecordingMiddleware:
+    """
+    Ghi lại (record) hoặc phát lại (replay) toàn bộ traffic mạng của spider, bật bằng
+    PLAYWRIGHT_RECORDING_MODE (xem recording.py)
+
+    Đặt sau ResourceBlockingMiddleware để bọc page init callback của nó, và gần download handler
+    như HttpCacheMiddleware để ghi response trước redirect/decompress.
+    """
+
+    def __init__(self, mode, recordings_dir, stats):
+        self.mode = mode
+        self.recordings_dir = recordings_dir
+        self.stats = stats
+        self.recordings = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mode = crawler.settings.get("PLAYWRIGHT_RECORDING_MODE")
+        if not mode:
+            raise NotConfigured
+        if mode not in RECORDING_MODES:
+            raise NotConfigured(f"PLAYWRIGHT_RECORDING_MODE không hợp lệ: {mode!r} (record hoặc replay)")
+        recordings_dir = crawler.settings.get("PLAYWRIGHT_RECORDING_DIR") or DEFAULT_RECORDINGS_DIR
+        middleware = cls(mode, recordings_dir, crawler.stats)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def _get_recording(self, spider):
+        if spider.name not in self.recordings:
+            recording = SpiderRecording(self.recordings_dir, spider.name)
+            if self.mode != MODE_RECORD:
+                recording.http.load()
+                spider.logger.info(
+                    "📼 Phát lại từ %s (%d HTTP response, HAR page: %s)",
+                    recording.directory,
+                    len(recording.http.entries),
+                    "có" if recording.pages_path.exists() else "không có",
+                )
+            self.recordings[spider.name] = recording
+        return self.recordings[spider.name]
+
+    def process_request(self, request, spider):
+        recording = self._get_recording(spider)
+
+        if request.meta.get("playwright"):
+            if self.mode == MODE_RECORD:
+                request.meta["playwright_context"] = recording.context_name
+                request.meta["playwright_context_kwargs"] = recording.context_kwargs()
+                self.stats.inc_value("recording/pages_recorded")
+                return None
+            if not recording.pages_path.exists():
+                self.stats.inc_value("recording/missing")
+                raise IgnoreRequest(f"Không có HAR để phát lại page: {recording.pages_path}")
+            _wrap_page_init_callback(request, "_recording_page_init", recording.make_page_init_callback)
+            self.stats.inc_value("recording/pages_replayed")
+            return None
+
+        if self.mode == MODE_RECORD:
+            return None
+        response = recording.http.response_for(request)
+        if response is None:
+            self.stats.inc_value("recording/missing")
+            raise IgnoreRequest(f"Request không có trong archive: {request.method} {request.url}")
+        self.stats.inc_value("recording/http_replayed")
+        return response
+
+    def process_response(self, request, response, spider):
+        if self.mode == MODE_RECORD and not request.meta.get("playwright"):
+            self._get_recording(spider).http.record(request, response)
+            self.stats.inc_value("recording/http_recorded")
+        return response
+
+    def spider_closed(self, spider):
+        recording = self.recordings.get(spider.name)
+        if self.mode != MODE_RECORD or recording is None:
+            return
+        if recording.http.entries:
+            recording.http.save()
+        # HAR của browser context được Playwright ghi khi download handler đóng context
+        spider.logger.info(
+            "📼 Đã ghi %d HTTP response vào %s, HAR page: %s",
+            len(recording.http.entries),
+            recording.http.path,
+            recording.pages_path,
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profile spider callback (parse, parse_feed...) khi bật MYCRAWLER_PROFILE=cpu|mem (xem profiling.py)
+
+    Callback là generator nên được profile trong lúc sinh từng kết quả; extract_article và các
+    hàm khác mà callback gọi nằm trong stack của callback. Report được ghi khi spider đóng.
+    """
+
+    def __init__(self, mode, profiles_dir):
+        self.mode = mode
+        self.profiles_dir = profiles_dir
+        self.profiler = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        try:
+            mode = get_profile_mode(crawler.settings.get("MYCRAWLER_PROFILE"))
+        except ValueError as e:
+            raise NotConfigured(str(e))
+        if mode is None:
+            raise NotConfigured
+        middleware = cls(mode, crawler.settings.get("PROFILES_DIR") or None)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.profiler = create_profiler(self.mode, spider.name, self.profiles_dir)
+        spider.logger.info("🔬 Profiling %s bật (%s)", spider.name, self.mode)
+
+    def spider_closed(self, spider):
+        if self.profiler is None:
+            return
+        path = self.profiler.save()
+        self.profiler.close()
+        spider.logger.info("🔬 Đã ghi profile: %s", path)
+
+    def _section_name(self, response):
+        callback = response.request.callback if response.request is not None else None
+        return getattr(callback, "__name__", None) or "parse"
+
+    def process_spider_output(self, response, result, spider):
+        section = self._section_name(response)
+        iterator = iter(result)
+        while True:
+            with self.profiler.section(section):
+                try:
+                    output = next(iterator)
+                except StopIteration:
+                    return
+            yield output
+
+    async def process_spider_output_async(self, response, result, spider):
+        section = self._section_name(response)
+        iterator = result.__aiter__()
+        while True:
+            with self.profiler.section(section):
+                try:
+                    output = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield output
@@ -0,0 +1,262 @@
+"""
+Phát hiện bài viết gần trùng giữa các source bằng SimHash
+Listing Adobe lấy từ trang /tag/adobe/ của TechCrunch và các bài syndicated xuất hiện ở nhiều
+source. Mỗi item được fingerprint 64-bit theo nội dung. Fingerprint được chia thành 4 block 16 bit,
+mỗi block có index riêng trong SQLite (bảng hoán vị của SimHash): hai fingerprint lệch <= 3 bit
+chắc chắn trùng nhau ở ít nhất một block, nên chỉ cần so với các item có chung một block.
+Mỗi block khớp khoảng N / 2^16 item, nên một lần tra cứu chỉ so Hamming khoảng 4N / 65536
+ứng viên (khoảng 60 ở 1 triệu item) thay vì toàn bộ store
+"""
+import hashlib
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .canonical import url_key
+from .run_history import DATA_DIR
+
+DEFAULT_DB_PATH = DATA_DIR / "content_hashes.sqlite3"
+
+SIMHASH_BITS = 64
+LSH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // LSH_BANDS
+# Khoảng cách Hamming tối đa để coi là trùng (< LSH_BANDS để LSH không bỏ sót)
+DEFAULT_MAX_DISTANCE = 3
+# Số từ mỗi shingle
+SHINGLE_SIZE = 2
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def item_text(item) -> str:
+    """Nội dung dùng để fingerprint: content, hoặc title + description với item listing"""
+    content = item.get("content")
+    if content:
+        return content
+    return " ".join(part for part in (item.get("title"), item.get("description")) if part)
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> Optional[int]:
+    """
+    SimHash 64-bit (không dấu) của text theo các shingle gồm `shingle_size` từ
+
+    Returns:
+        int hoặc None nếu text không có từ nào
+    """
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return None
+    size = min(shingle_size, len(words))
+    weights = [0] * SIMHASH_BITS
+    for i in range(len(words) - size + 1):
+        shingle = " ".join(words[i:i + size])
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def band_values(fingerprint: int) -> list:
+    """Chia fingerprint thành LSH_BANDS band, mỗi band BAND_BITS bit"""
+    mask = (1 << BAND_BITS) - 1
+    return [fingerprint >> (band * BAND_BITS) & mask for band in range(LSH_BANDS)]
+
+
+def _to_signed(fingerprint: int) -> int:
+    """SQLite INTEGER là số 64-bit có dấu"""
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << SIMHASH_BITS) if value < 0 else value
+
+
+class ContentHashStore:
+    """
+    Lưu SimHash của từng (source, link) và link gốc mà item trùng với (duplicate_of)
+
+    Item gốc là item được lưu sớm nhất trong nhóm trùng, nên duplicate_of luôn trỏ về
+    một item cũ hơn và không tạo vòng.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, max_distance: int = DEFAULT_MAX_DISTANCE):
+        if max_distance >= LSH_BANDS:
+            raise ValueError(f"max_distance phải nhỏ hơn số band LSH ({LSH_BANDS}), nhận {max_distance}")
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_distance = max_distance
+        self._conn = None
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self) -> None:
+        bands = ",\n".join(f"band{band} INTEGER NOT NULL" for band in range(LSH_BANDS))
+        indexes = "\n".join(
+            f"CREATE INDEX IF NOT EXISTS idx_content_hashes_band{band} ON content_hashes (band{band});"
+            for band in range(LSH_BANDS)
+        )
+        with self._connect() as conn:
+            # Listing run, detail prefetch và /api/crawl-detail là các process Scrapy riêng cùng ghi
+            # vào DB này; WAL để đọc không bị chặn bởi transaction ghi của process khác
+            conn.execute("PRAGMA journal_mode=WAL")
+            _migrate_bands(conn)
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS content_hashes (
+                    source TEXT NOT NULL,
+                    link_key TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    simhash INTEGER NOT NULL,
+                    {bands},
+                    duplicate_of TEXT,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (source, link_key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_content_hashes_link_key ON content_hashes (link_key);
+                {indexes}
+                """
+            )
+
+    def open(self) -> None:
+        """
+        Mở connection dùng cho cả lần chạy (pipeline gọi khi spider mở), đóng bằng close()
+
+        add() vẫn commit từng item: không giữ transaction ghi (và lock của DB) qua các lần tải trang,
+        vì process Scrapy khác có thể đang chờ ghi vào cùng DB.
+        """
+        if self._conn is None:
+            self._conn = self._connect()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def add(self, source: str, link: str, fingerprint: int) -> Optional[str]:
+        """
+        Ghi fingerprint của item và tìm item gốc mà nó trùng
+
+        Returns:
+            str: link của item gốc, hoặc None nếu item không trùng item nào cũ hơn
+        """
+        if self._conn is None:
+            conn = self._connect()
+            try:
+                with conn:
+                    return self._add(conn, source, link, fingerprint)
+            finally:
+                conn.close()
+
+        with self._conn:
+            return self._add(self._conn, source, link, fingerprint)
+
+    def _add(self, conn, source, link, fingerprint) -> Optional[str]:
+        key = url_key(link)
+        bands = band_values(fingerprint)
+        now = datetime.now().isoformat()
+        existing = conn.execute(
+            "SELECT rowid, created_at FROM content_hashes WHERE source = ? AND link_key = ?", (source, key)
+        ).fetchone()
+        if existing is None:
+            duplicate_of = self._find_original(conn, source, key, bands, fingerprint, None)
+            conn.execute(
+                f"""
+                INSERT INTO content_hashes (source, link_key, link, simhash, {_band_columns()}, duplicate_of, created_at)
+                VALUES (?, ?, ?, ?, {", ".join("?" * LSH_BANDS)}, ?, ?)
+                """,
+                (source, key, link, _to_signed(fingerprint), *bands, duplicate_of, now),
+            )
+        else:
+            duplicate_of = self._find_original(conn, source, key, bands, fingerprint, existing)
+            conn.execute(
+                f"""
+                UPDATE content_hashes SET simhash = ?, {", ".join(f"band{band} = ?" for band in range(LSH_BANDS))},
+                    duplicate_of = ?
+                WHERE source = ? AND link_key = ?
+                """,
+                (_to_signed(fingerprint), *bands, duplicate_of, source, key),
+            )
+        return duplicate_of
+
+    def _find_original(self, conn, source, key, bands, fingerprint, existing) -> Optional[str]:
+        """Item cũ nhất có chung ít nhất một band và lệch không quá max_distance bit"""
+        where = " OR ".join(f"band{band} = ?" for band in range(LSH_BANDS))
+        rows = conn.execute(
+            f"""
+            SELECT rowid, source, link_key, link, simhash, duplicate_of, created_at FROM content_hashes
+            WHERE ({where}) ORDER BY created_at, rowid
+            """,
+            bands,
+        ).fetchall()
+        for row in rows:
+            if row["source"] == source and row["link_key"] == key:
+                continue
+            # Chỉ trỏ về item cũ hơn để duplicate_of không tạo vòng
+            if existing is not None and (row["created_at"], row["rowid"]) >= (existing["created_at"], existing["rowid"]):
+                continue
+            if hamming_distance(_to_unsigned(row["simhash"]), fingerprint) <= self.max_distance:
+                return row["duplicate_of"] or row["link"]
+        return None
+
+    def get_duplicate_of(self, link: str) -> Optional[str]:
+        """Link gốc của URL (ở bất kỳ source nào), None nếu URL không phải bản trùng"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT duplicate_of FROM content_hashes WHERE link_key = ? AND duplicate_of IS NOT NULL LIMIT 1",
+                (url_key(link),),
+            ).fetchone()
+        return row["duplicate_of"] if row else None
+
+
+def _band_columns() -> str:
+    return ", ".join(f"band{band}" for band in range(LSH_BANDS))
+
+
+def _migrate_bands(conn) -> None:
+    """Tính lại band của store tạo với layout cũ (nhiều band hơn LSH_BANDS)"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(content_hashes)")}
+    if not columns or f"band{LSH_BANDS}" not in columns:
+        return
+    rows = conn.execute(
+        "SELECT source, link_key, link, simhash, duplicate_of, created_at FROM content_hashes ORDER BY rowid"
+    ).fetchall()
+    old_bands = sorted(column for column in columns if column.startswith("band"))
+    conn.execute("ALTER TABLE content_hashes RENAME TO content_hashes_old")
+    for column in old_bands:
+        conn.execute(f"DROP INDEX IF EXISTS idx_content_hashes_{column}")
+    conn.execute("DROP INDEX IF EXISTS idx_content_hashes_link_key")
+    conn.execute(
+        f"""
+        CREATE TABLE content_hashes (
+            source TEXT NOT NULL,
+            link_key TEXT NOT NULL,
+            link TEXT NOT NULL,
+            simhash INTEGER NOT NULL,
+            {", ".join(f"band{band} INTEGER NOT NULL" for band in range(LSH_BANDS))},
+            duplicate_of TEXT,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (source, link_key)
+        )
+        """
+    )
+    conn.executemany(
+        f"""
+        INSERT INTO content_hashes (source, link_key, link, simhash, {_band_columns()}, duplicate_of, created_at)
+        VALUES (?, ?, ?, ?, {", ".join("?" * LSH_BANDS)}, ?, ?)
+        """,
+        [
+            (row[0], row[1], row[2], row[3], *band_values(_to_unsigned(row[3])), row[4], row[5])
+            for row in rows
+        ],
+    )
+    conn.execute("DROP TABLE content_hashes_old")
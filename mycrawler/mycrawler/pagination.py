@@ -0,0 +1,88 @@
+"""
+Phân trang listing (ví dụ TechCrunch /page/N/) với dừng sớm
+Dừng khi cả một trang chỉ gồm các link đã lưu ở lần chạy trước: lần refresh thường chỉ
+tải một trang, còn backfill (`-a backfill=1 -a max_pages=N`) có thể đi sâu
+"""
+from scrapy import Item
+
+from .listing_history import is_known_page
+from .sources import get_source_setting
+
+# Meta key chứa số trang listing của request
+LISTING_PAGE_KEY = "listing_page"
+
+
+def get_max_pages(spider, config):
+    """Số trang tối đa: `-a max_pages=N` hoặc max_pages trong cấu hình phân trang/feed của source"""
+    value = getattr(spider, "max_pages", None)
+    if value is None:
+        value = (config or {}).get("max_pages", 1)
+    return int(value)
+
+
+def is_backfill(spider):
+    """Chạy backfill (`-a backfill=1`): không dừng sớm khi gặp trang đã biết"""
+    return str(getattr(spider, "backfill", "")).lower() in ("1", "true", "yes")
+
+
+def should_stop(spider, page, links, max_pages):
+    """
+    Quyết định có dừng phân trang sau trang `page` không
+
+    Returns:
+        str hoặc None: Lý do dừng ('empty_page', 'known_page', 'max_pages'), None nếu tải tiếp
+    """
+    if not links:
+        reason = "empty_page"
+    elif not is_backfill(spider) and is_known_page(spider, links):
+        reason = "known_page"
+    elif page >= max_pages:
+        reason = "max_pages"
+    else:
+        return None
+
+    spider.crawler.stats.set_value("pagination/stop_reason", reason)
+    spider.crawler.stats.set_value("pagination/pages", page)
+    return reason
+
+
+def paginate(spider, response, results, make_request):
+    """
+    Chuyển tiếp output của parse một trang listing, sau đó tạo request trang tiếp theo nếu cần
+
+    Args:
+        spider: Listing spider
+        response: Response của trang hiện tại
+        results: Output (items/requests) của parse trang hiện tại
+        make_request: Hàm nhận URL, trả về request tải trang đó (cùng cách tải với trang hiện tại)
+    """
+    config = get_source_setting(spider.settings, "LISTING_PAGINATION", spider.name)
+    page = response.meta.get(LISTING_PAGE_KEY, 1)
+
+    links = []
+    for result in results:
+        if isinstance(result, (Item, dict)) and result.get("link"):
+            links.append(result["link"])
+        yield result
+
+    if not config:
+        return
+
+    reason = should_stop(spider, page, links, get_max_pages(spider, config))
+    if reason:
+        spider.logger.info("⏹️ Dừng phân trang ở trang %d (%s)", page, reason)
+        return
+
+    url = page_url(config, response.meta.get("listing_base_url") or response.url, page + 1)
+    request = make_request(url)
+    request.meta[LISTING_PAGE_KEY] = page + 1
+    request.meta["listing_base_url"] = response.meta.get("listing_base_url") or response.url
+    yield request
+
+
+def page_url(config, base_url, page):
+    """URL của trang `page` theo `url_template` ({base} là URL trang đầu, có dấu / ở cuối)"""
+    base = base_url.split("?")[0].split("#")[0]
+    if not base.endswith("/"):
+        base += "/"
+    return config.get("url_template", "{base}page/{page}/").format(base=base, page=page)
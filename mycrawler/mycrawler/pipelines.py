@@ -6,8 +6,167 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+
+from .detail_store import DetailStore
+from .listing_store import ListingStore
+from .near_duplicates import DEFAULT_MAX_DISTANCE, ContentHashStore, item_text, simhash
+from .seen_urls import SeenUrlStore, url_fingerprint
 
 
 class MycrawlerPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class SeenUrlPipeline:
+    """
+    Đánh dấu `is_new` cho item dựa trên seen-URL store của spider
+
+    Mỗi link được tra cứu trực tiếp trong store (không nạp lịch sử vào bộ nhớ), chỉ các link mới
+    của lần chạy được giữ lại và ghi xuống store một lần khi spider đóng.
+    """
+
+    def __init__(self, store, stats):
+        self.store = store
+        self.stats = stats
+        # fingerprint -> link của các link mới trong lần chạy
+        self.new_links = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("SEEN_URLS_ENABLED", True):
+            raise NotConfigured
+        return cls(SeenUrlStore(crawler.settings.get("SEEN_URLS_DB") or None), crawler.stats)
+
+    def open_spider(self, spider):
+        self.store.open()
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        link = adapter.get("link")
+        if not link:
+            return item
+
+        fingerprint = url_fingerprint(link)
+        is_new = fingerprint not in self.new_links and not self.store.contains(spider.name, link)
+        adapter["is_new"] = is_new
+        if is_new:
+            self.new_links[fingerprint] = link
+            self.stats.inc_value("seen_urls/new")
+        else:
+            self.stats.inc_value("seen_urls/known")
+        return item
+
+    def close_spider(self, spider):
+        if self.new_links:
+            self.store.add_many(spider.name, self.new_links.values())
+            spider.logger.info("🆕 %d link mới (%s)", len(self.new_links), spider.name)
+        self.store.close()
+
+
+class NearDuplicatePipeline:
+    """
+    Tính SimHash theo nội dung của item và đánh dấu `duplicate_of` nếu item gần trùng
+    một bài đã lưu trước đó (ở bất kỳ source nào)
+
+    Store giữ một connection cho cả lần chạy, mỗi item được commit ngay (xem ContentHashStore.open).
+    """
+
+    def __init__(self, store, stats):
+        self.store = store
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("NEAR_DUPLICATES_ENABLED", True):
+            raise NotConfigured
+        store = ContentHashStore(
+            crawler.settings.get("NEAR_DUPLICATES_DB") or None,
+            max_distance=crawler.settings.getint("NEAR_DUPLICATES_MAX_DISTANCE", DEFAULT_MAX_DISTANCE),
+        )
+        return cls(store, crawler.stats)
+
+    def open_spider(self, spider):
+        self.store.open()
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        link = adapter.get("link")
+        fingerprint = simhash(item_text(adapter))
+        if not link or fingerprint is None:
+            return item
+
+        adapter["content_hash"] = f"{fingerprint:016x}"
+        duplicate_of = self.store.add(spider.name, link, fingerprint)
+        adapter["duplicate_of"] = duplicate_of
+        self.stats.inc_value("near_duplicates/checked")
+        if duplicate_of:
+            self.stats.inc_value("near_duplicates/found")
+            spider.logger.debug(f"Bài trùng: {link} -> {duplicate_of}")
+        return item
+
+    def close_spider(self, spider):
+        self.store.close()
+
+
+class ListingStorePipeline:
+    """
+    Gộp item của listing spider vào listing store khi spider đóng
+
+    Feed JSON của mỗi lần chạy vẫn được ghi như cũ, store giữ toàn bộ lịch sử
+    (first_seen/last_seen) cho API.
+    """
+
+    def __init__(self, store, stats):
+        self.store = store
+        self.stats = stats
+        self.items = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("LISTING_STORE_ENABLED", True):
+            raise NotConfigured
+        return cls(ListingStore(crawler.settings.get("LISTING_STORE_DB") or None), crawler.stats)
+
+    def process_item(self, item, spider):
+        if spider.name.endswith("-listing"):
+            self.items.append(ItemAdapter(item).asdict())
+        return item
+
+    def close_spider(self, spider):
+        if not self.items:
+            return
+        counts = self.store.upsert_many(spider.name, self.items)
+        for key, value in counts.items():
+            self.stats.set_value(f"listing_store/{key}", value)
+        spider.logger.info(
+            "🗂️ Listing store: %d mới, %d cập nhật, %d không đổi",
+            counts["inserted"], counts["updated"], counts["unchanged"],
+        )
+
+
+class DetailStorePipeline:
+    """
+    Ghi item của detail spider vào detail cache khi spider đóng
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.items = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("DETAIL_STORE_ENABLED", True):
+            raise NotConfigured
+        return cls(DetailStore(crawler.settings.get("DETAIL_STORE_DB") or None))
+
+    def process_item(self, item, spider):
+        if spider.name.endswith("-detail"):
+            self.items.append(ItemAdapter(item).asdict())
+        return item
+
+    def close_spider(self, spider):
+        if self.items:
+            count = self.store.save_many(spider.name, self.items)
+            spider.logger.info("🗄️ Đã lưu %d detail vào cache", count)
@@ -0,0 +1,287 @@
+"""
+Profiling tùy chọn cho spider callback và API route, bật bằng MYCRAWLER_PROFILE=cpu|mem
+
+- cpu: sampling profiler, một thread lấy stack của thread đang chạy section (callback/route)
+  mỗi SAMPLE_INTERVAL giây. Section async chỉ được tính khi task của nó đang chạy, không tính
+  lúc chờ await. Report gồm stack dạng collapsed (dùng được cho flamegraph/speedscope)
+  và các hàm tốn thời gian nhất theo từng section
+- mem: tracemalloc, đo bộ nhớ cấp phát và đỉnh bộ nhớ theo section, cùng các dòng code giữ
+  nhiều bộ nhớ nhất cuối lần chạy so với lúc bắt đầu
+
+Mỗi lần chạy (một spider run, hoặc một process API) ghi một report JSON vào data/profiles/.
+Khi không bật, middleware không được cài và route không được bọc, nên không có chi phí thêm.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .run_history import DATA_DIR
+
+PROFILE_ENV = "MYCRAWLER_PROFILE"
+PROFILES_DIR_ENV = "PROFILES_DIR"
+PROFILE_CPU = "cpu"
+PROFILE_MEM = "mem"
+PROFILE_MODES = (PROFILE_CPU, PROFILE_MEM)
+
+DEFAULT_PROFILES_DIR = DATA_DIR / "profiles"
+
+# Khoảng cách giữa hai lần lấy mẫu stack (giây)
+SAMPLE_INTERVAL = 0.005
+# Số frame tối đa của mỗi stack, số stack/hàm/dòng code giữ lại trong report
+MAX_STACK_DEPTH = 64
+MAX_STACKS = 200
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 30
+
+
+def get_profile_mode(value=None) -> Optional[str]:
+    """Mode profiling từ `value` (setting) hoặc biến môi trường MYCRAWLER_PROFILE, None nếu tắt"""
+    mode = (value or os.environ.get(PROFILE_ENV) or "").strip().lower()
+    if not mode or mode in ("0", "off", "false", "none"):
+        return None
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"{PROFILE_ENV} không hợp lệ: {mode!r} (cpu hoặc mem)")
+    return mode
+
+
+def get_profiles_dir(value=None) -> Path:
+    """Thư mục report: `value` (setting), biến môi trường PROFILES_DIR hoặc data/profiles"""
+    return Path(value or os.environ.get(PROFILES_DIR_ENV) or DEFAULT_PROFILES_DIR)
+
+
+def create_profiler(mode, target, profiles_dir=None):
+    """Profiler theo mode (None nếu mode None)"""
+    if mode is None:
+        return None
+    profiler_cls = CpuProfiler if mode == PROFILE_CPU else MemoryProfiler
+    return profiler_cls(target, profiles_dir)
+
+
+class Profiler:
+    """
+    Gom số liệu theo section (tên callback hoặc route) trong một lần chạy
+
+    Section có thể lồng nhau hoặc chạy xen kẽ (các route async trên cùng event loop).
+    """
+
+    mode = None
+
+    def __init__(self, target, profiles_dir=None):
+        self.target = target
+        self.profiles_dir = get_profiles_dir(profiles_dir)
+        self.started_at = datetime.now()
+        self.calls = Counter()
+        self.seconds = Counter()
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit(name)
+            self.calls[name] += 1
+            self.seconds[name] += time.perf_counter() - start
+
+    def _enter(self, name):
+        pass
+
+    def _exit(self, name):
+        pass
+
+    def _section_report(self, name) -> dict:
+        return {"calls": self.calls[name], "seconds": round(self.seconds[name], 4)}
+
+    def report(self) -> dict:
+        return {
+            "mode": self.mode,
+            "target": self.target,
+            "pid": os.getpid(),
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "sections": {name: self._section_report(name) for name in sorted(self.calls)},
+        }
+
+    @property
+    def path(self) -> Path:
+        return self.profiles_dir / f"{self.target}-{self.started_at:%Y%m%d-%H%M%S}-{self.mode}.json"
+
+    def save(self) -> Path:
+        """Ghi report (ghi đè report trước đó của cùng lần chạy)"""
+        self.profiles_dir.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.report(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return self.path
+
+    def close(self):
+        pass
+
+
+class CpuProfiler(Profiler):
+    """
+    Sampling profiler: chỉ lấy mẫu thread đang ở trong một section
+
+    Section mở trong một asyncio task (route async) thuộc về task đó: mẫu chỉ được tính cho section
+    khi chính task đó đang chạy trên event loop, không tính lúc task chờ await (subprocess của spider,
+    I/O), lúc loop ngồi chờ trong select hay chạy request khác. Section mở ngoài task (callback
+    đồng bộ) được tính mọi mẫu của thread cho tới khi đóng.
+    """
+
+    mode = PROFILE_CPU
+
+    def __init__(self, target, profiles_dir=None, interval=SAMPLE_INTERVAL):
+        super().__init__(target, profiles_dir)
+        self.interval = interval
+        # thread id -> {task mở section (None nếu ngoài task) -> Counter(tên section đang mở)}
+        self._active = {}
+        # thread id -> event loop của các task trong _active
+        self._loops = {}
+        # tên section -> Counter(stack collapsed)
+        self.stacks = {}
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name="mycrawler-profiler", daemon=True)
+        self._sampler.start()
+
+    def _enter(self, name):
+        thread_id = threading.get_ident()
+        task = _current_task()
+        if task is not None:
+            self._loops[thread_id] = task.get_loop()
+        self._active.setdefault(thread_id, {}).setdefault(task, Counter())[name] += 1
+
+    def _exit(self, name):
+        owners = self._active.get(threading.get_ident())
+        active = owners.get(_current_task()) if owners is not None else None
+        if active is not None:
+            active[name] -= 1
+            if active[name] <= 0:
+                del active[name]
+            if not active:
+                del owners[_current_task()]
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, owners in list(self._active.items()):
+                names = list(owners.get(None, ()))
+                loop = self._loops.get(thread_id)
+                task = asyncio.current_task(loop) if loop is not None else None
+                if task is not None:
+                    names += list(owners.get(task, ()))
+                frame = frames.get(thread_id)
+                if not names or frame is None:
+                    continue
+                stack = _collapse(frame)
+                for name in names:
+                    self.stacks.setdefault(name, Counter())[stack] += 1
+
+    def _section_report(self, name) -> dict:
+        report = super()._section_report(name)
+        stacks = self.stacks.get(name, Counter())
+        self_samples, total_samples = Counter(), Counter()
+        for stack, count in stacks.items():
+            functions = stack.split(";")
+            self_samples[functions[-1]] += count
+            for function in set(functions):
+                total_samples[function] += count
+        report.update({
+            "samples": sum(stacks.values()),
+            "sample_interval_ms": self.interval * 1000,
+            "top_functions": [
+                {"function": function, "total_samples": count, "self_samples": self_samples[function]}
+                for function, count in total_samples.most_common(TOP_FUNCTIONS)
+            ],
+            "stacks": dict(stacks.most_common(MAX_STACKS)),
+        })
+        return report
+
+    def close(self):
+        self._stopped.set()
+        self._sampler.join(timeout=1)
+
+
+class MemoryProfiler(Profiler):
+    """
+    Profiler bộ nhớ bằng tracemalloc
+
+    Theo section: tổng bộ nhớ còn giữ sau section (allocated) và đỉnh bộ nhớ trong section so với
+    lúc bắt đầu. Section lồng nhau hoặc xen kẽ làm đỉnh của section ngoài bị reset.
+    """
+
+    mode = PROFILE_MEM
+
+    def __init__(self, target, profiles_dir=None):
+        super().__init__(target, profiles_dir)
+        self._owns_tracing = not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start(MAX_STACK_DEPTH // 4)
+        self._baseline = tracemalloc.take_snapshot()
+        # (thread id, tên section) -> bộ nhớ lúc vào section
+        self._entered = {}
+        self.allocated = Counter()
+        self.peak = Counter()
+
+    def _enter(self, name):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._entered[(threading.get_ident(), name)] = current
+
+    def _exit(self, name):
+        start = self._entered.pop((threading.get_ident(), name), None)
+        if start is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self.allocated[name] += current - start
+        self.peak[name] = max(self.peak[name], peak - start)
+
+    def _section_report(self, name) -> dict:
+        report = super()._section_report(name)
+        report.update({
+            "allocated_kb": round(self.allocated[name] / 1024, 1),
+            "peak_kb": round(self.peak[name] / 1024, 1),
+        })
+        return report
+
+    def report(self) -> dict:
+        report = super().report()
+        if tracemalloc.is_tracing():
+            current, _ = tracemalloc.get_traced_memory()
+            diff = tracemalloc.take_snapshot().compare_to(self._baseline, "lineno")
+            report["traced_kb"] = round(current / 1024, 1)
+            report["top_allocations"] = [
+                {"location": str(stat.traceback[0]), "size_kb": round(stat.size_diff / 1024, 1), "count": stat.count_diff}
+                for stat in diff[:TOP_ALLOCATIONS]
+                if stat.size_diff > 0
+            ]
+        return report
+
+    def close(self):
+        if self._owns_tracing:
+            tracemalloc.stop()
+
+
+def _current_task():
+    """Asyncio task đang chạy trên thread hiện tại, None nếu không ở trong task"""
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+
+def _collapse(frame) -> str:
+    """Stack của frame dạng collapsed (hàm ngoài cùng trước, ngăn cách bởi ';')"""
+    functions = []
+    while frame is not None and len(functions) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        functions.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(functions))
@@ -0,0 +1,122 @@
+"""
+Điều kiện sẵn sàng của page thay cho các lần `wait_for_timeout` cố định
+Page được coi là sẵn sàng khi selector xuất hiện và DOM không thay đổi trong
+`quiet_ms` (MutationObserver), tối đa `timeout_ms`. Page sẵn sàng sớm sẽ trả về ngay
+"""
+from scrapy_playwright.page import PageMethod
+
+from .sources import get_source_setting
+
+# Meta key chứa tổng hợp thời gian đợi/tiết kiệm của page
+READINESS_META_KEY = "page_readiness"
+
+# Hàm JS chạy trong page: resolve {ready, waited_ms} khi selector có mặt và DOM yên lặng
+READINESS_JS = """
+async ({selector, quietMs, timeoutMs}) => {
+    const start = performance.now();
+    return await new Promise((resolve) => {
+        let done = false;
+        let observer = null;
+        let quietTimer = null;
+        let pollTimer = null;
+        let hardTimer = null;
+
+        const finish = (ready) => {
+            if (done) return;
+            done = true;
+            if (observer) observer.disconnect();
+            clearTimeout(quietTimer);
+            clearTimeout(hardTimer);
+            clearInterval(pollTimer);
+            resolve({ready: ready, waited_ms: Math.round(performance.now() - start)});
+        };
+        const armQuiet = () => {
+            clearTimeout(quietTimer);
+            quietTimer = setTimeout(() => finish(true), quietMs);
+        };
+        const observe = () => {
+            observer = new MutationObserver(armQuiet);
+            observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+            armQuiet();
+        };
+
+        hardTimer = setTimeout(() => finish(false), timeoutMs);
+        if (!selector || document.querySelector(selector)) {
+            observe();
+            return;
+        }
+        pollTimer = setInterval(() => {
+            if (document.querySelector(selector)) {
+                clearInterval(pollTimer);
+                observe();
+            }
+        }, 50);
+    });
+}
+"""
+
+
+class ReadinessPageMethod(PageMethod):
+    """
+    PageMethod đợi page sẵn sàng, ghi nhớ thời gian sleep cố định mà nó thay thế
+    để tính thời gian tiết kiệm được
+    """
+
+    def __init__(self, selector=None, quiet_ms=300, timeout_ms=5000, replaces_ms=None):
+        super().__init__(
+            "evaluate",
+            READINESS_JS,
+            {"selector": selector, "quietMs": quiet_ms, "timeoutMs": timeout_ms},
+        )
+        self.replaces_ms = replaces_ms if replaces_ms is not None else timeout_ms
+
+
+def wait_until_ready(selector=None, quiet_ms=300, timeout_ms=5000, replaces_ms=None):
+    """
+    Tạo PageMethod đợi selector xuất hiện và DOM yên lặng `quiet_ms`, tối đa `timeout_ms`
+
+    Args:
+        selector: CSS selector cần có mặt (None: chỉ đợi DOM yên lặng)
+        quiet_ms: Thời gian DOM không đổi để coi là ổn định
+        timeout_ms: Thời gian đợi tối đa (hard cap)
+        replaces_ms: Thời gian sleep cố định trước đây (mặc định bằng timeout_ms)
+    """
+    return ReadinessPageMethod(selector, quiet_ms, timeout_ms, replaces_ms)
+
+
+def page_readiness_method(spider):
+    """Tạo ReadinessPageMethod theo cấu hình PAGE_READINESS của source"""
+    config = get_source_setting(spider.settings, "PAGE_READINESS", spider.name, default={})
+    return wait_until_ready(
+        selector=config.get("selector"),
+        quiet_ms=config.get("quiet_ms", 300),
+        timeout_ms=config.get("timeout_ms", 5000),
+        replaces_ms=config.get("replaces_ms"),
+    )
+
+
+def summarize_readiness(meta):
+    """
+    Tổng hợp kết quả các ReadinessPageMethod của một request (sau khi render)
+
+    Returns:
+        dict hoặc None: {'waits', 'waited_ms', 'fixed_wait_ms', 'saved_ms', 'timed_out'}
+    """
+    page_methods = meta.get("playwright_page_methods") or ()
+    if isinstance(page_methods, dict):
+        page_methods = page_methods.values()
+
+    summary = None
+    for pm in page_methods:
+        if not isinstance(pm, ReadinessPageMethod) or not isinstance(pm.result, dict):
+            continue
+        if summary is None:
+            summary = {"waits": 0, "waited_ms": 0, "fixed_wait_ms": 0, "saved_ms": 0, "timed_out": 0}
+        waited_ms = pm.result.get("waited_ms") or 0
+        summary["waits"] += 1
+        summary["waited_ms"] += waited_ms
+        summary["fixed_wait_ms"] += pm.replaces_ms
+        summary["saved_ms"] += pm.replaces_ms - waited_ms
+        if not pm.result.get("ready"):
+            summary["timed_out"] += 1
+    return summary
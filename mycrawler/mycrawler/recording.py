@@ -0,0 +1,171 @@
+"""
+Ghi và phát lại traffic mạng của một lần crawl, để đo thời gian crawl end-to-end không phụ thuộc site thật
+Request Playwright được ghi bằng HAR của browser context (record_har_path), request HTTP thường
+(RSS, detail tải bằng HTTP) được ghi vào một archive dạng HAR riêng. Khi phát lại, page vẫn được
+render bằng Chromium với đầy đủ PageMethod (đợi, scroll), nhưng mọi request của page được trả từ
+archive (page.route_from_har) và request HTTP thường được trả ngay từ archive. Request không có
+trong archive bị hủy, nên không có request nào ra mạng.
+
+Thời gian render từng page của lần phát lại được lưu vào run history như một lần chạy thường.
+Các store có trạng thái (listing history, detail store) quyết định request nào được gửi, nên cần
+ở cùng trạng thái như lúc ghi để lần phát lại gửi đúng các request đã ghi.
+"""
+import base64
+import json
+from pathlib import Path
+from typing import Optional
+
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+
+from .run_history import DATA_DIR
+
+DEFAULT_RECORDINGS_DIR = DATA_DIR / "recordings"
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+RECORDING_MODES = (MODE_RECORD, MODE_REPLAY)
+
+# File trong thư mục của spider: HAR của browser context (content trong zip) và archive HTTP thường
+PAGES_ARCHIVE = "pages.har.zip"
+HTTP_ARCHIVE = "http.har"
+
+# Flag của response được trả từ archive
+REPLAYED_FLAG = "replayed"
+
+
+class HttpArchive:
+    """
+    Request/response HTTP thường của một spider, lưu theo định dạng HAR 1.2 (body base64)
+
+    Response được ghi trước khi qua các middleware redirect/decompress, nên khi phát lại các
+    middleware này xử lý response giống như lúc ghi.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        # (method, url, body) -> entry HAR; request lặp lại giữ response mới nhất
+        self.entries = {}
+
+    @staticmethod
+    def _key(method, url, body) -> tuple:
+        return method.upper(), url, body or ""
+
+    @staticmethod
+    def _request_key(request) -> tuple:
+        return HttpArchive._key(request.method, request.url, request.body.decode("utf-8", "replace"))
+
+    def load(self) -> "HttpArchive":
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for entry in data["log"]["entries"]:
+                har_request = entry["request"]
+                key = self._key(har_request["method"], har_request["url"], har_request.get("postData", {}).get("text"))
+                self.entries[key] = entry
+        return self
+
+    def record(self, request, response) -> None:
+        har_request = {
+            "method": request.method,
+            "url": request.url,
+            "headers": _har_headers(request.headers),
+        }
+        if request.body:
+            har_request["postData"] = {
+                "mimeType": request.headers.get("Content-Type", b"").decode("latin-1"),
+                "text": request.body.decode("utf-8", "replace"),
+            }
+        self.entries[self._request_key(request)] = {
+            "request": har_request,
+            "response": {
+                "status": response.status,
+                "headers": _har_headers(response.headers),
+                "content": {
+                    "size": len(response.body),
+                    "mimeType": response.headers.get("Content-Type", b"").decode("latin-1"),
+                    "encoding": "base64",
+                    "text": base64.b64encode(response.body).decode("ascii"),
+                },
+            },
+        }
+
+    def response_for(self, request):
+        """Response đã ghi của request, None nếu request không có trong archive"""
+        entry = self.entries.get(self._request_key(request))
+        if entry is None:
+            return None
+        har_response = entry["response"]
+        headers = Headers()
+        for header in har_response["headers"]:
+            headers.appendlist(header["name"], header["value"])
+        body = base64.b64decode(har_response["content"]["text"])
+        respcls = responsetypes.from_args(headers=headers, url=request.url, body=body)
+        return respcls(
+            url=request.url,
+            status=har_response["status"],
+            headers=headers,
+            body=body,
+            request=request,
+            flags=[REPLAYED_FLAG],
+        )
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "log": {
+                "version": "1.2",
+                "creator": {"name": "mycrawler", "version": "1.0"},
+                "entries": list(self.entries.values()),
+            }
+        }
+        self.path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class SpiderRecording:
+    """
+    Archive của một spider: data/recordings/<spider>/pages.har.zip và http.har
+    """
+
+    def __init__(self, recordings_dir, spider_name):
+        self.spider_name = spider_name
+        self.directory = Path(recordings_dir) / spider_name
+        self.pages_path = self.directory / PAGES_ARCHIVE
+        self.http = HttpArchive(self.directory / HTTP_ARCHIVE)
+
+    @property
+    def context_name(self) -> str:
+        """Browser context riêng cho lần ghi: HAR của context được ghi ra file khi context đóng"""
+        return f"recording-{self.spider_name}"
+
+    def context_kwargs(self) -> dict:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return {
+            "record_har_path": str(self.pages_path),
+            "record_har_content": "attach",
+            "record_har_mode": "full",
+        }
+
+    def make_page_init_callback(self, next_callback=None):
+        """
+        Tạo `playwright_page_init_callback` trả mọi request của page từ HAR
+
+        Route của HAR được đăng ký trước callback tiếp theo: route đăng ký sau chạy trước, nên
+        route chặn tài nguyên vẫn hủy request bị chặn và fallback các request còn lại về HAR.
+        Route của HAR đăng ký sau route của scrapy-playwright nên request không ra mạng.
+        """
+        pages_path = str(self.pages_path)
+
+        async def init_page(page, request):
+            await page.route_from_har(pages_path, not_found="abort")
+            if next_callback is not None:
+                await next_callback(page, request)
+
+        return init_page
+
+
+def _har_headers(headers: Optional[Headers]) -> list:
+    return [
+        {"name": name.decode("latin-1"), "value": value.decode("latin-1")}
+        for name, values in (headers or Headers()).items()
+        for value in values
+    ]
@@ -0,0 +1,82 @@
+"""
+Chặn tài nguyên không cần thiết ở tầng route của Playwright
+Parser chỉ cần DOM (URL ảnh nằm trong attribute), nên ảnh, media, font, tracker...
+có thể abort để giảm thời gian render và băng thông
+"""
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+# Meta key chứa thống kê chặn request của từng page
+BLOCKING_META_KEY = "resource_blocking"
+
+
+class ResourceBlocker:
+    """
+    Quyết định request nào của page bị abort và đếm số request/bytes đã tiết kiệm
+
+    Bytes tiết kiệm là ước lượng (request bị abort không bao giờ được tải về),
+    tính theo kích thước trung bình cấu hình cho từng resource type.
+    """
+
+    def __init__(
+        self,
+        resource_types: Iterable[str],
+        tracker_domains: Iterable[str] = (),
+        estimated_bytes: Optional[Dict[str, int]] = None,
+    ):
+        self.resource_types = frozenset(resource_types)
+        self.tracker_domains = tuple(d.lower().lstrip(".") for d in tracker_domains)
+        self.estimated_bytes = estimated_bytes or {}
+
+    def get_block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """
+        Trả về lý do chặn ('tracker' hoặc resource type), None nếu cho phép
+        """
+        if self.tracker_domains:
+            host = (urlparse(url).hostname or "").lower()
+            if any(host == d or host.endswith("." + d) for d in self.tracker_domains):
+                return "tracker"
+        if resource_type in self.resource_types:
+            return resource_type
+        return None
+
+    def make_page_init_callback(self, next_callback=None):
+        """
+        Tạo callback cho meta `playwright_page_init_callback`
+
+        Route được đăng ký sau handler của scrapy-playwright nên được gọi trước:
+        request bị chặn sẽ abort, request còn lại fallback về handler mặc định.
+        `next_callback` (nếu có) là init callback đã có sẵn trong meta, được gọi tiếp.
+        """
+        async def init_page(page, request):
+            # Dict mới cho mỗi page: request retry dùng chung meta (copy nông) với lần thử trước
+            counters = request.meta[BLOCKING_META_KEY] = {
+                "blocked_requests": 0,
+                "estimated_bytes_saved": 0,
+                "by_reason": {},
+            }
+
+            async def handle_route(route, playwright_request):
+                # Không bao giờ chặn document chính
+                if playwright_request.is_navigation_request():
+                    await route.fallback()
+                    return
+
+                reason = self.get_block_reason(playwright_request.resource_type, playwright_request.url)
+                if reason is None:
+                    await route.fallback()
+                    return
+
+                counters["blocked_requests"] += 1
+                counters["estimated_bytes_saved"] += self.estimated_bytes.get(
+                    playwright_request.resource_type, self.estimated_bytes.get("default", 0)
+                )
+                counters["by_reason"][reason] = counters["by_reason"].get(reason, 0) + 1
+                await route.abort()
+
+            await page.route("**", handle_route)
+
+            if next_callback is not None:
+                await next_callback(page, request)
+
+        return init_page
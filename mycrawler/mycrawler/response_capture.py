@@ -0,0 +1,175 @@
+"""
+Ghi lại các JSON response mà page tải về (Next.js data, API của CMS) khi render bằng Playwright
+Listing được lấy trực tiếp từ payload JSON thay vì duyệt DOM đã render, parser DOM
+chỉ còn là fallback khi không tìm thấy bài viết nào trong payload
+"""
+import asyncio
+import json
+from urllib.parse import urljoin
+
+from scrapy_playwright.page import PageMethod
+
+from .canonical import canonicalize_url
+from .sources import get_source_setting
+
+# Meta key chứa JsonResponseCapture của request
+CAPTURE_META_KEY = "json_capture"
+
+# Các key thường gặp của một bài viết trong payload JSON
+TITLE_KEYS = ("title", "headline", "name")
+LINK_KEYS = ("url", "href", "link", "slug", "path")
+DATE_KEYS = ("publicationDate", "publishedAt", "datePublished", "publishedDate", "publishDate", "date", "createdAt")
+
+# Giới hạn số node duyệt trong mỗi payload
+MAX_PAYLOAD_NODES = 20000
+
+
+class JsonResponseCapture:
+    """
+    Thu thập JSON response của page trong lúc render
+
+    `init_page` được dùng làm `playwright_page_init_callback` (đăng ký listener trước khi navigate),
+    `wait_method()` là PageMethod cuối cùng, đợi các response đang đọc dở trước khi page đóng.
+    """
+
+    def __init__(self, url_patterns=(), max_bytes=5_000_000):
+        self.url_patterns = tuple(url_patterns)
+        self.max_bytes = max_bytes
+        self.payloads = []
+        self.skipped = 0
+        self._tasks = []
+
+    def matches(self, url, content_type):
+        """Response có cần ghi lại không (content-type JSON và URL khớp một pattern nếu có cấu hình)"""
+        if "json" not in (content_type or ""):
+            return False
+        return not self.url_patterns or any(pattern in url for pattern in self.url_patterns)
+
+    async def init_page(self, page, request):
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        if self.matches(response.url, response.headers.get("content-type")):
+            self._tasks.append(asyncio.ensure_future(self._read(response)))
+
+    async def _read(self, response):
+        try:
+            body = await response.body()
+        except Exception:
+            # Response bị hủy hoặc page đã chuyển trang
+            self.skipped += 1
+            return
+        if len(body) > self.max_bytes:
+            self.skipped += 1
+            return
+        try:
+            self.payloads.append((response.url, json.loads(body)))
+        except ValueError:
+            self.skipped += 1
+
+    async def _wait(self, page):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        return len(self.payloads)
+
+    def wait_method(self):
+        """PageMethod đợi tất cả JSON response đã bắt được đọc xong"""
+        return PageMethod(self._wait)
+
+
+def json_capture_meta(spider):
+    """
+    Tạo meta bật JSON capture cho request theo cấu hình PLAYWRIGHT_JSON_CAPTURE của source
+
+    Returns:
+        tuple: (meta dict, PageMethod đợi capture) hoặc ({}, None) nếu source không bật capture
+    """
+    config = get_source_setting(spider.settings, "PLAYWRIGHT_JSON_CAPTURE", spider.name)
+    if not config:
+        return {}, None
+
+    capture = JsonResponseCapture(config.get("url_patterns", ()), config.get("max_bytes", 5_000_000))
+    meta = {
+        CAPTURE_META_KEY: capture,
+        "playwright_page_init_callback": capture.init_page,
+    }
+    return meta, capture.wait_method()
+
+
+def find_articles(payload, base_url, link_pattern=None):
+    """
+    Tìm các object bài viết (có title, link và ngày publish) trong một payload JSON
+
+    Args:
+        payload: JSON đã parse
+        base_url: URL của page để chuyển link/slug tương đối thành URL tuyệt đối
+        link_pattern: Chuỗi bắt buộc có trong link (ví dụ '/index/')
+
+    Returns:
+        list: [{'title', 'link', 'date', 'description'}] theo thứ tự xuất hiện
+    """
+    articles = []
+    stack = [payload]
+    visited = 0
+    while stack and visited < MAX_PAYLOAD_NODES:
+        node = stack.pop()
+        visited += 1
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        article = _as_article(node, base_url, link_pattern)
+        if article:
+            articles.append(article)
+            continue
+        stack.extend(reversed([v for v in node.values() if isinstance(v, (dict, list))]))
+    return articles
+
+
+def captured_articles(response, link_pattern=None):
+    """Lấy danh sách bài viết (không trùng link) từ các JSON response đã bắt được của request"""
+    capture = response.meta.get(CAPTURE_META_KEY)
+    if not capture:
+        return []
+
+    articles = []
+    seen = set()
+    for _, payload in capture.payloads:
+        for article in find_articles(payload, response.url, link_pattern):
+            if article["link"] not in seen:
+                seen.add(article["link"])
+                articles.append(article)
+    return articles
+
+
+def _as_article(node, base_url, link_pattern):
+    """Chuyển một dict thành bài viết nếu có đủ title, link và date"""
+    title = _first_text(node, TITLE_KEYS)
+    date = _first_text(node, DATE_KEYS)
+    link = _first_text(node, LINK_KEYS)
+    if not (title and date and link):
+        return None
+
+    # slug không có '/' -> coi là đường dẫn tương đối so với link_pattern
+    if "/" not in link and link_pattern:
+        link = f"{link_pattern.rstrip('/')}/{link}/"
+    link = canonicalize_url(urljoin(base_url, link))
+    if link_pattern and link_pattern not in link:
+        return None
+
+    return {
+        "title": " ".join(title.split()),
+        "link": link,
+        "date": date,
+        "description": _first_text(node, ("description", "excerpt", "summary")),
+    }
+
+
+def _first_text(node, keys):
+    for key in keys:
+        value = node.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
@@ -0,0 +1,235 @@
+"""
+Run history store cho các lần chạy spider
+Lưu stats cuối cùng của Scrapy và thời gian render từng page vào SQLite
+để API có thể xem xu hướng (trend) theo từng source
+"""
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from typing import Any, Dict, List, Optional
+
+# Thư mục data dùng chung giữa Scrapy (cwd=mycrawler/) và FastAPI (cwd=repo root)
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DEFAULT_DB_PATH = DATA_DIR / "run_history.sqlite3"
+
+# Hệ số để đánh dấu regression: page render chậm hơn median các lần trước bao nhiêu lần
+REGRESSION_FACTOR = 1.5
+
+
+class RunHistoryStore:
+    """
+    Lưu và truy vấn lịch sử chạy spider
+
+    Mỗi lần chạy là một dòng trong `spider_runs` (kèm toàn bộ stats dạng JSON),
+    thời gian tải/render từng page nằm trong `page_timings`.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Mở connection mới (spider và API chạy ở các process khác nhau)"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self) -> None:
+        """Tạo bảng nếu chưa có"""
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS spider_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    spider TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    finish_reason TEXT,
+                    elapsed_seconds REAL,
+                    item_scraped_count INTEGER,
+                    response_count INTEGER,
+                    response_bytes INTEGER,
+                    memory_max INTEGER,
+                    page_count INTEGER,
+                    avg_page_seconds REAL,
+                    max_page_seconds REAL,
+                    stats_json TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_spider_runs_spider ON spider_runs (spider, id);
+
+                CREATE TABLE IF NOT EXISTS page_timings (
+                    run_id INTEGER NOT NULL REFERENCES spider_runs (id),
+                    url TEXT NOT NULL,
+                    status INTEGER,
+                    seconds REAL,
+                    playwright INTEGER,
+                    meta_json TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_page_timings_run ON page_timings (run_id);
+                """
+            )
+            # Migrate DB cũ chưa có cột meta_json
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(page_timings)")}
+            if "meta_json" not in columns:
+                conn.execute("ALTER TABLE page_timings ADD COLUMN meta_json TEXT")
+
+    def record_run(self, spider: str, stats: Dict[str, Any], page_timings: List[Dict[str, Any]]) -> int:
+        """
+        Ghi một lần chạy spider
+
+        Args:
+            spider: Tên spider
+            stats: Dict stats cuối cùng của Scrapy (crawler.stats.get_stats())
+            page_timings: Danh sách {'url', 'status', 'seconds', 'playwright', 'meta'} cho từng response
+                (meta: thông tin thêm của page, ví dụ số request bị chặn)
+
+        Returns:
+            int: id của run vừa ghi
+        """
+        seconds = [p["seconds"] for p in page_timings if p.get("seconds") is not None]
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO spider_runs (
+                    spider, started_at, finished_at, finish_reason, elapsed_seconds,
+                    item_scraped_count, response_count, response_bytes, memory_max,
+                    page_count, avg_page_seconds, max_page_seconds, stats_json
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    spider,
+                    _format_time(stats.get("start_time")),
+                    _format_time(stats.get("finish_time")),
+                    stats.get("finish_reason"),
+                    stats.get("elapsed_time_seconds"),
+                    stats.get("item_scraped_count", 0),
+                    stats.get("downloader/response_count", 0),
+                    stats.get("downloader/response_bytes", 0),
+                    stats.get("memusage/max"),
+                    len(page_timings),
+                    sum(seconds) / len(seconds) if seconds else None,
+                    max(seconds) if seconds else None,
+                    json.dumps(stats, default=str, ensure_ascii=False),
+                ),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO page_timings (run_id, url, status, seconds, playwright, meta_json) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        p["url"],
+                        p.get("status"),
+                        p.get("seconds"),
+                        1 if p.get("playwright") else 0,
+                        json.dumps(p["meta"], default=str, ensure_ascii=False) if p.get("meta") else None,
+                    )
+                    for p in page_timings
+                ],
+            )
+        return run_id
+
+    def get_runs(self, spiders: List[str], limit: int = 20, include_stats: bool = False) -> List[Dict[str, Any]]:
+        """
+        Lấy các lần chạy gần nhất của danh sách spiders (mới nhất trước)
+
+        Args:
+            spiders: Danh sách tên spider
+            limit: Số run tối đa cho mỗi spider
+            include_stats: Có trả về toàn bộ stats dict không
+        """
+        runs = []
+        with self._connect() as conn:
+            for spider in spiders:
+                rows = conn.execute(
+                    "SELECT * FROM spider_runs WHERE spider = ? ORDER BY id DESC LIMIT ?",
+                    (spider, limit),
+                ).fetchall()
+                runs.extend(_row_to_run(row, include_stats) for row in rows)
+        runs.sort(key=lambda r: r["id"], reverse=True)
+        return runs
+
+    def get_latest_run(self, spider: str) -> Optional[Dict[str, Any]]:
+        """Lấy run gần nhất của một spider (None nếu chưa có)"""
+        runs = self.get_runs([spider], limit=1)
+        return runs[0] if runs else None
+
+    def get_page_timings(self, run_id: int) -> List[Dict[str, Any]]:
+        """Lấy thời gian tải/render từng page của một run"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, status, seconds, playwright, meta_json FROM page_timings WHERE run_id = ? ORDER BY rowid",
+                (run_id,),
+            ).fetchall()
+
+        timings = []
+        for row in rows:
+            timing = {key: row[key] for key in ("url", "status", "seconds", "playwright")}
+            timing["meta"] = json.loads(row["meta_json"]) if row["meta_json"] else None
+            timings.append(timing)
+        return timings
+
+    def get_trends(self, spiders: List[str], limit: int = 20) -> Dict[str, Dict[str, Any]]:
+        """
+        Tính xu hướng theo từng spider để phát hiện regression về thời gian render
+
+        Returns:
+            dict: {spider: {'runs', 'latest', 'median_*', 'regression', 'points'}}
+        """
+        trends = {}
+        for spider in spiders:
+            runs = self.get_runs([spider], limit=limit)
+            if not runs:
+                continue
+
+            latest, previous = runs[0], runs[1:]
+            previous_page = [r["avg_page_seconds"] for r in previous if r["avg_page_seconds"] is not None]
+            previous_elapsed = [r["elapsed_seconds"] for r in previous if r["elapsed_seconds"] is not None]
+            median_page = median(previous_page) if previous_page else None
+
+            # Regression khi page render của lần chạy mới nhất chậm hơn rõ rệt so với median trước đó
+            regression = bool(
+                median_page
+                and latest["avg_page_seconds"] is not None
+                and latest["avg_page_seconds"] > median_page * REGRESSION_FACTOR
+            )
+
+            trends[spider] = {
+                "runs": len(runs),
+                "latest": latest,
+                "median_avg_page_seconds": median_page,
+                "median_elapsed_seconds": median(previous_elapsed) if previous_elapsed else None,
+                "regression": regression,
+                "points": [
+                    {
+                        "id": r["id"],
+                        "finished_at": r["finished_at"],
+                        "elapsed_seconds": r["elapsed_seconds"],
+                        "avg_page_seconds": r["avg_page_seconds"],
+                        "item_scraped_count": r["item_scraped_count"],
+                    }
+                    for r in reversed(runs)
+                ],
+            }
+        return trends
+
+
+def _format_time(value: Any) -> Optional[str]:
+    """Chuyển datetime trong stats sang chuỗi ISO"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _row_to_run(row: sqlite3.Row, include_stats: bool) -> Dict[str, Any]:
+    """Chuyển một dòng spider_runs thành dict trả về cho API"""
+    run = {key: row[key] for key in row.keys() if key != "stats_json"}
+    if include_stats:
+        run["stats"] = json.loads(row["stats_json"]) if row["stats_json"] else {}
+    return run
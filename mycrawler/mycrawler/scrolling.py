@@ -0,0 +1,94 @@
+"""
+Adaptive infinite scroll cho listing spiders
+Scroll đến khi số link bài viết ngừng tăng, đạt số item tối đa, hoặc gặp một link
+đã lưu từ lần chạy trước, nên thời gian scroll tỉ lệ với lượng nội dung mới
+"""
+from scrapy_playwright.page import PageMethod
+
+from .listing_history import load_previous_links
+from .sources import get_source_setting
+
+# Meta key chứa kết quả scroll của page
+SCROLL_META_KEY = "adaptive_scroll"
+
+# Hàm JS chạy trong page, trả về {rounds, links, reason, elapsed_ms}
+SCROLL_JS = """
+async ({linkSelector, knownLinks, maxItems, stallMs, maxRounds}) => {
+    const start = performance.now();
+    const normalize = (href) => href.split('#')[0].replace(/\\/+$/, '');
+    const known = new Set(knownLinks.map(normalize));
+    const collect = () => new Set(
+        Array.from(document.querySelectorAll(linkSelector), (a) => normalize(a.href))
+    );
+    const waitForGrowth = (before) => new Promise((resolve) => {
+        const deadline = performance.now() + stallMs;
+        const check = () => {
+            if (collect().size > before) resolve(true);
+            else if (performance.now() >= deadline) resolve(false);
+            else setTimeout(check, 100);
+        };
+        check();
+    });
+
+    let links = collect();
+    let rounds = 0;
+    let reason = 'max_rounds';
+    while (rounds < maxRounds) {
+        if (links.size >= maxItems) { reason = 'max_items'; break; }
+        if (known.size && Array.from(links).some((link) => known.has(link))) { reason = 'known_link'; break; }
+
+        const before = links.size;
+        window.scrollTo(0, document.body.scrollHeight);
+        rounds += 1;
+        const grew = await waitForGrowth(before);
+        links = collect();
+        if (!grew) { reason = 'stalled'; break; }
+    }
+    window.scrollTo(0, 0);
+    return {rounds: rounds, links: links.size, reason: reason, elapsed_ms: Math.round(performance.now() - start)};
+}
+"""
+
+
+class AdaptiveScrollPageMethod(PageMethod):
+    """PageMethod chạy adaptive scroll, kết quả nằm trong `result` sau khi render"""
+
+    def __init__(self, link_selector, known_links=(), max_items=200, stall_ms=2000, max_rounds=30):
+        super().__init__(
+            "evaluate",
+            SCROLL_JS,
+            {
+                "linkSelector": link_selector,
+                "knownLinks": list(known_links),
+                "maxItems": max_items,
+                "stallMs": stall_ms,
+                "maxRounds": max_rounds,
+            },
+        )
+
+
+def adaptive_scroll_method(spider):
+    """Tạo AdaptiveScrollPageMethod theo cấu hình LISTING_SCROLL của source"""
+    config = dict(get_source_setting(spider.settings, "LISTING_SCROLL", "default", default={}))
+    config.update(get_source_setting(spider.settings, "LISTING_SCROLL", spider.name, default={}))
+
+    known_links = load_previous_links(spider, limit=config.get("known_links", 50))
+    return AdaptiveScrollPageMethod(
+        link_selector=config.get("link_selector", "a[href]"),
+        known_links=known_links,
+        max_items=config.get("max_items", 200),
+        stall_ms=config.get("stall_ms", 2000),
+        max_rounds=config.get("max_rounds", 30),
+    )
+
+
+def summarize_scroll(meta):
+    """Lấy kết quả adaptive scroll của một request (None nếu không scroll)"""
+    page_methods = meta.get("playwright_page_methods") or ()
+    if isinstance(page_methods, dict):
+        page_methods = page_methods.values()
+
+    for pm in page_methods:
+        if isinstance(pm, AdaptiveScrollPageMethod) and isinstance(pm.result, dict):
+            return pm.result
+    return None
@@ -0,0 +1,91 @@
+"""
+Seen-URL store dùng chung giữa các lần chạy
+Mỗi URL được lưu dưới dạng fingerprint 64-bit trong SQLite (on-disk hash set), theo namespace
+(tên spider). Mỗi lần tra cứu là một lookup theo khóa chính (namespace, fingerprint) nên chi phí
+và bộ nhớ không tăng theo lịch sử; pipeline giữ một connection cho cả lần chạy
+"""
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .canonical import url_key
+from .run_history import DATA_DIR
+
+DEFAULT_DB_PATH = DATA_DIR / "seen_urls.sqlite3"
+
+
+def url_fingerprint(url: str) -> int:
+    """
+    Fingerprint 64-bit (có dấu, vừa với INTEGER của SQLite) của một URL
+
+    Tính trên `url_key` nên các biến thể của cùng một URL (tracking params, www., dấu / ở cuối) trùng nhau.
+    """
+    digest = hashlib.sha1(url_key(url).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class SeenUrlStore:
+    """
+    Lưu các URL đã thấy theo namespace (ví dụ 'techcrunch-listing', 'techcrunch-detail')
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = None
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30)
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS seen_urls (
+                    namespace TEXT NOT NULL,
+                    fingerprint INTEGER NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    PRIMARY KEY (namespace, fingerprint)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def open(self) -> None:
+        """Mở connection dùng cho cả lần chạy (pipeline gọi khi spider mở), đóng bằng close()"""
+        if self._conn is None:
+            self._conn = self._connect()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def add_many(self, namespace: str, urls: Iterable[str]) -> None:
+        """Ghi các URL (bỏ qua URL đã có)"""
+        now = datetime.now().isoformat()
+        rows = [(namespace, url_fingerprint(url), now) for url in urls]
+        conn = self._conn or self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO seen_urls (namespace, fingerprint, first_seen) VALUES (?, ?, ?)", rows
+                )
+        finally:
+            if conn is not self._conn:
+                conn.close()
+
+    def contains(self, namespace: str, url: str) -> bool:
+        """Tra cứu một URL theo khóa chính (namespace, fingerprint)"""
+        conn = self._conn or self._connect()
+        try:
+            row = conn.execute(
+                "SELECT 1 FROM seen_urls WHERE namespace = ? AND fingerprint = ?",
+                (namespace, url_fingerprint(url)),
+            ).fetchone()
+        finally:
+            if conn is not self._conn:
+                conn.close()
+        return row is not None
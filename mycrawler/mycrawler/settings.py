@@ -40,27 +40,65 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "mycrawler.middlewares.MycrawlerSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    # Gần spider nhất để chỉ đo thời gian của callback
+    "mycrawler.middlewares.ProfilingMiddleware": 950,
+}
+
+# Profiling callback của spider: "cpu" (sampling) hoặc "mem" (tracemalloc), để trống sẽ đọc biến
+# môi trường MYCRAWLER_PROFILE; tắt thì middleware không được cài (không có chi phí)
+# Ví dụ: scrapy crawl techcrunch-detail -a start_url=<URL> -s MYCRAWLER_PROFILE=cpu
+MYCRAWLER_PROFILE = None
+PROFILES_DIR = None  # Mặc định: data/profiles
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "mycrawler.middlewares.MycrawlerDownloaderMiddleware": 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    "mycrawler.middlewares.ResourceBlockingMiddleware": 543,
+    "mycrawler.middlewares.CrawlRecordingMiddleware": 950,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    "mycrawler.extensions.RunStatsExtension": 500,
+}
+
+# Lưu stats của mỗi lần chạy spider vào run-history store (SQLite trong data/)
+RUN_HISTORY_ENABLED = True
+# Đường dẫn DB, để trống sẽ dùng data/run_history.sqlite3
+RUN_HISTORY_DB = None
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "mycrawler.pipelines.MycrawlerPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "mycrawler.pipelines.SeenUrlPipeline": 300,
+    "mycrawler.pipelines.NearDuplicatePipeline": 350,
+    "mycrawler.pipelines.ListingStorePipeline": 400,
+    "mycrawler.pipelines.DetailStorePipeline": 410,
+}
+
+# Seen-URL store: đánh dấu is_new cho item theo các link đã thấy ở lần chạy trước
+SEEN_URLS_ENABLED = True
+SEEN_URLS_DB = None  # Mặc định: data/seen_urls.sqlite3
+
+# Near-duplicate detection: SimHash theo nội dung, đánh dấu duplicate_of cho bài trùng giữa các source
+NEAR_DUPLICATES_ENABLED = True
+NEAR_DUPLICATES_DB = None  # Mặc định: data/content_hashes.sqlite3
+NEAR_DUPLICATES_MAX_DISTANCE = 3  # Số bit lệch tối đa (phải nhỏ hơn số band LSH = 4)
+
+# Listing store: gộp listing của các lần chạy (first_seen/last_seen), API /api/listings đọc từ đây
+LISTING_STORE_ENABLED = True
+LISTING_STORE_DB = None  # Mặc định: data/listings.sqlite3
+
+# Detail cache: item detail theo link, API /api/crawl-detail trả về từ cache nếu có
+DETAIL_STORE_ENABLED = True
+DETAIL_STORE_DB = None  # Mặc định: data/details.sqlite3
+
+# Thứ tự strategy trích xuất học từ các lần chạy trước: strategy thắng ổn định của mỗi field được thử trước,
+# page thiếu field đó được trích xuất lại bằng toàn bộ chuỗi strategy
+EXTRACTION_LEARNING_ENABLED = True
+EXTRACTION_STATS_DB = None  # Mặc định: data/extraction_stats.sqlite3
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -102,3 +140,155 @@ PLAYWRIGHT_LAUNCH_OPTIONS = {
     "headless": True,
     "args": ["--disable-blink-features=AutomationControlled"]
 }
+
+# --- Chặn tài nguyên không cần thiết khi render bằng Playwright ---
+# Parser chỉ cần DOM: URL ảnh lấy từ attribute nên không cần tải bytes của ảnh
+PLAYWRIGHT_RESOURCE_BLOCKING_ENABLED = True
+
+# Cấu hình theo source (key: tên spider, source key như 'techcrunch', hoặc 'default')
+# Chỉ chặn stylesheet ở những source không dựa vào layout để lazy-load/infinite scroll
+PLAYWRIGHT_RESOURCE_BLOCKLIST = {
+    "default": {
+        "resource_types": ["image", "media", "font"],
+        "block_trackers": True,
+    },
+    "techcrunch": {
+        "resource_types": ["image", "media", "font", "stylesheet"],
+        "block_trackers": True,
+    },
+    "openai-com": {
+        "resource_types": ["image", "media", "font"],
+        "block_trackers": True,
+    },
+    "anthropic": {
+        "resource_types": ["image", "media", "font"],
+        "block_trackers": True,
+    },
+    # Adobe listing crawl từ TechCrunch tag page, detail có thể là techcrunch.com hoặc adobe.com
+    "adobe-com": {
+        "resource_types": ["image", "media", "font"],
+        "block_trackers": True,
+    },
+    "adobe-com-detail": {
+        "resource_types": ["image", "media", "font", "stylesheet"],
+        "block_trackers": True,
+    },
+}
+
+# Các domain quảng cáo/analytics luôn bị chặn (match cả subdomain)
+PLAYWRIGHT_TRACKER_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "facebook.net",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "chartbeat.com",
+    "chartbeat.net",
+    "parsely.com",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "amplitude.com",
+    "nr-data.net",
+    "optimizely.com",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "adsrvr.org",
+    "pubmatic.com",
+    "rubiconproject.com",
+    "permutive.com",
+    "demdex.net",
+    "omtrdc.net",
+    "bat.bing.com",
+    "ads.linkedin.com",
+    "analytics.twitter.com",
+]
+
+# Kích thước trung bình (bytes) để ước lượng băng thông tiết kiệm theo resource type
+PLAYWRIGHT_BLOCKED_BYTES_ESTIMATE = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 50_000,
+    "default": 10_000,
+}
+
+# --- Ghi/phát lại traffic mạng của một lần crawl (đo thời gian end-to-end offline) ---
+# record: ghi HAR của page Playwright và response HTTP thường vào <dir>/<spider>/
+# replay: render lại page từ archive (vẫn chạy PageMethod), request không có trong archive bị hủy
+# Ví dụ: scrapy crawl techcrunch-listing -s PLAYWRIGHT_RECORDING_MODE=record
+PLAYWRIGHT_RECORDING_MODE = None  # None (tắt), "record" hoặc "replay"
+PLAYWRIGHT_RECORDING_DIR = None  # Mặc định: data/recordings
+
+# --- Điều kiện sẵn sàng của page (thay cho wait_for_timeout cố định) ---
+# Page sẵn sàng khi `selector` xuất hiện và DOM yên lặng `quiet_ms`, tối đa `timeout_ms`
+# `replaces_ms`: thời gian sleep cố định trước đây, dùng để tính thời gian tiết kiệm
+PAGE_READINESS = {
+    "default": {"selector": "body", "quiet_ms": 300, "timeout_ms": 5000, "replaces_ms": 5000},
+    "techcrunch-listing": {"selector": "article a[href]", "quiet_ms": 300, "timeout_ms": 3000, "replaces_ms": 3000},
+    "techcrunch-detail": {"selector": "h1", "quiet_ms": 300, "timeout_ms": 5000, "replaces_ms": 5000},
+    "openai-com-listing": {"selector": "a[href*='/index/']", "quiet_ms": 300, "timeout_ms": 3000, "replaces_ms": 3000},
+    "openai-com-detail": {"selector": "h1", "quiet_ms": 300, "timeout_ms": 5000, "replaces_ms": 5000},
+    "anthropic-listing": {"selector": "a[href*='/news/']", "quiet_ms": 300, "timeout_ms": 5000, "replaces_ms": 5000},
+    "anthropic-detail": {"selector": "h1", "quiet_ms": 300, "timeout_ms": 5000, "replaces_ms": 5000},
+    "adobe-com-listing": {"selector": "article a[href]", "quiet_ms": 300, "timeout_ms": 5000, "replaces_ms": 5000},
+    "adobe-com-detail": {"selector": "h1", "quiet_ms": 300, "timeout_ms": 5000, "replaces_ms": 5000},
+}
+
+# --- Adaptive infinite scroll cho listing spiders ---
+# Scroll đến khi số link khớp `link_selector` ngừng tăng trong `stall_ms`, đạt `max_items`,
+# gặp một trong `known_links` link mới nhất của lần chạy trước, hoặc hết `max_rounds` lần scroll
+LISTING_SCROLL = {
+    "default": {"link_selector": "a[href]", "max_items": 200, "stall_ms": 2000, "max_rounds": 30, "known_links": 50},
+    "anthropic-listing": {"link_selector": "a[href*='/news/']"},
+    "adobe-com-listing": {"link_selector": "article a[href*='/20']"},
+}
+
+# --- Chiến lược tải detail page theo source ---
+# "http_first": tải bằng HTTP thường (không mở browser), chỉ fallback sang Playwright khi
+# response bị chặn hoặc parser thiếu title/content; "playwright": luôn render bằng Playwright
+FETCH_STRATEGY = {
+    "default": "playwright",
+    "techcrunch": "http_first",
+    "anthropic": "http_first",
+    "adobe-com": "http_first",
+}
+
+# --- Listing từ feed (RSS/Atom, WordPress REST API) thay cho trang render ---
+# type: "rss" (RSS 2.0/Atom, phân trang bằng ?paged=N) hoặc "wordpress" (/wp-json/wp/v2/posts, ?page=N)
+# max_pages: số trang feed tối đa mỗi lần chạy (override bằng -a max_pages=N), dừng sớm như LISTING_PAGINATION
+# Feed lỗi hoặc rỗng sẽ fallback về trang render bằng Playwright; -a listing_mode=rendered để tắt feed
+LISTING_FEED_ENABLED = True
+LISTING_FEED_STATE_FILE = None  # Mặc định: data/feed_state.json (ETag/Last-Modified cho conditional GET)
+LISTING_FEEDS = {
+    "techcrunch-listing": {"type": "rss", "url": "https://techcrunch.com/category/artificial-intelligence/feed/", "max_pages": 5},
+    "adobe-com-listing": {"type": "rss", "url": "https://techcrunch.com/tag/adobe/feed/", "max_pages": 5},
+}
+
+# --- Ghi lại JSON response của page khi render bằng Playwright ---
+# url_patterns: chỉ ghi response JSON có URL chứa một trong các pattern (rỗng: mọi JSON response)
+# link_pattern: link bài viết trong payload phải chứa chuỗi này; slug không có '/' được ghép sau nó
+PLAYWRIGHT_JSON_CAPTURE = {
+    "openai-com-listing": {
+        "url_patterns": [],
+        "link_pattern": "/index/",
+        "max_bytes": 5_000_000,
+    },
+}
+
+# --- Phân trang listing render bằng Playwright ---
+# url_template: {base} là URL trang đầu (có / ở cuối), {page} là số trang (từ 2)
+# Dừng khi cả trang chỉ có link đã lưu lần trước, khi trang rỗng, hoặc đạt max_pages
+# Backfill: -a backfill=1 -a max_pages=N (bỏ qua dừng sớm)
+# Anthropic/OpenAI không có trang phân trang (Anthropic dùng adaptive scroll với dừng sớm tương tự)
+LISTING_PAGINATION = {
+    "techcrunch-listing": {"url_template": "{base}page/{page}/", "max_pages": 5},
+    "adobe-com-listing": {"url_template": "{base}page/{page}/", "max_pages": 5},
+}
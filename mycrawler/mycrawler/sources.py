@@ -0,0 +1,32 @@
+"""
+Helpers xác định source của một spider
+Spider được đặt tên theo format `{source}-{type}` (ví dụ: techcrunch-listing, openai-com-detail)
+"""
+
+SPIDER_TYPES = ("listing", "detail")
+
+
+def get_source_key(spider_name: str) -> str:
+    """
+    Lấy source key từ tên spider bằng cách bỏ hậu tố -listing/-detail
+
+    Ví dụ: 'techcrunch-listing' -> 'techcrunch', 'openai-com-detail' -> 'openai-com'
+    """
+    for spider_type in SPIDER_TYPES:
+        suffix = f"-{spider_type}"
+        if spider_name.endswith(suffix):
+            return spider_name[: -len(suffix)]
+    return spider_name
+
+
+def get_source_setting(settings, name: str, spider_name: str, default=None):
+    """
+    Đọc một setting dạng dict cấu hình theo source
+
+    Thứ tự ưu tiên: key theo tên spider -> key theo source -> key 'default'
+    """
+    config = settings.getdict(name)
+    for key in (spider_name, get_source_key(spider_name), "default"):
+        if key in config:
+            return config[key]
+    return default
@@ -1,7 +1,23 @@
 import scrapy
 from scrapy_playwright.page import PageMethod
+from ...canonical import canonicalize_url
 from ...items import MycrawlerItem
+from ...feeds import (
+    FEED_PAGE_KEY,
+    build_feed_request,
+    entry_to_item,
+    get_feed_config,
+    next_feed_request,
+    parse_feed_entries,
+    remember_validators,
+)
+from ...listing_history import load_previous_links
+from ...listing_index import DATE_CLASS_SELECTORS, ListingIndex
+from ...pagination import paginate
+from ...readiness import page_readiness_method
+from ...scrolling import adaptive_scroll_method
 import re
+from urllib.parse import urlsplit
 
 
 class AdobeComListingSpider(scrapy.Spider):
@@ -22,37 +38,88 @@ class AdobeComListingSpider(scrapy.Spider):
 
     async def start(self):
         """Khởi tạo và crawl trang listing"""
-        # Lấy URL từ start_urls hoặc từ command line argument
-        if hasattr(self, 'start_url') and self.start_url:
-            url = self.start_url
-        elif self.start_urls:
-            url = self.start_urls[0]
-        else:
-            url = "https://techcrunch.com/tag/adobe/"
+        # Đọc listing lần trước (trước khi feed bị ghi đè) để dừng phân trang sớm
+        load_previous_links(self)
+        
+        # Ưu tiên feed (HTTP thường, không mở browser), trang render bằng Playwright là fallback
+        feed_request = build_feed_request(self, self.parse_feed, self.feed_failed)
+        if feed_request is not None:
+            yield feed_request
+            return
+        
+        yield self._rendered_request()
+
+    def _rendered_request(self, url=None):
+        """Request trang listing render bằng Playwright (mặc định là trang đầu tiên)"""
+        # Trang đầu tiên: lấy URL từ start_urls hoặc từ command line argument
+        if not url:
+            if hasattr(self, 'start_url') and self.start_url:
+                url = self.start_url
+            elif self.start_urls:
+                url = self.start_urls[0]
+            else:
+                url = "https://techcrunch.com/tag/adobe/"
         
-        yield scrapy.Request(
+        return scrapy.Request(
             url,
                 meta={
                     "playwright": True,
                     "playwright_page_methods": [
                         PageMethod("wait_for_load_state", "networkidle", timeout=60000),
-                        PageMethod("wait_for_timeout", 5000),  # Đợi 5 giây để JS load xong
-                        # Scroll nhiều lần để trigger lazy load và infinite scroll
-                        PageMethod("evaluate", "window.scrollTo(0, document.body.scrollHeight / 3)"),
-                        PageMethod("wait_for_timeout", 2000),
-                        PageMethod("evaluate", "window.scrollTo(0, document.body.scrollHeight * 2 / 3)"),
-                        PageMethod("wait_for_timeout", 2000),
-                        PageMethod("evaluate", "window.scrollTo(0, document.body.scrollHeight)"),
-                        PageMethod("wait_for_timeout", 3000),  # Đợi sau khi scroll đến cuối
-                        # Scroll lại lên đầu để đảm bảo tất cả content đã render
-                        PageMethod("evaluate", "window.scrollTo(0, 0)"),
-                        PageMethod("wait_for_timeout", 2000),
+                        # Đợi bài viết xuất hiện và DOM ổn định (tối đa 5 giây) thay vì sleep cố định
+                        page_readiness_method(self),
+                        # Scroll cho đến khi không còn bài viết mới (hoặc gặp bài đã lưu lần trước)
+                        adaptive_scroll_method(self),
                     ],
                 },
             callback=self.parse
         )
 
+    def parse_feed(self, response):
+        """Parse feed RSS/Atom hoặc WordPress REST API thành listing items"""
+        page = response.meta.get(FEED_PAGE_KEY, 1)
+        if response.status == 304:
+            # Feed không đổi từ lần chạy trước -> giữ nguyên listing đã lưu
+            self.crawler.stats.inc_value("feed/not_modified")
+            self.logger.info("✅ Feed không thay đổi (304), giữ nguyên listing: %s", response.url)
+            return
+        
+        entries = parse_feed_entries(response, get_feed_config(self).get("type"))
+        self.crawler.stats.inc_value("feed/pages")
+        if not entries and page == 1:
+            self.crawler.stats.inc_value("feed/fallback")
+            self.logger.warning("⚠️ Feed không có bài viết, chuyển sang trang render: %s", response.url)
+            yield self._rendered_request()
+            return
+        
+        remember_validators(self, response)
+        self.crawler.stats.inc_value("feed/entries", len(entries))
+        # Bài mới được đăng giữa hai lần tải trang có thể làm các trang feed chồng lên nhau
+        if not hasattr(self, '_feed_links'):
+            self._feed_links = set()
+        for entry in entries:
+            if entry["link"] in self._feed_links:
+                continue
+            self._feed_links.add(entry["link"])
+            yield entry_to_item(entry)
+        self.logger.info("✅ Found %d articles from feed page %d", len(entries), page)
+        
+        next_request = next_feed_request(self, response, entries, self.parse_feed, self.feed_failed)
+        if next_request is not None:
+            yield next_request
+
+    def feed_failed(self, failure):
+        """Feed lỗi: trang đầu fallback sang trang render, các trang sau bỏ qua"""
+        self.logger.warning(f"⚠️ Lỗi tải feed {failure.request.url}: {failure.value}")
+        if failure.request.meta.get(FEED_PAGE_KEY, 1) == 1:
+            self.crawler.stats.inc_value("feed/fallback")
+            yield self._rendered_request()
+
     def parse(self, response):
+        """Parse một trang listing, tải trang tiếp theo cho đến khi gặp trang chỉ có bài đã lưu"""
+        yield from paginate(self, response, self._parse_page(response), self._rendered_request)
+
+    def _parse_page(self, response):
         """Parse listing page từ TechCrunch tag page về Adobe"""
         # Crawl từ TechCrunch tag page: https://techcrunch.com/tag/adobe/
         # Extract title, link và date từ các articles trên TechCrunch
@@ -62,6 +129,16 @@ class AdobeComListingSpider(scrapy.Spider):
         if not hasattr(self, '_seen_links'):
             self._seen_links = set()
         seen_links = self._seen_links
+        # Bài viết nằm cùng host với listing (techcrunch.com, hoặc site khác khi chạy với -a start_url=...)
+        listing_host = urlsplit(response.url).netloc
+        # Date của mọi bài trên trang được index trong một lần duyệt DOM
+        index = ListingIndex(
+            response,
+            date_selectors=DATE_CLASS_SELECTORS + (("div", "time"), ("span", "publish"), ("div", "publish")),
+            # "October 28, 2025" hoặc "2025-10-28"
+            date_pattern=r"(\w+\s+\d{1,2},\s+\d{4}|\d{4}-\d{2}-\d{2})",
+            min_date_length=6,
+        )
         
         self.logger.debug(f"Parsing URL: {response.url}")
         self.logger.debug(f"HTML length: {len(response.text)}")
@@ -91,12 +168,12 @@ class AdobeComListingSpider(scrapy.Spider):
                 continue
             
             # Làm sạch URL
-            full_url = response.urljoin(link)
+            full_url = canonicalize_url(response.urljoin(link))
             if full_url in seen_links:
                 continue
             
             # Chỉ lấy các URL từ TechCrunch về Adobe
-            if 'techcrunch.com' not in full_url:
+            if listing_host not in full_url:
                 continue
             
             # Bỏ qua các link không phải bài viết
@@ -136,7 +213,7 @@ class AdobeComListingSpider(scrapy.Spider):
                 "[class*='byline'] time::text"
             ).get()
             if not date:
-                date = self._extract_date_from_listing(article, response)
+                date = index.date_for(article)
             
             # Làm sạch date
             if date:
@@ -185,8 +262,8 @@ class AdobeComListingSpider(scrapy.Spider):
                 continue
             
             # Chỉ lấy các link từ TechCrunch
-            full_url = response.urljoin(href)
-            if 'techcrunch.com' not in full_url:
+            full_url = canonicalize_url(response.urljoin(href))
+            if listing_host not in full_url:
                 continue
             
             # Bỏ qua các link không phải bài viết
@@ -239,7 +316,7 @@ class AdobeComListingSpider(scrapy.Spider):
                             break
             
             # Extract date từ listing page
-            date = self._extract_date_from_listing(link, response)
+            date = index.date_for(link)
             
             # Yield item nếu có title hợp lệ
             if title and len(title) > 0:
@@ -266,82 +343,3 @@ class AdobeComListingSpider(scrapy.Spider):
             self.logger.debug("Response URL: %s", response.url)
         else:
             self.logger.info("✅ Found %d articles from listing page", count)
-    
-    def _extract_date_from_listing(self, element, response):
-        """Extract date từ listing page, tìm time element hoặc date text gần với element"""
-        date = None
-        
-        # Strategy 1: Tìm time element trong cùng parent container với element
-        parent = element.xpath("..")
-        if parent:
-            # Tìm time element trong parent
-            time_elements = parent.xpath(".//time")
-            if time_elements:
-                # Lấy time element đầu tiên
-                time_elem = time_elements[0]
-                # Ưu tiên lấy từ datetime attribute
-                date_text = time_elem.xpath("@datetime").get()
-                if date_text:
-                    date = date_text.strip()
-                else:
-                    # Nếu không có datetime, lấy text
-                    date_text = time_elem.xpath("normalize-space(.)").get()
-                    if date_text:
-                        date = date_text.strip()
-        
-        # Strategy 2: Tìm time element trong preceding siblings
-        if not date:
-            preceding = element.xpath("preceding-sibling::time")
-            if preceding:
-                date_text = preceding.xpath("@datetime").get()
-                if date_text:
-                    date = date_text.strip()
-                else:
-                    date_text = preceding.xpath("normalize-space(.)").get()
-                    if date_text:
-                        date = date_text.strip()
-        
-        # Strategy 3: Tìm time element trong ancestor container
-        if not date:
-            ancestors = element.xpath("ancestor::*[position() <= 5]")
-            for ancestor in ancestors:
-                time_elem = ancestor.xpath(".//time[1]")
-                if time_elem:
-                    date_text = time_elem.xpath("@datetime").get()
-                    if date_text:
-                        date = date_text.strip()
-                        break
-        
-        # Strategy 4: Tìm trong các class có chứa date/publish/time
-        if not date:
-            date_selectors = [
-                "span[class*='date']::text",
-                "div[class*='date']::text",
-                "time[class*='date']::text",
-                "span[class*='time']::text",
-                "div[class*='time']::text",
-                "span[class*='publish']::text",
-                "div[class*='publish']::text",
-            ]
-            
-            for selector in date_selectors:
-                date_elem = element.xpath("ancestor::*[position() <= 3]").css(selector).get()
-                if date_elem:
-                    date = date_elem.strip()
-                    # Validate date format (có thể là "October 28, 2025" hoặc ISO format)
-                    if date and len(date) > 5:
-                        break
-        
-        # Strategy 5: Tìm text có pattern date (Month DD, YYYY hoặc YYYY-MM-DD)
-        if not date:
-            ancestor_text = element.xpath("ancestor::*[position() <= 3]//text()").getall()
-            for text in ancestor_text:
-                text = text.strip()
-                # Tìm pattern date: "October 28, 2025" hoặc "2025-10-28"
-                date_match = re.search(r'(\w+\s+\d{1,2},\s+\d{4}|\d{4}-\d{2}-\d{2})', text)
-                if date_match:
-                    date = date_match.group(1).strip()
-                    break
-        
-        return date
-
@@ -1,6 +1,10 @@
 import scrapy
 from scrapy_playwright.page import PageMethod
+from ...canonical import canonicalize_url
 from ...items import MycrawlerItem
+from ...listing_index import ListingIndex
+from ...readiness import page_readiness_method
+from ...scrolling import adaptive_scroll_method
 import re
 
 
@@ -35,17 +39,10 @@ class AnthropicNewsListingSpider(scrapy.Spider):
                 "playwright": True,
                 "playwright_page_methods": [
                     PageMethod("wait_for_load_state", "networkidle", timeout=60000),
-                    PageMethod("wait_for_timeout", 5000),  # Đợi thêm 5 giây để JS load xong
-                    # Scroll nhiều lần để load thêm content (infinite scroll)
-                    PageMethod("evaluate", "window.scrollTo(0, document.body.scrollHeight / 3)"),
-                    PageMethod("wait_for_timeout", 2000),
-                    PageMethod("evaluate", "window.scrollTo(0, document.body.scrollHeight * 2 / 3)"),
-                    PageMethod("wait_for_timeout", 2000),
-                    PageMethod("evaluate", "window.scrollTo(0, document.body.scrollHeight)"),
-                    PageMethod("wait_for_timeout", 3000),  # Đợi sau khi scroll
-                    # Scroll lại lên đầu để đảm bảo tất cả content đã load
-                    PageMethod("evaluate", "window.scrollTo(0, 0)"),
-                    PageMethod("wait_for_timeout", 2000),
+                    # Đợi links bài viết xuất hiện và DOM ổn định (tối đa 5 giây) thay vì sleep cố định
+                    page_readiness_method(self),
+                    # Scroll cho đến khi không còn bài viết mới (hoặc gặp bài đã lưu lần trước)
+                    adaptive_scroll_method(self),
                 ],
             },
             callback=self.parse
@@ -57,6 +54,8 @@ class AnthropicNewsListingSpider(scrapy.Spider):
         
         count = 0
         seen_links = set()
+        # Date của mọi bài trên trang được index trong một lần duyệt DOM
+        index = ListingIndex(response)
         
         # Tìm tất cả các links đến các bài viết
         # Anthropic news có thể sử dụng các selector như:
@@ -75,7 +74,7 @@ class AnthropicNewsListingSpider(scrapy.Spider):
                 continue
             
             # Làm sạch URL
-            full_url = response.urljoin(link)
+            full_url = canonicalize_url(response.urljoin(link))
             if full_url in seen_links:
                 continue
             
@@ -106,7 +105,7 @@ class AnthropicNewsListingSpider(scrapy.Spider):
                     title = None
             
             # Extract date từ listing page
-            date = self._extract_date_from_listing(article, response)
+            date = index.date_for(article)
             
             # Không bắt buộc phải có date - có thể extract sau từ detail page
             # Chỉ yield item nếu có title
@@ -142,7 +141,7 @@ class AnthropicNewsListingSpider(scrapy.Spider):
                 continue
             
             # Chỉ lấy các link có format /news/... (bài viết)
-            full_url = response.urljoin(href)
+            full_url = canonicalize_url(response.urljoin(href))
             if '/news/' not in full_url:
                 continue
             
@@ -203,7 +202,7 @@ class AnthropicNewsListingSpider(scrapy.Spider):
                             title = slug.replace('-', ' ').title()
             
             # Extract date từ listing page (không bắt buộc)
-            date = self._extract_date_from_listing(link, response)
+            date = index.date_for(link)
             
             # Yield item nếu có title hợp lệ (hoặc ít nhất có link)
             if title and len(title) > 0:
@@ -230,66 +229,3 @@ class AnthropicNewsListingSpider(scrapy.Spider):
             self.logger.debug("Response URL: %s", response.url)
         else:
             self.logger.info("✅ Found %d articles from listing page", count)
-    
-    def _extract_date_from_listing(self, element, response):
-        """Extract date từ listing page, tìm time element gần với element"""
-        date = None
-        
-        # Strategy 1: Tìm time element trong cùng parent container với element
-        parent = element.xpath("..")
-        if parent:
-            # Tìm time element trong parent
-            time_elements = parent.xpath(".//time")
-            if time_elements:
-                # Lấy time element đầu tiên
-                time_elem = time_elements[0]
-                # Ưu tiên lấy từ datetime attribute
-                date_text = time_elem.xpath("@datetime").get()
-                if date_text:
-                    date = date_text.strip()
-                else:
-                    # Nếu không có datetime, lấy text
-                    date_text = time_elem.xpath("normalize-space(.)").get()
-                    if date_text:
-                        date = date_text.strip()
-        
-        # Strategy 2: Tìm time element trong preceding siblings
-        if not date:
-            preceding = element.xpath("preceding-sibling::time")
-            if preceding:
-                date_text = preceding.xpath("@datetime").get()
-                if date_text:
-                    date = date_text.strip()
-                else:
-                    date_text = preceding.xpath("normalize-space(.)").get()
-                    if date_text:
-                        date = date_text.strip()
-        
-        # Strategy 3: Tìm time element trong ancestor container
-        if not date:
-            ancestors = element.xpath("ancestor::*[position() <= 5]")  # Chỉ tìm 5 levels up
-            for ancestor in ancestors:
-                time_elem = ancestor.xpath(".//time[1]")
-                if time_elem:
-                    date_text = time_elem.xpath("@datetime").get()
-                    if date_text:
-                        date = date_text.strip()
-                        break
-        
-        # Strategy 4: Tìm trong các class có chứa date/publish
-        if not date:
-            date_selectors = [
-                "span[class*='date']::text",
-                "div[class*='date']::text",
-                "time[class*='date']::text",
-                "span[class*='time']::text",
-            ]
-            
-            for selector in date_selectors:
-                date_elem = element.xpath("ancestor::*[position() <= 3]").css(selector).get()
-                if date_elem:
-                    date = date_elem.strip()
-                    break
-        
-        return date
-
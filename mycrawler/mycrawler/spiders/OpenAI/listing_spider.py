@@ -1,6 +1,11 @@
 import scrapy
 from scrapy_playwright.page import PageMethod
+from ...canonical import canonicalize_url
 from ...items import MycrawlerItem
+from ...listing_index import ListingIndex
+from ...readiness import page_readiness_method
+from ...response_capture import CAPTURE_META_KEY, captured_articles, json_capture_meta
+from ...sources import get_source_setting
 import re
 
 
@@ -29,25 +34,64 @@ class OpenAIComListingSpider(scrapy.Spider):
         else:
             url = "https://openai.com/research/index/"
         
+        # Ghi lại các JSON response mà page tải (listing lấy từ payload thay vì DOM)
+        capture_meta, capture_wait = json_capture_meta(self)
+        page_methods = [
+            PageMethod("wait_for_load_state", "networkidle", timeout=60000),
+            # Đợi danh sách bài viết xuất hiện và DOM ổn định (tối đa 3 giây) thay vì sleep cố định
+            page_readiness_method(self),
+        ]
+        if capture_wait is not None:
+            page_methods.append(capture_wait)
+        
         yield scrapy.Request(
             url,
             meta={
                 "playwright": True,
-                "playwright_page_methods": [
-                    PageMethod("wait_for_load_state", "networkidle", timeout=60000),
-                    PageMethod("wait_for_timeout", 3000),  # Đợi thêm 3 giây để JS load xong
-                ],
+                "playwright_page_methods": page_methods,
+                **capture_meta,
             },
             callback=self.parse
         )
 
     def parse(self, response):
+        """Parse listing từ JSON payload đã bắt được, fallback về DOM nếu không có bài viết nào"""
+        capture_config = get_source_setting(self.settings, "PLAYWRIGHT_JSON_CAPTURE", self.name, default={})
+        articles = captured_articles(response, link_pattern=capture_config.get("link_pattern"))
+        
+        if articles:
+            for article in articles:
+                item = MycrawlerItem()
+                item["title"] = article["title"]
+                item["link"] = article["link"]
+                item["date"] = article["date"]
+                item["description"] = article["description"]
+                # Set các field không cần thiết về None
+                item["content"] = None
+                item["content_length"] = 0
+                item["authors"] = None
+                item["tags"] = None
+                item["images"] = None
+                yield item
+            
+            self.crawler.stats.inc_value("json_capture/items", len(articles))
+            self.logger.info("✅ Found %d research articles from captured JSON", len(articles))
+            return
+        
+        if CAPTURE_META_KEY in response.meta:
+            self.crawler.stats.inc_value("json_capture/fallback_dom")
+            self.logger.info("⚠️ Không tìm thấy bài viết trong JSON response, parse từ DOM")
+        yield from self._parse_dom(response)
+
+    def _parse_dom(self, response):
         # Trang OpenAI research index sử dụng Next.js và load nội dung qua API
         # Extract title, link và date trực tiếp từ listing page, không vào detail page
         # CHỈ lấy links từ main content area, không lấy từ sidebar
         
         count = 0
         seen_links = set()
+        # Date của mọi link được index trong một lần duyệt DOM (OpenAI chỉ dùng <time>)
+        index = ListingIndex(response, date_selectors=())
         
         # Tìm tất cả các links đến các bài research
         # Format: /index/[slug] (bài research)
@@ -75,7 +119,7 @@ class OpenAIComListingSpider(scrapy.Spider):
                 continue
             
             # Làm sạch URL
-            full_url = response.urljoin(href)
+            full_url = canonicalize_url(response.urljoin(href))
             if full_url in seen_links:
                 continue
             
@@ -103,7 +147,7 @@ class OpenAIComListingSpider(scrapy.Spider):
                     title = None
             
             # Extract date từ listing page (tìm element date gần với link)
-            date = self._extract_date_from_listing(link, response)
+            date = index.date_for(link)
             
             # BỎ QUA các links không có date (thường là từ sidebar, không phải main listing)
             # Các links trong main listing page đều có date element gần đó
@@ -133,53 +177,3 @@ class OpenAIComListingSpider(scrapy.Spider):
             self.logger.debug("Response URL: %s", response.url)
         else:
             self.logger.info("✅ Found %d research articles from listing page", count)
-    
-    def _extract_date_from_listing(self, link_element, response):
-        """Extract date từ listing page, tìm time element gần với link"""
-        date = None
-        
-        # Strategy 1: Tìm time element trong cùng parent container với link
-        # Dựa trên phân tích HTML: time element nằm trước link trong cùng container
-        parent = link_element.xpath("..")
-        if parent:
-            # Tìm time element trong parent (có thể là sibling trước link)
-            time_elements = parent.xpath(".//time")
-            if time_elements:
-                # Lấy time element đầu tiên (thường là gần nhất)
-                time_elem = time_elements[0]
-                # Ưu tiên lấy từ datetime attribute
-                date_text = time_elem.xpath("@datetime").get()
-                if date_text:
-                    date = date_text.strip()
-                else:
-                    # Nếu không có datetime, lấy text
-                    date_text = time_elem.xpath("normalize-space(.)").get()
-                    if date_text:
-                        date = date_text.strip()
-        
-        # Strategy 2: Tìm time element trong preceding siblings
-        if not date:
-            preceding = link_element.xpath("preceding-sibling::time")
-            if preceding:
-                date_text = preceding.xpath("@datetime").get()
-                if date_text:
-                    date = date_text.strip()
-                else:
-                    date_text = preceding.xpath("normalize-space(.)").get()
-                    if date_text:
-                        date = date_text.strip()
-        
-        # Strategy 3: Tìm time element trong ancestor container (cùng row/item)
-        if not date:
-            # Tìm ancestor container và tìm time trong đó
-            ancestors = link_element.xpath("ancestor::*[position() <= 5]")  # Chỉ tìm 5 levels up
-            for ancestor in ancestors:
-                time_elem = ancestor.xpath(".//time[1]")
-                if time_elem:
-                    date_text = time_elem.xpath("@datetime").get()
-                    if date_text:
-                        date = date_text.strip()
-                        break
-        
-        return date
-
@@ -1,6 +1,20 @@
 import scrapy
 from scrapy_playwright.page import PageMethod
+from ...canonical import canonicalize_url
 from ...items import MycrawlerItem
+from ...feeds import (
+    FEED_PAGE_KEY,
+    build_feed_request,
+    entry_to_item,
+    get_feed_config,
+    next_feed_request,
+    parse_feed_entries,
+    remember_validators,
+)
+from ...listing_history import load_previous_links
+from ...listing_index import ListingIndex
+from ...pagination import paginate
+from ...readiness import page_readiness_method
 import re
 
 
@@ -21,32 +35,93 @@ class TechCrunchListingSpider(scrapy.Spider):
     }
 
     async def start(self):
-        # Lấy URL từ start_urls hoặc từ command line argument
-        if hasattr(self, 'start_url') and self.start_url:
-            url = self.start_url
-        elif self.start_urls:
-            url = self.start_urls[0]
-        else:
-            url = "https://techcrunch.com/category/artificial-intelligence/"
+        # Đọc listing lần trước (trước khi feed bị ghi đè) để dừng phân trang sớm
+        load_previous_links(self)
+        
+        # Ưu tiên feed (HTTP thường, không mở browser), trang render bằng Playwright là fallback
+        feed_request = build_feed_request(self, self.parse_feed, self.feed_failed)
+        if feed_request is not None:
+            yield feed_request
+            return
         
-        yield scrapy.Request(
+        yield self._rendered_request()
+
+    def _rendered_request(self, url=None):
+        """Request trang listing render bằng Playwright (mặc định là trang đầu tiên)"""
+        # Trang đầu tiên: lấy URL từ start_urls hoặc từ command line argument
+        if not url:
+            if hasattr(self, 'start_url') and self.start_url:
+                url = self.start_url
+            elif self.start_urls:
+                url = self.start_urls[0]
+            else:
+                url = "https://techcrunch.com/category/artificial-intelligence/"
+        
+        return scrapy.Request(
             url,
             meta={
                 "playwright": True,
                 "playwright_page_methods": [
                     PageMethod("wait_for_load_state", "networkidle", timeout=60000),
-                    PageMethod("wait_for_timeout", 3000),  # Đợi thêm 3 giây để JS load xong
+                    # Đợi danh sách bài viết xuất hiện và DOM ổn định (tối đa 3 giây) thay vì sleep cố định
+                    page_readiness_method(self),
                 ],
             },
             callback=self.parse
         )
 
+    def parse_feed(self, response):
+        """Parse feed RSS/Atom hoặc WordPress REST API thành listing items"""
+        page = response.meta.get(FEED_PAGE_KEY, 1)
+        if response.status == 304:
+            # Feed không đổi từ lần chạy trước -> giữ nguyên listing đã lưu
+            self.crawler.stats.inc_value("feed/not_modified")
+            self.logger.info("✅ Feed không thay đổi (304), giữ nguyên listing: %s", response.url)
+            return
+        
+        entries = parse_feed_entries(response, get_feed_config(self).get("type"))
+        self.crawler.stats.inc_value("feed/pages")
+        if not entries and page == 1:
+            self.crawler.stats.inc_value("feed/fallback")
+            self.logger.warning("⚠️ Feed không có bài viết, chuyển sang trang render: %s", response.url)
+            yield self._rendered_request()
+            return
+        
+        remember_validators(self, response)
+        self.crawler.stats.inc_value("feed/entries", len(entries))
+        # Bài mới được đăng giữa hai lần tải trang có thể làm các trang feed chồng lên nhau
+        if not hasattr(self, '_feed_links'):
+            self._feed_links = set()
+        for entry in entries:
+            if entry["link"] in self._feed_links:
+                continue
+            self._feed_links.add(entry["link"])
+            yield entry_to_item(entry)
+        self.logger.info("✅ Found %d articles from feed page %d", len(entries), page)
+        
+        next_request = next_feed_request(self, response, entries, self.parse_feed, self.feed_failed)
+        if next_request is not None:
+            yield next_request
+
+    def feed_failed(self, failure):
+        """Feed lỗi: trang đầu fallback sang trang render, các trang sau bỏ qua"""
+        self.logger.warning(f"⚠️ Lỗi tải feed {failure.request.url}: {failure.value}")
+        if failure.request.meta.get(FEED_PAGE_KEY, 1) == 1:
+            self.crawler.stats.inc_value("feed/fallback")
+            yield self._rendered_request()
+
     def parse(self, response):
+        """Parse một trang listing, tải trang tiếp theo cho đến khi gặp trang chỉ có bài đã lưu"""
+        yield from paginate(self, response, self._parse_page(response), self._rendered_request)
+
+    def _parse_page(self, response):
         # TechCrunch category page sử dụng cấu trúc HTML với các bài viết
         # Extract title, link và date trực tiếp từ listing page
         
         count = 0
         seen_links = set()
+        # Date/author của mọi bài trên trang được index trong một lần duyệt DOM
+        index = ListingIndex(response)
         
         # Tìm tất cả các links đến các bài viết
         # TechCrunch có thể sử dụng các selector như:
@@ -65,7 +140,7 @@ class TechCrunchListingSpider(scrapy.Spider):
                 continue
             
             # Làm sạch URL
-            full_url = response.urljoin(link)
+            full_url = canonicalize_url(response.urljoin(link))
             if full_url in seen_links:
                 continue
             
@@ -90,10 +165,10 @@ class TechCrunchListingSpider(scrapy.Spider):
                     title = None
             
             # Extract date từ listing page
-            date = self._extract_date_from_listing(article, response)
+            date = index.date_for(article)
             
             # Extract author nếu có trên listing page
-            author = self._extract_author_from_listing(article, response)
+            author = index.author_for(article)
             authors = [author] if author else None
             
             # Chỉ yield item nếu có title và link hợp lệ
@@ -123,7 +198,7 @@ class TechCrunchListingSpider(scrapy.Spider):
                     continue
                 
                 # Chỉ lấy các link có format bài viết
-                full_url = response.urljoin(href)
+                full_url = canonicalize_url(response.urljoin(href))
                 if not re.search(r'/\d{4}/\d{2}/\d{2}/', full_url):
                     continue
                 
@@ -148,10 +223,10 @@ class TechCrunchListingSpider(scrapy.Spider):
                         continue
                 
                 # Extract date từ listing page
-                date = self._extract_date_from_listing(link, response)
+                date = index.date_for(link)
                 
                 # Extract author
-                author = self._extract_author_from_listing(link, response)
+                author = index.author_for(link)
                 authors = [author] if author else None
                 
                 if title:
@@ -175,100 +250,3 @@ class TechCrunchListingSpider(scrapy.Spider):
             self.logger.debug("Response URL: %s", response.url)
         else:
             self.logger.info("✅ Found %d articles from listing page", count)
-    
-    def _extract_date_from_listing(self, element, response):
-        """Extract date từ listing page, tìm time element gần với element"""
-        date = None
-        
-        # Strategy 1: Tìm time element trong cùng parent container với element
-        parent = element.xpath("..")
-        if parent:
-            # Tìm time element trong parent
-            time_elements = parent.xpath(".//time")
-            if time_elements:
-                # Lấy time element đầu tiên
-                time_elem = time_elements[0]
-                # Ưu tiên lấy từ datetime attribute
-                date_text = time_elem.xpath("@datetime").get()
-                if date_text:
-                    date = date_text.strip()
-                else:
-                    # Nếu không có datetime, lấy text
-                    date_text = time_elem.xpath("normalize-space(.)").get()
-                    if date_text:
-                        date = date_text.strip()
-        
-        # Strategy 2: Tìm time element trong preceding siblings
-        if not date:
-            preceding = element.xpath("preceding-sibling::time")
-            if preceding:
-                date_text = preceding.xpath("@datetime").get()
-                if date_text:
-                    date = date_text.strip()
-                else:
-                    date_text = preceding.xpath("normalize-space(.)").get()
-                    if date_text:
-                        date = date_text.strip()
-        
-        # Strategy 3: Tìm time element trong ancestor container
-        if not date:
-            ancestors = element.xpath("ancestor::*[position() <= 5]")
-            for ancestor in ancestors:
-                time_elem = ancestor.xpath(".//time[1]")
-                if time_elem:
-                    date_text = time_elem.xpath("@datetime").get()
-                    if date_text:
-                        date = date_text.strip()
-                        break
-        
-        # Strategy 4: Tìm trong các class có chứa date/publish
-        if not date:
-            date_selectors = [
-                "span[class*='date']::text",
-                "div[class*='date']::text",
-                "time[class*='date']::text",
-                "span[class*='time']::text",
-            ]
-            
-            for selector in date_selectors:
-                date_elem = element.xpath("ancestor::*[position() <= 3]").css(selector).get()
-                if date_elem:
-                    date = date_elem.strip()
-                    break
-        
-        return date
-    
-    def _extract_author_from_listing(self, element, response):
-        """Extract author từ listing page"""
-        author = None
-        
-        # Strategy 1: Tìm author element trong cùng parent container
-        parent = element.xpath("..")
-        if parent:
-            author_elements = parent.xpath(".//*[contains(@class, 'author')]")
-            if author_elements:
-                author_text = author_elements[0].xpath("normalize-space(.)").get()
-                if author_text:
-                    author = author_text.strip()
-        
-        # Strategy 2: Tìm trong ancestor container
-        if not author:
-            ancestors = element.xpath("ancestor::*[position() <= 5]")
-            for ancestor in ancestors:
-                author_elem = ancestor.xpath(".//*[contains(@class, 'author')]")
-                if author_elem:
-                    author_text = author_elem[0].xpath("normalize-space(.)").get()
-                    if author_text:
-                        author = author_text.strip()
-                        break
-        
-        # Strategy 3: Tìm link có /author/ trong URL
-        if not author:
-            author_link = element.xpath("ancestor::*[position() <= 5]//a[contains(@href, '/author/')]")
-            if author_link:
-                author_text = author_link[0].xpath("normalize-space(.)").get()
-                if author_text:
-                    author = author_text.strip()
-        
-        return author
-
@@ -0,0 +1,94 @@
+"""
+Thống kê strategy trích xuất theo source, dùng chung giữa các lần chạy
+Với mỗi (source, field), đếm số page mà từng strategy (selector, pattern hoặc dữ liệu có cấu trúc)
+cho ra giá trị, và số page không strategy nào có giá trị. Strategy thắng ổn định được engine
+trích xuất thử trước (xem AdaptiveExtractor trong extraction.py)
+"""
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from .run_history import DATA_DIR
+
+DEFAULT_DB_PATH = DATA_DIR / "extraction_stats.sqlite3"
+
+# Strategy của page không có giá trị cho field
+MISS = ""
+
+# Một strategy được coi là thắng khi đã có ít nhất MIN_SAMPLES page và thắng ở ít nhất MIN_WIN_RATE số page
+MIN_SAMPLES = 20
+MIN_WIN_RATE = 0.9
+
+
+class StrategyStatsStore:
+    """
+    Lưu số lần thắng của từng strategy theo (source, field)
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30)
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS strategy_stats (
+                    source TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    strategy TEXT NOT NULL,
+                    hits INTEGER NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (source, field, strategy)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def add_hits(self, source: str, hits: Dict[tuple, int]) -> None:
+        """
+        Cộng số lần thắng của một lần chạy
+
+        Args:
+            hits: {(field, strategy): số page}, strategy là MISS nếu page không có giá trị
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO strategy_stats (source, field, strategy, hits, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source, field, strategy) DO UPDATE SET
+                    hits = hits + excluded.hits, updated_at = excluded.updated_at
+                """,
+                [(source, field, strategy, count, now) for (field, strategy), count in hits.items()],
+            )
+
+    def get_stats(self, source: str) -> Dict[str, Dict[str, int]]:
+        """{field: {strategy: hits}} của source"""
+        stats = {}
+        with self._connect() as conn:
+            rows = conn.execute("SELECT field, strategy, hits FROM strategy_stats WHERE source = ?", (source,))
+            for field, strategy, hits in rows:
+                stats.setdefault(field, {})[strategy] = hits
+        return stats
+
+    def winners(self, source: str, min_samples: int = MIN_SAMPLES, min_win_rate: float = MIN_WIN_RATE) -> Dict[str, str]:
+        """
+        Strategy thắng ổn định của từng field
+
+        Field thường không có giá trị (MISS chiếm đa số) hoặc chưa đủ page thì không có strategy thắng.
+
+        Returns:
+            dict: {field: strategy}
+        """
+        winners = {}
+        for field, counts in self.get_stats(source).items():
+            total = sum(counts.values())
+            strategy, hits = max(counts.items(), key=lambda entry: entry[1])
+            if strategy != MISS and total >= min_samples and hits / total >= min_win_rate:
+                winners[field] = strategy
+        return winners
@@ -0,0 +1,211 @@
+"""
+Trích xuất dữ liệu có cấu trúc của detail page: JSON-LD, OpenGraph/article meta, Next.js __NEXT_DATA__
+Các nguồn này được parse một lần cho mỗi page, detail spider chỉ chạy rule của source
+cho những field còn thiếu
+"""
+import json
+
+# Các field có thể lấy từ dữ liệu có cấu trúc
+STRUCTURED_FIELDS = ("title", "description", "authors", "date", "tags")
+
+# Các @type của JSON-LD mô tả bài viết (ưu tiên theo thứ tự)
+ARTICLE_TYPES = ("NewsArticle", "Article", "BlogPosting", "TechArticle", "ReportageNewsArticle", "WebPage")
+
+# Các key ngày publish thường gặp trong __NEXT_DATA__ (CMS headless)
+NEXT_DATE_KEYS = ("publishedAt", "datePublished", "publishedDate", "publicationDate", "publishDate", "date")
+NEXT_TITLE_KEYS = ("title", "headline", "name")
+
+# Giới hạn số node duyệt trong __NEXT_DATA__ (payload có thể rất lớn)
+MAX_NEXT_DATA_NODES = 5000
+
+
+def extract_structured_data(response, stats=None, parts=None):
+    """
+    Parse JSON-LD, OpenGraph và __NEXT_DATA__ của page
+
+    Thứ tự ưu tiên cho mỗi field: JSON-LD -> __NEXT_DATA__ -> OpenGraph/article meta.
+
+    Args:
+        response: Scrapy response của detail page
+        stats: Scrapy stats collector (nếu có) để đếm field tìm được
+        parts: Dữ liệu thô đã thu thập sẵn khi duyệt cây (xem `collect_parts`), None để tự đọc từ response
+
+    Returns:
+        dict: {field: value} chỉ gồm các field tìm được (title, description, authors, date, tags)
+    """
+    if parts is None:
+        parts = collect_parts(response)
+    sources = (_from_json_ld(parts["ld_json"]), _from_next_data(parts["next_data"]), _from_meta(parts["meta"]))
+
+    data = {}
+    for field in STRUCTURED_FIELDS:
+        for source in sources:
+            value = source.get(field)
+            if value:
+                data[field] = value
+                break
+
+    if data.get("title"):
+        data["title"] = _strip_site_name(data["title"], next(iter(parts["meta"].get("og:site_name", [])), None))
+
+    if stats is not None:
+        for field in data:
+            stats.inc_value(f"structured_data/{field}")
+    return data
+
+
+def collect_parts(response):
+    """
+    Đọc dữ liệu thô từ response: text của các script JSON-LD, __NEXT_DATA__ và meta theo property/name
+
+    Returns:
+        dict: {'ld_json': [str], 'next_data': str hoặc None, 'meta': {key: [content]}}
+    """
+    meta = {}
+    for node in response.css("meta[content]"):
+        for attr in ("property", "name"):
+            key = node.attrib.get(attr)
+            if key:
+                meta.setdefault(key, []).append(node.attrib["content"])
+    return {
+        "ld_json": response.css("script[type='application/ld+json']::text").getall(),
+        "next_data": response.css("script#__NEXT_DATA__::text").get(),
+        "meta": meta,
+    }
+
+
+def _from_json_ld(scripts):
+    """Lấy các field từ node bài viết trong các script application/ld+json"""
+    nodes = []
+    for script in scripts:
+        try:
+            nodes.extend(_flatten_json_ld(json.loads(script)))
+        except ValueError:
+            continue
+
+    article = None
+    for article_type in ARTICLE_TYPES:
+        article = next((node for node in nodes if article_type in _as_list(node.get("@type"))), None)
+        if article:
+            break
+    if not article:
+        return {}
+
+    keywords = article.get("keywords")
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+
+    return {
+        "title": _clean_text(article.get("headline") or article.get("name")),
+        "description": _clean_text(article.get("description")),
+        "authors": _names(article.get("author")),
+        "date": _clean_text(article.get("datePublished") or article.get("dateCreated")),
+        "tags": _unique(_clean_text(k) for k in _as_list(keywords) if isinstance(k, str)),
+    }
+
+
+def _flatten_json_ld(data):
+    """Trải phẳng JSON-LD (list, @graph) thành danh sách node dạng dict"""
+    nodes = []
+    for node in _as_list(data):
+        if not isinstance(node, dict):
+            continue
+        nodes.append(node)
+        if "@graph" in node:
+            nodes.extend(_flatten_json_ld(node["@graph"]))
+    return nodes
+
+
+def _from_next_data(script):
+    """Tìm object bài viết trong pageProps của Next.js (__NEXT_DATA__)"""
+    if not script:
+        return {}
+    try:
+        page_props = json.loads(script).get("props", {}).get("pageProps", {})
+    except (ValueError, AttributeError):
+        return {}
+
+    # Duyệt theo chiều rộng: object đầu tiên có cả title và ngày publish được coi là bài viết
+    queue = [page_props]
+    visited = 0
+    while queue and visited < MAX_NEXT_DATA_NODES:
+        node = queue.pop(0)
+        visited += 1
+        if isinstance(node, list):
+            queue.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        title = next((node[k] for k in NEXT_TITLE_KEYS if isinstance(node.get(k), str)), None)
+        date = next((node[k] for k in NEXT_DATE_KEYS if isinstance(node.get(k), str)), None)
+        if title and date:
+            return {
+                "title": _clean_text(title),
+                "description": _clean_text(node.get("description") or node.get("excerpt") or node.get("summary")),
+                "authors": _names(node.get("authors") or node.get("author")),
+                "date": _clean_text(date),
+                "tags": _names(node.get("tags") or node.get("categories")),
+            }
+        queue.extend(v for v in node.values() if isinstance(v, (dict, list)))
+    return {}
+
+
+def _from_meta(meta):
+    """Lấy các field từ OpenGraph và article:* meta"""
+    def first(prop):
+        return next(iter(meta.get(prop, [])), None)
+
+    # article:author có thể là URL trang tác giả thay vì tên
+    authors = [a for a in meta.get("article:author", []) if not a.startswith(("http://", "https://"))]
+    return {
+        "title": _clean_text(first("og:title")),
+        "description": _clean_text(first("og:description")),
+        "authors": _unique(_clean_text(a) for a in authors),
+        "date": _clean_text(first("article:published_time")),
+        "tags": _unique(_clean_text(t) for t in meta.get("article:tag", [])),
+    }
+
+
+def _strip_site_name(title, site_name):
+    """Bỏ hậu tố tên site (' | TechCrunch', ' - Anthropic'...) khỏi title"""
+    if site_name:
+        for separator in (" | ", " - ", " – ", " — "):
+            suffix = f"{separator}{site_name.strip()}"
+            if title.lower().endswith(suffix.lower()):
+                return title[: -len(suffix)].strip()
+    return title
+
+
+def _names(value):
+    """Chuyển author/tag (chuỗi, dict có name/title, hoặc list) thành danh sách tên"""
+    names = []
+    for entry in _as_list(value):
+        if isinstance(entry, dict):
+            entry = entry.get("name") or entry.get("title")
+        if isinstance(entry, str):
+            names.append(_clean_text(entry))
+    return _unique(names)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _clean_text(value):
+    """Chuẩn hóa khoảng trắng, trả về None nếu rỗng hoặc không phải chuỗi"""
+    if not isinstance(value, str):
+        return None
+    value = " ".join(value.split())
+    return value or None
+
+
+def _unique(values):
+    """Bỏ giá trị rỗng/trùng, giữ thứ tự; trả về None nếu danh sách rỗng"""
+    result = []
+    for value in values:
+        if value and value not in result:
+            result.append(value)
+    return result or None
@@ -0,0 +1,136 @@
+"""
+Test của engine trích xuất dùng chung (mycrawler.extraction)
+
+detail_fields.json là output của các detail spider trước khi chuyển sang engine dùng chung
+(chuỗi `response.css(...)` riêng của từng spider, commit trước user-041) trên các fixture trong
+benchmarks/fixtures. Engine phải cho cùng kết quả, trừ các khác biệt có chủ ý được test riêng:
+- captured-adobe_news_page.html: container duy nhất khớp rule là danh sách link ở footer, bị loại
+  bởi max_link_density (user-042)
+- bài lồng sâu hơn giới hạn đệ quy: cách duyệt đệ quy cũ không lấy được content
+
+Chạy: cd mycrawler && python -m pytest tests
+"""
+import json
+from pathlib import Path
+
+import pytest
+from scrapy import Spider
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.test import get_crawler
+
+from benchmarks.extraction_throughput import deeply_nested_article, synthetic_article
+from benchmarks.fixtures import FIXTURES_DIR
+from mycrawler.extraction import ArticleExtractor, extract_article, get_article_extractor, get_extraction_rules
+
+EXPECTED = json.loads((Path(__file__).parent / "detail_fields.json").read_text(encoding="utf-8"))
+FIELDS = ("title", "description", "authors", "date", "tags", "content", "content_length", "images")
+SYNTHETIC_URL = "https://techcrunch.com/2025/11/06/benchmark-article/"
+
+
+def make_spider(name, settings=None):
+    spidercls = type("FixtureSpider", (Spider,), {"name": name})
+    crawler = get_crawler(spidercls, {
+        "TWISTED_REACTOR_ENABLED": False,
+        "EXTRACTION_LEARNING_ENABLED": False,
+        **(settings or {}),
+    })
+    return spidercls.from_crawler(crawler)
+
+
+def make_response(url, body):
+    return HtmlResponse(url=url, body=body, encoding="utf-8", request=Request(url))
+
+
+def detail_fixtures():
+    manifest = json.loads((FIXTURES_DIR / "manifest.json").read_text(encoding="utf-8"))
+    return [entry for entry in manifest if entry["spider"].endswith("-detail")]
+
+
+def fixture_fields(entry, rules=None):
+    spider = make_spider(entry["spider"])
+    response = make_response(entry["url"], (FIXTURES_DIR / entry["file"]).read_bytes())
+    if rules is None:
+        data = extract_article(spider, response)
+    else:
+        data = ArticleExtractor({**get_extraction_rules(spider), **rules}).extract(response)
+    return {field: data[field] for field in FIELDS}
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [entry for entry in detail_fixtures() if entry["file"] != "captured-adobe_news_page.html"],
+    ids=lambda entry: entry["file"],
+)
+def test_fixture_fields_match_selector_output(entry):
+    assert fixture_fields(entry) == EXPECTED[entry["file"]]
+
+
+def test_link_list_container_is_rejected():
+    entry = next(entry for entry in detail_fixtures() if entry["file"] == "captured-adobe_news_page.html")
+    expected = EXPECTED[entry["file"]]
+
+    fields = fixture_fields(entry)
+    assert fields["content"] is None
+    assert fields["content_length"] == 0
+    assert fields["images"] is None
+    assert {field: fields[field] for field in FIELDS[:5]} == {field: expected[field] for field in FIELDS[:5]}
+
+    # Không giới hạn mật độ link -> cùng container (footer) và content như selector cũ
+    assert fixture_fields(entry, rules={"max_link_density": None}) == expected
+
+
+def test_synthetic_article_matches_selector_output():
+    spider = make_spider("techcrunch-detail")
+    data = extract_article(spider, make_response(SYNTHETIC_URL, synthetic_article().encode("utf-8")))
+    assert {field: data[field] for field in FIELDS} == EXPECTED["synthetic-article"]
+
+
+def test_deeply_nested_article_is_extracted():
+    spider = make_spider("techcrunch-detail")
+    data = extract_article(spider, make_response(SYNTHETIC_URL, deeply_nested_article().encode("utf-8")))
+    assert data["title"] == "Nested article"
+    paragraphs = data["content"].split("\n\n")
+    assert paragraphs == [f"Paragraph {i} of a deeply nested article body." for i in range(10)]
+
+
+def test_image_skip_is_per_source():
+    body = (
+        b"<html><body><article><h1>Title</h1><p>First paragraph of the article body.</p>"
+        b"<p>Second paragraph of the article body.</p><p>Third paragraph of the article body.</p>"
+        b"<p>Fourth paragraph of the article body.</p><img src='/img/card_1x1.png'>"
+        b"<img src='/img/placeholder.gif'><img src='data:image/gif;base64,R0lGOD'></article></body></html>"
+    )
+    url = "https://example.com/post"
+    openai = extract_article(make_spider("openai-com-detail"), make_response(url, body))
+    techcrunch = extract_article(make_spider("techcrunch-detail"), make_response(url, body))
+    assert openai["images"] == ["https://example.com/img/card_1x1.png", "https://example.com/img/placeholder.gif"]
+    assert techcrunch["images"] is None
+
+
+@pytest.mark.parametrize(
+    "field, strategy, message",
+    [
+        ("title", "article > h1::text", "combinator '>'"),
+        ("title", "h1 + p::text", "combinator '+'"),
+        ("title", "h1:first-child::text", "không được hỗ trợ"),
+        ("tags", "a::text, ", "selector rỗng"),
+        ("title", "::text", "selector rỗng"),
+        ("authors", {"pattern": "(unclosed"}, "missing )"),
+        ("title", {"selector": "title::text", "strip": "[a-"}, "unterminated character set"),
+        ("date", {"min_length": 3}, "'selector', 'pattern'"),
+        ("content", "article::text", "chọn element"),
+    ],
+)
+def test_unsupported_rule_raises_when_compiled(field, strategy, message):
+    rules = get_extraction_rules(make_spider("techcrunch-detail"))
+    rules[field] = [strategy]
+    with pytest.raises(ValueError) as error:
+        ArticleExtractor(rules)
+    assert f"{field}[0]" in str(error.value)
+    assert message in str(error.value)
+
+
+def test_invalid_rules_fail_before_first_response():
+    spider = make_spider("techcrunch-detail", {"EXTRACTION_RULES": {"techcrunch": {"title": ["h1 > span::text"]}}})
+    with pytest.raises(ValueError, match=r"title\[0\]"):
+        get_article_extractor(spider)
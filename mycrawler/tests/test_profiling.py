@@ -0,0 +1,43 @@
+"""
+Test của CPU profiler (mycrawler.profiling)
+
+Chạy: cd mycrawler && python -m pytest tests
+"""
+import asyncio
+import time
+
+from mycrawler.profiling import CpuProfiler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_async_section_counts_only_its_own_task(tmp_path):
+    profiler = CpuProfiler("test", tmp_path)
+
+    async def route():
+        with profiler.section("route"):
+            # Chờ subprocess/I/O: không phải CPU của route
+            await asyncio.sleep(0.3)
+
+    async def other_request():
+        await asyncio.sleep(0.05)
+        busy(0.2)
+
+    async def main():
+        await asyncio.gather(route(), other_request())
+        with profiler.section("sync"):
+            busy(0.1)
+
+    try:
+        asyncio.run(main())
+    finally:
+        profiler.close()
+
+    sections = profiler.report()["sections"]
+    assert sections["route"]["calls"] == 1
+    assert sections["route"]["samples"] <= 2
+    assert sections["sync"]["samples"] > 0
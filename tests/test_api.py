@@ -0,0 +1,48 @@
+"""
+Test của API (app.py) qua ASGI transport
+
+App chạy với store và thư mục mycrawler trong thư mục tạm, spider được stub (app.loadtest.isolated_app).
+
+Chạy: python -m pytest tests (từ thư mục gốc của repo)
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.loadtest import isolated_app
+
+HEADERS = {settings.API_KEY_HEADER: settings.API_KEY}
+
+
+@pytest.fixture
+def app(tmp_path):
+    with isolated_app(tmp_path, spider_seconds=0, listing_items=1, detail_urls=1) as app:
+        yield app
+
+
+def post_crawl_detail(app, url):
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/api/crawl-detail", json={"type": "techcrunch.com", "url": url}, headers=HEADERS)
+
+    return asyncio.run(send())
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["http://a:b/", "http://[", "https://techcrunch.com:99999/x", "https://techcrunch.com:abc/x"],
+)
+def test_crawl_detail_rejects_malformed_url(app, url):
+    response = post_crawl_detail(app, url)
+    assert response.status_code == 400
+    assert "URL không hợp lệ" in response.json()["detail"]
+
+
+def test_crawl_detail_canonicalizes_valid_url(app):
+    response = post_crawl_detail(app, "https://TechCrunch.com:443/2025/10/01/loadtest-detail-0/?utm_source=rss#comments")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["url"] == "https://techcrunch.com/2025/10/01/loadtest-detail-0/"
+    assert body["cached"] is True